@@ -0,0 +1,275 @@
+"""In-process approximate nearest-neighbour (ANN) retrieval with NumPy.
+
+``IVFIndex`` is an inverted-file index: a k-means coarse quantizer splits the
+indexed vectors into ``n_lists`` clusters, and a query only scans the
+``n_probe`` clusters whose centroids score highest. Optional product
+quantization (PQ) stores each vector's residual from its centroid as
+``pq_subspaces`` one-byte codes and scores them with per-query lookup tables.
+
+Scores are inner products. Vectors should be L2-normalized, as
+``HeteroGAT.forward`` produces them, so that k-means (squared L2) clustering
+agrees with inner-product ranking.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+
+from rec_engine.core.sparse import csr_gather, edges_to_csr
+
+logger = logging.getLogger(__name__)
+
+# Rows per block when assigning points to centroids (bounds [rows, k] buffers).
+_ASSIGN_BLOCK = 8192
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid (squared L2) for each row of ``x``."""
+    c_sq = (centroids * centroids).sum(axis=1)
+    labels = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), _ASSIGN_BLOCK):
+        block = x[start:start + _ASSIGN_BLOCK]
+        # ||x - c||^2 up to the per-row constant ||x||^2
+        labels[start:start + _ASSIGN_BLOCK] = np.argmin(c_sq - 2.0 * block @ centroids.T, axis=1)
+    return labels
+
+
+def kmeans(
+    x: np.ndarray,
+    n_clusters: int,
+    *,
+    n_iter: int = 20,
+    seed: int = 42,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Lloyd's k-means with random-sample initialization.
+
+    Empty clusters are re-seeded from random points so every centroid stays
+    in use.
+
+    Returns:
+        ``(centroids [n_clusters, d] float32, labels [n])``.
+    """
+    x = np.asarray(x, dtype=np.float32)
+    if not 0 < n_clusters <= len(x):
+        raise ValueError(f"n_clusters must be in [1, {len(x)}], got {n_clusters}")
+
+    rng = np.random.RandomState(seed)
+    centroids = x[rng.choice(len(x), n_clusters, replace=False)].copy()
+    labels = _assign(x, centroids)
+    for _ in range(n_iter):
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, x)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            centroids[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+        new_labels = _assign(x, centroids)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return centroids, labels
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the top-``k`` scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((len(scores), 0), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+def _pad(ids: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Right-pad ``[B, <=k]`` results to width ``k`` with ``-1`` / ``-inf``."""
+    missing = k - ids.shape[1]
+    if missing <= 0:
+        return ids, scores
+    return (
+        np.pad(ids, ((0, 0), (0, missing)), constant_values=-1),
+        np.pad(scores, ((0, 0), (0, missing)), constant_values=-np.inf),
+    )
+
+
+def exact_search(
+    queries: np.ndarray,
+    vectors: np.ndarray,
+    ids: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Brute-force inner-product top-``k`` (ground truth for recall).
+
+    Returns:
+        ``(ids [B, k] int64, scores [B, k] float32)``, padded with
+        ``-1`` / ``-inf`` when fewer than ``k`` vectors exist.
+    """
+    scores = np.asarray(queries, dtype=np.float32) @ np.asarray(vectors, dtype=np.float32).T
+    cols = _top_k_rows(scores, k)
+    return _pad(np.asarray(ids)[cols], np.take_along_axis(scores, cols, axis=1), k)
+
+
+def recall_at_k(approx_ids: np.ndarray, exact_ids: np.ndarray) -> float:
+    """Mean fraction of each row's exact top-k found in the approximate top-k.
+
+    ``-1`` entries are padding and ignored on both sides.
+    """
+    approx_ids = np.asarray(approx_ids, dtype=np.int64)
+    exact_ids = np.asarray(exact_ids, dtype=np.int64)
+    if exact_ids.size == 0:
+        return 1.0
+    width = int(max(approx_ids.max(initial=0), exact_ids.max(initial=0))) + 2
+    rows_a = np.arange(len(approx_ids))[:, None] * width
+    rows_e = np.arange(len(exact_ids))[:, None] * width
+    found = np.isin(exact_ids + rows_e, approx_ids + rows_a) & (exact_ids >= 0)
+    n_exact = (exact_ids >= 0).sum(axis=1)
+    has_truth = n_exact > 0
+    if not has_truth.any():
+        return 1.0
+    return float((found.sum(axis=1)[has_truth] / n_exact[has_truth]).mean())
+
+
+class IVFIndex:
+    """Inverted-file inner-product index with optional residual PQ.
+
+    Args:
+        n_lists: Coarse clusters. ``0`` picks ``~sqrt(n_vectors)``.
+        n_probe: Clusters scanned per query (recall/latency knob).
+        pq_subspaces: Residual PQ subspaces. ``0`` keeps full vectors and
+            scores candidates exactly; otherwise must divide the dimension.
+        pq_bits: Bits per PQ code (at most 8; codebooks have ``2**bits``
+            entries).
+        n_iter: k-means iterations for coarse and PQ codebooks.
+        seed: Random seed for k-means initialization.
+    """
+
+    def __init__(
+        self,
+        n_lists: int = 0,
+        n_probe: int = 8,
+        pq_subspaces: int = 0,
+        pq_bits: int = 8,
+        n_iter: int = 20,
+        seed: int = 42,
+    ):
+        if n_probe < 1:
+            raise ValueError(f"n_probe must be >= 1, got {n_probe}")
+        if not 1 <= pq_bits <= 8:
+            raise ValueError(f"pq_bits must be in [1, 8], got {pq_bits}")
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.pq_subspaces = pq_subspaces
+        self.pq_bits = pq_bits
+        self.n_iter = n_iter
+        self.seed = seed
+
+        self.centroids: np.ndarray | None = None
+        self.list_indptr: np.ndarray | None = None
+        self.list_rows: np.ndarray | None = None
+        self.row_list: np.ndarray | None = None
+        self.ids: np.ndarray | None = None
+        self.vectors: np.ndarray | None = None
+        self.codebooks: np.ndarray | None = None
+        self.codes: np.ndarray | None = None
+
+    def fit(self, vectors: np.ndarray, ids: np.ndarray | None = None) -> IVFIndex:
+        """Cluster ``vectors`` and build the inverted lists.
+
+        Args:
+            vectors: ``[n, d]`` vectors to index.
+            ids: External ID per row, returned by ``search``. Defaults to
+                ``arange(n)``.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        if n == 0:
+            raise ValueError("Cannot build an IVF index over zero vectors")
+        self.ids = np.arange(n, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        if len(self.ids) != n:
+            raise ValueError(f"ids length {len(self.ids)} != number of vectors {n}")
+
+        n_lists = self.n_lists or max(1, int(round(np.sqrt(n))))
+        n_lists = min(n_lists, n)
+        self.centroids, self.row_list = kmeans(
+            vectors, n_lists, n_iter=self.n_iter, seed=self.seed,
+        )
+        self.list_indptr, self.list_rows = edges_to_csr(
+            self.row_list, np.arange(n), n_lists, dedup=False,
+        )
+
+        if self.pq_subspaces:
+            if dim % self.pq_subspaces:
+                raise ValueError(
+                    f"pq_subspaces={self.pq_subspaces} must divide embedding dim {dim}"
+                )
+            residuals = vectors - self.centroids[self.row_list]
+            sub_dim = dim // self.pq_subspaces
+            n_codes = min(2 ** self.pq_bits, n)
+            self.codebooks = np.empty((self.pq_subspaces, n_codes, sub_dim), dtype=np.float32)
+            self.codes = np.empty((n, self.pq_subspaces), dtype=np.uint8)
+            for j in range(self.pq_subspaces):
+                sub = residuals[:, j * sub_dim:(j + 1) * sub_dim]
+                self.codebooks[j], self.codes[:, j] = kmeans(
+                    sub, n_codes, n_iter=self.n_iter, seed=self.seed + j + 1,
+                )
+            self.vectors = None
+        else:
+            self.vectors = vectors
+
+        sizes = np.diff(self.list_indptr)
+        logger.info(
+            "IVF index: %d vectors, %d lists (size %d-%d), n_probe=%d, pq_subspaces=%d",
+            n, n_lists, sizes.min(), sizes.max(), self.n_probe, self.pq_subspaces,
+        )
+        return self
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Approximate inner-product top-``k`` for a batch of queries.
+
+        Returns:
+            ``(ids [B, k] int64, scores [B, k] float32)``, best first, padded
+            with ``-1`` / ``-inf`` when the probed lists hold fewer than ``k``
+            vectors. With PQ, scores are approximate and should be re-scored.
+        """
+        if self.centroids is None:
+            raise RuntimeError("IVFIndex.search called before fit")
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        n_queries = len(queries)
+
+        coarse = queries @ self.centroids.T
+        probe = _top_k_rows(coarse, self.n_probe)
+        n_probe = probe.shape[1]
+
+        # Expand every (query, probed list) pair to the rows in that list
+        pair, rows = csr_gather(self.list_indptr, self.list_rows, probe.ravel())
+        query = pair // n_probe
+        if self.codes is None:
+            cand_scores = np.einsum("nd,nd->n", queries[query], self.vectors[rows])
+        else:
+            sub_dim = queries.shape[1] // self.pq_subspaces
+            # Lookup tables: [B, subspaces, codes] = query_sub . codebook_entry
+            luts = np.einsum(
+                "bmd,mkd->bmk",
+                queries.reshape(n_queries, self.pq_subspaces, sub_dim),
+                self.codebooks,
+            )
+            subspace = np.arange(self.pq_subspaces)
+            residual = luts[query[:, None], subspace, self.codes[rows]].sum(axis=1)
+            cand_scores = np.take_along_axis(coarse, probe, axis=1).ravel()[pair] + residual
+
+        # Scatter the ragged per-query candidates into a dense [B, max] block
+        counts = np.bincount(query, minlength=n_queries)
+        width = int(counts.max(initial=0))
+        offsets = np.arange(len(query)) - np.repeat(np.cumsum(counts) - counts, counts)
+        dense = np.full((n_queries, width), -np.inf, dtype=np.float32)
+        dense_rows = np.full((n_queries, width), -1, dtype=np.int64)
+        dense[query, offsets] = cand_scores
+        dense_rows[query, offsets] = rows
+
+        cols = _top_k_rows(dense, k)
+        top_rows = np.take_along_axis(dense_rows, cols, axis=1)
+        top_scores = np.take_along_axis(dense, cols, axis=1)
+        top_ids = np.where(top_rows >= 0, self.ids[top_rows.clip(min=0)], -1)
+        return _pad(top_ids, top_scores, k)
@@ -0,0 +1,156 @@
+"""Opt-in ``torch.compile`` of the GNN models (``model.compile``).
+
+``compile_model`` replaces the model's ``forward`` with a ``GuardedForward``:
+calls go through ``torch.compile(model.forward)``, and the first Dynamo or
+Inductor failure (``TorchDynamoException``, e.g. ``BackendCompilerFailed``
+for an op the backend cannot handle) logs a warning and switches the model
+back to eager for good. Any other error propagates.
+
+Compiling costs tens of seconds on CPU, once per distinct graph (train and
+eval mode compile separately). ``model.compile_cache_dir`` points Inductor's
+on-disk cache (FX graphs, AOT autograd graphs and the compiled C++ kernels)
+at a persistent directory instead of the default under ``/tmp``, so later
+runs with the same code and graph shapes skip most of that cost. Inductor
+reads the directory from ``TORCHINDUCTOR_CACHE_DIR`` when it compiles, so the
+variable is set only around compiled calls and restored afterwards.
+
+The first call in each mode runs eager and is timed as the baseline; the
+second compiles. ``GuardedForward.report`` compares the two, so the compile
+cost can be weighed against the per-call saving.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+from torch._dynamo.exc import TorchDynamoException
+
+if TYPE_CHECKING:
+    from rec_engine.core.model import TwoTowerGNN
+
+logger = logging.getLogger(__name__)
+
+
+class GuardedForward:
+    """``forward`` through ``torch.compile`` with eager fallback and per-mode timings.
+
+    Args:
+        model: Model whose bound ``forward`` is wrapped.
+        backend: ``torch.compile`` backend.
+        mode: ``torch.compile`` mode (``None``, ``"max-autotune"``, ...).
+        cache_dir: Inductor on-disk cache directory (``None`` = Inductor default).
+    """
+
+    def __init__(
+        self,
+        model: TwoTowerGNN,
+        *,
+        backend: Any = "inductor",
+        mode: str | None = None,
+        cache_dir: Path | None = None,
+    ):
+        self.model = model
+        self.cache_dir = cache_dir
+        self.eager = model.forward
+        self.compiled = torch.compile(self.eager, backend=backend, mode=mode)
+        self.fallback_reason: str | None = None
+        # "train"/"eval" -> list of (kind, seconds); kind is eager, compile or compiled
+        self._timings: dict[str, list[tuple[str, float]]] = {}
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        timings = self._timings.setdefault("train" if self.model.training else "eval", [])
+        if self.compiled is None or not timings:
+            return _timed(timings, "eager", self.eager, *args, **kwargs)
+        kind = "compiled" if any(k == "compile" for k, _ in timings) else "compile"
+        try:
+            with _inductor_cache_dir(self.cache_dir):
+                return _timed(timings, kind, self.compiled, *args, **kwargs)
+        except TorchDynamoException as exc:
+            self.fallback_reason = f"{type(exc).__name__}: {exc}"
+            logger.warning("torch.compile failed, falling back to eager forward: %s", self.fallback_reason)
+            self.compiled = None
+            return self.eager(*args, **kwargs)
+
+    def report(self) -> dict[str, Any]:
+        """Per mode: eager/compiled seconds per call, compile overhead, break-even calls."""
+        report: dict[str, Any] = {"active": self.compiled is not None}
+        if self.fallback_reason:
+            report["fallback_reason"] = self.fallback_reason
+        for mode, timings in self._timings.items():
+            by_kind: dict[str, list[float]] = {}
+            for kind, seconds in timings:
+                by_kind.setdefault(kind, []).append(seconds)
+            if not {"eager", "compile", "compiled"} <= by_kind.keys():
+                continue
+            eager = by_kind["eager"][0]
+            compiled = sum(by_kind["compiled"]) / len(by_kind["compiled"])
+            compile_s = max(by_kind["compile"][0] - compiled, 0.0)
+            saving = eager - compiled
+            report[mode] = {
+                "eager_s": eager,
+                "compiled_s": compiled,
+                "compile_s": compile_s,
+                "calls": len(timings),
+                "break_even_calls": int(compile_s // saving) + 1 if saving > 0 else None,
+            }
+        return report
+
+
+def _timed(timings: list[tuple[str, float]], kind: str, fn: Any, *args: Any, **kwargs: Any) -> Any:
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    timings.append((kind, time.perf_counter() - start))
+    return out
+
+
+def compile_model(model: TwoTowerGNN, config: dict[str, Any]) -> TwoTowerGNN:
+    """Wrap ``model.forward`` in a ``GuardedForward`` if ``model.compile`` is set.
+
+    The model is modified in place and returned; parameters and
+    ``state_dict`` keys are unchanged, so checkpoints stay interchangeable.
+    """
+    model_cfg = config.get("model", {})
+    if not model_cfg.get("compile", False):
+        return model
+    cache_dir = model_cfg.get("compile_cache_dir")
+    cache_dir = Path(cache_dir).resolve() if cache_dir else None
+    if cache_dir is not None:
+        logger.info("torch.compile cache: %s", cache_dir)
+    backend = model_cfg.get("compile_backend") or "inductor"
+    model.forward = GuardedForward(
+        model, backend=backend, mode=model_cfg.get("compile_mode"), cache_dir=cache_dir,
+    )
+    logger.info("Model forward wrapped with torch.compile (backend=%s)", backend)
+    return model
+
+
+def compile_report(model: TwoTowerGNN) -> dict[str, Any] | None:
+    """``GuardedForward.report`` of a compiled model; ``None`` if not compiled."""
+    forward = model.__dict__.get("forward")
+    return forward.report() if isinstance(forward, GuardedForward) else None
+
+
+@contextmanager
+def _inductor_cache_dir(cache_dir: Path | None) -> Iterator[None]:
+    """Point ``TORCHINDUCTOR_CACHE_DIR`` at ``cache_dir`` for the block, then restore it."""
+    if cache_dir is None:
+        yield
+        return
+    previous = os.environ.get("TORCHINDUCTOR_CACHE_DIR")
+    os.environ["TORCHINDUCTOR_CACHE_DIR"] = str(cache_dir)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("TORCHINDUCTOR_CACHE_DIR", None)
+        else:
+            os.environ["TORCHINDUCTOR_CACHE_DIR"] = previous
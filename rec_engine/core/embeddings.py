@@ -0,0 +1,215 @@
+"""Persisted user/product embedding snapshots.
+
+Scoring and evaluation only need the final user and product embeddings.
+Training writes them once as ``.npy`` arrays (memory-mappable) next to the ID
+mappings and a hash of the model weights, so later score/evaluate runs can
+skip graph construction and the GNN forward pass entirely.
+
+Snapshot directory layout::
+
+    manifest.json          # format version, model hash, shapes
+    id_mappings.json       # ordered ID lists per node type
+    user_embeddings.npy    # float32 [n_users, dim]
+    product_embeddings.npy # float32 [n_products, dim]
+    split_masks.npz        # optional train/val/test user masks
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import torch
+
+from rec_engine.core.id_index import IdIndex, as_id_index
+
+if TYPE_CHECKING:
+    from torch_geometric.data import HeteroData
+
+    from rec_engine.core.model import TwoTowerGNN
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# id_mappings key -> ordered-list key in id_mappings.json
+_MAPPING_KEYS = {
+    "user_to_id": "users",
+    "product_to_id": "products",
+    "entity_to_id": "entities",
+}
+
+
+def model_hash(model: torch.nn.Module) -> str:
+    """SHA-256 over the model's state dict (names, shapes, dtypes, values)."""
+    digest = hashlib.sha256()
+    for name, tensor in sorted(model.state_dict().items()):
+        t = tensor.detach().cpu().contiguous()
+        digest.update(name.encode())
+        digest.update(str(tuple(t.shape)).encode())
+        digest.update(str(t.dtype).encode())
+        if t.dtype == torch.bfloat16:  # no NumPy equivalent
+            t = t.float()
+        digest.update(t.numpy().tobytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class EmbeddingSnapshot:
+    """Final user/product embeddings plus the mappings needed to use them.
+
+    Attributes:
+        user_embs: ``[n_users, dim]`` float32, possibly a copy-on-write memmap.
+        product_embs: ``[n_products, dim]`` float32.
+        id_mappings: Same structure as ``_build_id_mappings`` output.
+        model_hash: ``model_hash()`` of the weights that produced the arrays.
+        split_masks: Optional train/val/test user masks (bool arrays).
+    """
+
+    user_embs: np.ndarray
+    product_embs: np.ndarray
+    id_mappings: dict[str, dict]
+    model_hash: str
+    split_masks: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __post_init__(self):
+        n_users = len(self.id_mappings["user_to_id"])
+        n_products = len(self.id_mappings["product_to_id"])
+        if self.user_embs.shape[0] != n_users:
+            raise ValueError(
+                f"user_embs has {self.user_embs.shape[0]} rows but id_mappings has {n_users} users"
+            )
+        if self.product_embs.shape[0] != n_products:
+            raise ValueError(
+                f"product_embs has {self.product_embs.shape[0]} rows "
+                f"but id_mappings has {n_products} products"
+            )
+        if self.user_embs.shape[1] != self.product_embs.shape[1]:
+            raise ValueError(
+                f"Embedding dims differ: users {self.user_embs.shape[1]}, "
+                f"products {self.product_embs.shape[1]}"
+            )
+
+    @property
+    def dim(self) -> int:
+        return int(self.user_embs.shape[1])
+
+    def tensors(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """``(user_embs, product_embs)`` as CPU tensors sharing the arrays."""
+        return torch.from_numpy(self.user_embs), torch.from_numpy(self.product_embs)
+
+    def split_mask_tensors(self) -> dict[str, torch.Tensor]:
+        return {name: torch.from_numpy(np.asarray(mask)) for name, mask in self.split_masks.items()}
+
+    def check_mappings(self, id_mappings: dict[str, dict]) -> None:
+        """Raise ``ValueError`` if ``id_mappings`` disagree with the snapshot's."""
+        for key in _MAPPING_KEYS:
+            if as_id_index(id_mappings.get(key)) != as_id_index(self.id_mappings.get(key)):
+                raise ValueError(
+                    f"Embedding snapshot {key} does not match the current ID mappings "
+                    f"({len(self.id_mappings.get(key, {}))} vs {len(id_mappings.get(key, {}))} IDs); "
+                    "re-export the snapshot from the model trained on this data."
+                )
+
+    def save(self, directory: str | Path) -> Path:
+        """Write the snapshot to ``directory`` (created if missing)."""
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        np.save(out / "user_embeddings.npy", np.ascontiguousarray(self.user_embs, dtype=np.float32))
+        np.save(out / "product_embeddings.npy", np.ascontiguousarray(self.product_embs, dtype=np.float32))
+        if self.split_masks:
+            np.savez(out / "split_masks.npz", **{k: np.asarray(v, dtype=bool) for k, v in self.split_masks.items()})
+        else:
+            (out / "split_masks.npz").unlink(missing_ok=True)
+
+        ordered = {
+            list_key: as_id_index(self.id_mappings[key]).keys_array.tolist()
+            for key, list_key in _MAPPING_KEYS.items()
+            if key in self.id_mappings
+        }
+        (out / "id_mappings.json").write_text(json.dumps(ordered))
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "model_hash": self.model_hash,
+            "n_users": int(self.user_embs.shape[0]),
+            "n_products": int(self.product_embs.shape[0]),
+            "dim": self.dim,
+        }
+        (out / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        logger.info(
+            "Saved embedding snapshot to %s (%d users, %d products, dim=%d, model %s)",
+            out, manifest["n_users"], manifest["n_products"], manifest["dim"], self.model_hash[:12],
+        )
+        return out
+
+    @classmethod
+    def load(cls, directory: str | Path, *, mmap: bool = True) -> EmbeddingSnapshot:
+        """Load a snapshot; embeddings are memory-mapped unless ``mmap=False``."""
+        src = Path(directory)
+        manifest_path = src / "manifest.json"
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No embedding snapshot manifest at {manifest_path}")
+        manifest = json.loads(manifest_path.read_text())
+        version = manifest.get("format_version")
+        if version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported embedding snapshot format {version} "
+                f"(expected {SNAPSHOT_FORMAT_VERSION})"
+            )
+
+        ordered = json.loads((src / "id_mappings.json").read_text())
+        id_mappings = {
+            key: IdIndex(ordered[list_key])
+            for key, list_key in _MAPPING_KEYS.items()
+            if list_key in ordered
+        }
+        # Copy-on-write maps stay lazily paged but give torch writable arrays
+        mmap_mode = "c" if mmap else None
+        split_masks: dict[str, np.ndarray] = {}
+        if (src / "split_masks.npz").exists():
+            with np.load(src / "split_masks.npz") as masks:
+                split_masks = {name: masks[name] for name in masks.files}
+
+        snapshot = cls(
+            user_embs=np.load(src / "user_embeddings.npy", mmap_mode=mmap_mode),
+            product_embs=np.load(src / "product_embeddings.npy", mmap_mode=mmap_mode),
+            id_mappings=id_mappings,
+            model_hash=manifest["model_hash"],
+            split_masks=split_masks,
+        )
+        logger.info(
+            "Loaded embedding snapshot from %s (%d users, %d products, model %s)",
+            src, manifest["n_users"], manifest["n_products"], snapshot.model_hash[:12],
+        )
+        return snapshot
+
+
+@torch.no_grad()
+def compute_snapshot(
+    model: TwoTowerGNN,
+    data: HeteroData,
+    id_mappings: dict[str, dict],
+    *,
+    split_masks: dict[str, torch.Tensor] | None = None,
+    device: torch.device | None = None,
+    chunk_size: int | None = None,
+) -> EmbeddingSnapshot:
+    """Run one eval-mode forward pass and capture the embeddings.
+
+    ``chunk_size`` switches to the model's layer-wise chunked ``inference``.
+    """
+    device = device or next(model.parameters()).device
+    user_embs, product_embs = model.embed(data.to(device), chunk_size)
+    masks: dict[str, Any] = split_masks or {}
+    return EmbeddingSnapshot(
+        user_embs=user_embs.cpu().numpy().astype(np.float32, copy=False),
+        product_embs=product_embs.cpu().numpy().astype(np.float32, copy=False),
+        id_mappings=id_mappings,
+        model_hash=model_hash(model),
+        split_masks={name: mask.cpu().numpy() for name, mask in masks.items()},
+    )
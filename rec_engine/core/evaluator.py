@@ -12,8 +12,11 @@ import numpy as np
 import pandas as pd
 import torch
 
+from rec_engine.core.embeddings import EmbeddingSnapshot
+from rec_engine.core.id_index import as_id_indexes
 from rec_engine.core.metrics import hit_rate_at_k, mrr, ndcg_at_k, recall_at_k
-from rec_engine.core.model import HeteroGAT
+from rec_engine.core.model import TwoTowerGNN
+from rec_engine.core.product_store import ProductMetadataStore
 from rec_engine.core.rules import apply_slot_reservation_with_diversity
 from rec_engine.plugins import RecEnginePlugin
 from rec_engine.topology import TopologyStrategy
@@ -29,7 +32,7 @@ class GNNEvaluator:
 
     def __init__(
         self,
-        model: HeteroGAT,
+        model: TwoTowerGNN | None,
         data: HeteroData,
         split_masks: dict[str, torch.Tensor],
         id_mappings: dict[str, dict],
@@ -42,20 +45,25 @@ class GNNEvaluator:
         baseline_df: pd.DataFrame | None = None,
         user_engagement_tiers: dict[int, str] | None = None,
         device: torch.device | None = None,
+        embeddings: EmbeddingSnapshot | None = None,
     ):
+        if model is None and embeddings is None:
+            raise ValueError("GNNEvaluator needs a model or an embedding snapshot")
+        if embeddings is not None:
+            embeddings.check_mappings(id_mappings)
         self.model = model
+        self.embeddings = embeddings
         self.data = data
         self.split_masks = split_masks
-        self.id_mappings = id_mappings
+        self.id_mappings = as_id_indexes(id_mappings)
         self.config = config
         self.strategy = strategy
         self.plugin = plugin
         self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-        user_to_id = id_mappings["user_to_id"]
-        product_to_id = id_mappings["product_to_id"]
+        user_to_id = self.id_mappings["user_to_id"]
+        product_to_id = self.id_mappings["product_to_id"]
 
-        # Build product metadata
         # H4: Use graph tensor for excluded set (same source as scorer)
         excluded_mask = getattr(self.data["product"], "is_excluded", None)
         self.excluded_product_ids: frozenset[int]
@@ -66,32 +74,24 @@ class GNNEvaluator:
         else:
             self.excluded_product_ids = frozenset()
 
-        self.category_by_product_id: dict[int, str] = {}
+        # Build product metadata
         category_col = config.get("columns", {}).get("category", "category")
-
-        if "products" in nodes:
-            products = nodes["products"].drop_duplicates(subset=["product_id"]).copy()
-            products["_pid"] = products["product_id"].map(product_to_id)
-            products = products.dropna(subset=["_pid"])
-            products["_pid"] = products["_pid"].astype(int)
-
-            if category_col in products.columns:
-                self.category_by_product_id = dict(zip(
-                    products["_pid"],
-                    products[category_col].fillna("").astype(str),
-                ))
+        products_df = nodes.get("products", pd.DataFrame({"product_id": []}))
+        self.product_store = ProductMetadataStore(
+            products_df, product_to_id, self.data["product"].num_nodes, category_col=category_col,
+        )
+        self.category_by_product_id = self.product_store.category_map()
 
         logger.info("Excluded products (eval): %d", len(self.excluded_product_ids))
 
         # Build test set
         self.test_interactions: dict[int, set[int]] = {}
         test_pairs = test_df.assign(
-            _uid=test_df["user_id"].map(user_to_id),
-            _pid=test_df["product_id"].map(product_to_id),
-        ).dropna(subset=["_uid", "_pid"])
+            _uid=user_to_id.encode(test_df["user_id"]),
+            _pid=product_to_id.encode(test_df["product_id"]),
+        )
+        test_pairs = test_pairs[(test_pairs["_uid"] >= 0) & (test_pairs["_pid"] >= 0)]
         if not test_pairs.empty:
-            test_pairs["_uid"] = test_pairs["_uid"].astype(int)
-            test_pairs["_pid"] = test_pairs["_pid"].astype(int)
             for uid, group in test_pairs.groupby("_uid"):
                 products = set(group["_pid"].tolist()) - self.excluded_product_ids
                 if products:
@@ -103,12 +103,10 @@ class GNNEvaluator:
             bl = baseline_df.copy()
             if "rank" in bl.columns:
                 bl = bl.sort_values("rank")
-            bl["_uid"] = bl["user_id"].map(user_to_id)
-            bl["_pid"] = bl["product_id"].map(product_to_id)
-            bl = bl.dropna(subset=["_uid", "_pid"])
+            bl["_uid"] = user_to_id.encode(bl["user_id"])
+            bl["_pid"] = product_to_id.encode(bl["product_id"])
+            bl = bl[(bl["_uid"] >= 0) & (bl["_pid"] >= 0)]
             if not bl.empty:
-                bl["_uid"] = bl["_uid"].astype(int)
-                bl["_pid"] = bl["_pid"].astype(int)
                 for uid, group in bl.groupby("_uid", sort=False):
                     deduped: list[int] = []
                     seen: set[int] = set()
@@ -130,13 +128,17 @@ class GNNEvaluator:
     @torch.no_grad()
     def evaluate(self, split: str = "test") -> dict[str, Any]:
         """Run full evaluation pipeline."""
-        self.model.eval()
-        self.model = self.model.to(self.device)
-        self.data = self.data.to(self.device)
+        if self.embeddings is not None:
+            user_embs, product_embs = self.embeddings.tensors()
+        else:
+            self.model = self.model.to(self.device)
+            self.data = self.data.to(self.device)
 
-        user_embs, product_embs = self.model(self.data)
-        user_embs = user_embs.cpu()
-        product_embs = product_embs.cpu()
+            user_embs, product_embs = self.model.embed(
+                self.data, self.config.get("model", {}).get("inference_chunk_size"),
+            )
+            user_embs = user_embs.cpu()
+            product_embs = product_embs.cpu()
 
         mask = self.split_masks[f"{split}_mask"]
         k_values = self.config["eval"]["k_values"]
@@ -7,6 +7,7 @@ topology config and column mappings. No client-specific hardcoding.
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any
 
 import numpy as np
@@ -14,10 +15,12 @@ import pandas as pd
 import torch
 from sklearn.preprocessing import LabelEncoder
 
+from rec_engine.core.id_index import IdIndex, as_id_index
+
 logger = logging.getLogger(__name__)
 
-# Sentinel object for "all users" tier — cannot collide with any real string tier.
-_ALL_USERS_TIER = object()
+# Weight aggregators for graph.coalesce_interactions
+COALESCE_METHODS = ("sum", "max", "decayed_sum")
 
 
 def build_hetero_graph(
@@ -42,10 +45,11 @@ def build_hetero_graph(
     topology = config.get("topology", "user-product")
     is_3node = topology == "user-entity-product"
     entity_type_name = config.get("entity", {}).get("type_name", "entity")
+    compact = bool(config.get("graph", {}).get("compact_tensors", False))
 
-    user_to_id = id_mappings["user_to_id"]
-    product_to_id = id_mappings["product_to_id"]
-    entity_to_id = id_mappings.get("entity_to_id", {})
+    user_to_id = as_id_index(id_mappings["user_to_id"])
+    product_to_id = as_id_index(id_mappings["product_to_id"])
+    entity_to_id = as_id_index(id_mappings.get("entity_to_id"))
 
     users_df = nodes["users"]
     products_df = nodes["products"]
@@ -57,17 +61,12 @@ def build_hetero_graph(
 
     # --- Reindex products/entities by mapped ID to ensure tensor alignment ---
     # CRITICAL: Features must be ordered by mapped integer ID, not DataFrame row order.
-    products_df = products_df.drop_duplicates(subset=["product_id"]).copy()
-    products_df["_pid"] = products_df["product_id"].map(product_to_id)
-    products_df = products_df.dropna(subset=["_pid"])
-    products_df["_pid"] = products_df["_pid"].astype(int)
-    products_df = products_df.sort_values("_pid").reset_index(drop=True)
+    products_df = _products_by_pid(products_df, product_to_id)
 
     if entities_df is not None and entity_to_id:
         entities_df = entities_df.drop_duplicates(subset=["entity_id"]).copy()
-        entities_df["_eid"] = entities_df["entity_id"].map(entity_to_id)
-        entities_df = entities_df.dropna(subset=["_eid"])
-        entities_df["_eid"] = entities_df["_eid"].astype(int)
+        entities_df["_eid"] = entity_to_id.encode(entities_df["entity_id"])
+        entities_df = entities_df[entities_df["_eid"] >= 0]
         entities_df = entities_df.sort_values("_eid").reset_index(drop=True)
 
     # --- Node Features ---
@@ -115,61 +114,10 @@ def build_hetero_graph(
     product_x_num = np.stack(normalized_features, axis=1)
 
     # Excluded product mask (optional)
-    exclude_col = config.get("columns", {}).get("is_excluded")
-    excluded_mask = None
-    if exclude_col and exclude_col in products_df.columns:
-        excluded_mask = products_df[exclude_col].fillna(False).values.astype(bool)
+    excluded_mask = _excluded_mask(products_df, config)
 
     # --- User Split ---
-    train_mask = np.zeros(n_users, dtype=bool)
-    val_mask = np.zeros(n_users, dtype=bool)
-    test_mask = np.zeros(n_users, dtype=bool)
-
-    split_ratios = config.get("eval", {}).get("user_split", [0.8, 0.1, 0.1])
-    split_seed = config.get("eval", {}).get("random_seed", 42)
-    rng = np.random.RandomState(split_seed)
-
-    # Stratified split by engagement tier if available
-    ordered_user_ids = [uid for uid, _ in sorted(user_to_id.items(), key=lambda x: x[1])]
-
-    engagement_col = config.get("columns", {}).get("engagement_tier", "engagement_tier")
-    if engagement_col in users_df.columns:
-        users_indexed_raw = users_df.set_index("user_id")[engagement_col].to_dict()
-        # Normalize: null/missing tiers get "unknown" bucket
-        from rec_engine import is_valid_scalar
-
-        users_indexed = {
-            uid: str(v).lower() if is_valid_scalar(v) else "unknown"
-            for uid, v in users_indexed_raw.items()
-        }
-        # Discover actual tiers from normalized data
-        actual_tiers = sorted(set(users_indexed.values()))
-        tiers = actual_tiers if actual_tiers else [_ALL_USERS_TIER]
-        logger.info("Engagement tiers found: %s", actual_tiers)
-    else:
-        users_indexed = {}
-        tiers = [_ALL_USERS_TIER]
-
-    for tier in tiers:
-        if tier is _ALL_USERS_TIER:
-            tier_indices = list(range(n_users))
-        else:
-            tier_indices = [
-                idx for idx, uid in enumerate(ordered_user_ids)
-                if users_indexed.get(uid, "unknown") == tier
-            ]
-
-        rng.shuffle(tier_indices)
-        n = len(tier_indices)
-        n_train = int(n * split_ratios[0])
-        n_val = int(n * split_ratios[1])
-
-        for idx in tier_indices[:n_train]:
-            train_mask[idx] = True
-        for idx in tier_indices[n_train:n_train + n_val]:
-            val_mask[idx] = True
-        for idx in tier_indices[n_train + n_val:]:
-            test_mask[idx] = True
+    train_mask, val_mask, test_mask = _split_users(user_to_id.keys_array, users_df, config)
 
     # --- Build HeteroData ---
     data = HeteroData()
@@ -206,9 +154,6 @@ def build_hetero_graph(
     product_id_col = config.get("columns", {}).get("product_id", "product_id")
 
     if len(interactions_df) > 0:
-        train_user_ids = {
-            ordered_user_ids[idx] for idx, is_train in enumerate(train_mask) if is_train
-        }
         # Use config-driven column names for filtering, warn on fallback
         int_user_col = user_id_col if user_id_col in interactions_df.columns else "user_id"
         int_prod_col = product_id_col if product_id_col in interactions_df.columns else "product_id"
@@ -228,19 +173,12 @@ def build_hetero_graph(
         # for BPR loss computation (via train_mask). Held-out *labels*
         # (test_interactions) come from a separate future time window and are
         # never stored as graph edges, so there is no information leakage.
-        all_interactions = interactions_df[
-            interactions_df[int_user_col].isin(user_to_id)
-            & interactions_df[int_prod_col].isin(product_to_id)
-        ].copy()
+        keep, src, dst = _encode_edges(
+            interactions_df[int_user_col], user_to_id, interactions_df[int_prod_col], product_to_id,
+        )
+        all_interactions = interactions_df[keep]
 
         if len(all_interactions) > 0:
-            src = torch.tensor(
-                all_interactions[int_user_col].map(user_to_id).values, dtype=torch.long
-            )
-            dst = torch.tensor(
-                all_interactions[int_prod_col].map(product_to_id).values, dtype=torch.long
-            )
-            data["user", "interacts", "product"].edge_index = torch.stack([src, dst])
             if "weight" in all_interactions.columns:
                 raw_weights = all_interactions["weight"].values.astype(np.float64)
                 n_nan = int(np.isnan(raw_weights).sum())
@@ -256,69 +194,35 @@ def build_hetero_graph(
                         f"interaction edge weights contain {n_neg} negative "
                         "values. Weights must be non-negative."
                     )
-                weights = torch.tensor(raw_weights.astype(np.float32), dtype=torch.float)
             else:
-                weights = torch.ones(len(all_interactions), dtype=torch.float)
-            data["user", "interacts", "product"].edge_weight = weights
-            data["product", "rev_interacts", "user"].edge_index = torch.stack([dst, src])
-            data["product", "rev_interacts", "user"].edge_weight = weights
+                raw_weights = np.ones(len(all_interactions), dtype=np.float64)
 
-            # Train edge mask: only train-user edges used for BPR loss
-            train_edge_mask = torch.tensor(
-                all_interactions[int_user_col].isin(train_user_ids).values,
-                dtype=torch.bool,
+            coalesce = config.get("graph", {}).get("coalesce_interactions")
+            if coalesce:
+                src, dst, raw_weights = _coalesce_interactions(
+                    all_interactions, src, dst, raw_weights, n_products, coalesce, config,
+                )
+            _set_edges(
+                data, ("user", "interacts", "product"), src, dst,
+                torch.from_numpy(raw_weights.astype(np.float32)),
+                reverse=("product", "rev_interacts", "user"), compact=compact,
             )
-            data["user", "interacts", "product"].train_mask = train_edge_mask
 
-    # 2. Product -> Entity (fits) — 3-node only
+            # Train edge mask: only train-user edges used for BPR loss
+            data["user", "interacts", "product"].train_mask = torch.from_numpy(train_mask[src.numpy()])
+
+    # 2-3. Product -> Entity (fits), User -> Entity (owns) — 3-node only
     if is_3node:
-        fitment_df = edges.get("fitment", pd.DataFrame())
-        if len(fitment_df) > 0:
-            fitment = fitment_df[
-                fitment_df["product_id"].isin(product_to_id)
-                & fitment_df["entity_id"].isin(entity_to_id)
-            ]
-            if len(fitment) > 0:
-                fit_src = torch.tensor(
-                    fitment["product_id"].map(product_to_id).values, dtype=torch.long
-                )
-                fit_dst = torch.tensor(
-                    fitment["entity_id"].map(entity_to_id).values, dtype=torch.long
-                )
-                data["product", "fits", entity_type_name].edge_index = torch.stack([fit_src, fit_dst])
-                data[entity_type_name, "rev_fits", "product"].edge_index = torch.stack([fit_dst, fit_src])
-
-        # 3. User -> Entity (owns) — 3-node only
-        ownership_df = edges.get("ownership", pd.DataFrame())
-        if len(ownership_df) > 0:
-            ownership = ownership_df[
-                ownership_df["user_id"].isin(user_to_id)
-                & ownership_df["entity_id"].isin(entity_to_id)
-            ]
-            if len(ownership) > 0:
-                own_src = torch.tensor(
-                    ownership["user_id"].map(user_to_id).values, dtype=torch.long
-                )
-                own_dst = torch.tensor(
-                    ownership["entity_id"].map(entity_to_id).values, dtype=torch.long
-                )
-                data["user", "owns", entity_type_name].edge_index = torch.stack([own_src, own_dst])
-                data[entity_type_name, "rev_owns", "user"].edge_index = torch.stack([own_dst, own_src])
+        _add_entity_edges(data, edges, id_mappings, entity_type_name, compact=compact)
 
     # 4. Product <-> Product (co_purchased, symmetric)
     copurchase_df = edges.get("copurchase", pd.DataFrame())
     if len(copurchase_df) > 0:
-        copurchase = copurchase_df[
-            copurchase_df["product_a"].isin(product_to_id)
-            & copurchase_df["product_b"].isin(product_to_id)
-        ]
+        keep, cp_src, cp_dst = _encode_edges(
+            copurchase_df["product_a"], product_to_id, copurchase_df["product_b"], product_to_id,
+        )
+        copurchase = copurchase_df[keep]
         if len(copurchase) > 0:
-            cp_src = torch.tensor(
-                copurchase["product_a"].map(product_to_id).values, dtype=torch.long
-            )
-            cp_dst = torch.tensor(
-                copurchase["product_b"].map(product_to_id).values, dtype=torch.long
-            )
             if "weight" in copurchase.columns:
                 cp_w = torch.tensor(
                     copurchase["weight"].fillna(0).values.astype(np.float32),
@@ -328,11 +232,11 @@ def build_hetero_graph(
                 cp_w = torch.ones(len(copurchase), dtype=torch.float)
             _validate_edge_weights(cp_w, "co-purchase")
             # Symmetric
-            both_src = torch.cat([cp_src, cp_dst])
-            both_dst = torch.cat([cp_dst, cp_src])
-            both_w = torch.cat([cp_w, cp_w])
-            data["product", "co_purchased", "product"].edge_index = torch.stack([both_src, both_dst])
-            data["product", "co_purchased", "product"].edge_weight = both_w
+            _set_edges(
+                data, ("product", "co_purchased", "product"),
+                torch.cat([cp_src, cp_dst]), torch.cat([cp_dst, cp_src]), torch.cat([cp_w, cp_w]),
+                compact=compact,
+            )
 
     split_masks = {
         "train_mask": torch.tensor(train_mask, dtype=torch.bool),
@@ -361,6 +265,308 @@ def build_hetero_graph(
     return data, split_masks, metadata
 
 
+def build_scoring_graph(
+    nodes: dict[str, pd.DataFrame],
+    edges: dict[str, pd.DataFrame],
+    id_mappings: dict[str, dict],
+    config: dict[str, Any],
+) -> Any:
+    """Build the structural graph scoring needs when embeddings are precomputed.
+
+    Carries node counts, the product exclusion mask, and (3-node) fitment and
+    ownership edges — everything ``GNNScorer``/``GNNEvaluator`` read from the
+    graph besides the model input. Skips features, interaction edges,
+    co-purchase edges, and the user split, so it is cheap to build next to an
+    ``EmbeddingSnapshot``.
+    """
+    from torch_geometric.data import HeteroData
+
+    is_3node = config.get("topology", "user-product") == "user-entity-product"
+    entity_type_name = config.get("entity", {}).get("type_name", "entity")
+    entity_to_id = as_id_index(id_mappings.get("entity_to_id"))
+
+    data = HeteroData()
+    data["user"].num_nodes = len(id_mappings["user_to_id"])
+    data["product"].num_nodes = len(id_mappings["product_to_id"])
+
+    products_df = _products_by_pid(nodes["products"], id_mappings["product_to_id"])
+    excluded_mask = _excluded_mask(products_df, config)
+    if excluded_mask is not None:
+        is_excluded = np.zeros(data["product"].num_nodes, dtype=bool)
+        is_excluded[products_df["_pid"].to_numpy()] = excluded_mask
+        data["product"].is_excluded = torch.from_numpy(is_excluded)
+
+    if is_3node and entity_to_id:
+        data[entity_type_name].num_nodes = len(entity_to_id)
+        _add_entity_edges(
+            data, edges, id_mappings, entity_type_name,
+            compact=bool(config.get("graph", {}).get("compact_tensors", False)),
+        )
+
+    logger.info(
+        "Scoring graph: %d users, %d products, %d edge types",
+        data["user"].num_nodes, data["product"].num_nodes, len(data.edge_types),
+    )
+    return data
+
+
+def _split_users(
+    ordered_user_ids: np.ndarray | list[Any],
+    users_df: pd.DataFrame,
+    config: dict[str, Any],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Assign users (in internal ID order) to train/val/test boolean masks.
+
+    ``eval.split_method: random`` (default) shuffles each engagement tier with
+    ``RandomState(eval.random_seed)`` and cuts it by ``eval.user_split``, so
+    tiers keep the split ratios. ``hash`` places each user by a seeded hash of
+    their ID instead: assignments do not depend on who else is in the user
+    table, so a user keeps their split as the user base grows (tiers are not
+    stratified, ratios hold in expectation).
+    """
+    eval_cfg = config.get("eval", {})
+    split_ratios = eval_cfg.get("user_split", [0.8, 0.1, 0.1])
+    split_seed = eval_cfg.get("random_seed", 42)
+    method = eval_cfg.get("split_method", "random")
+    n_users = len(ordered_user_ids)
+
+    if method == "hash":
+        hashes = pd.util.hash_array(
+            np.asarray(ordered_user_ids, dtype=object).astype(str),
+            hash_key=f"{split_seed:016d}"[-16:],
+        )
+        # Top 53 bits -> uniform float in [0, 1)
+        position = (hashes >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+        train_mask = position < split_ratios[0]
+        val_mask = ~train_mask & (position < split_ratios[0] + split_ratios[1])
+        return train_mask, val_mask, ~(train_mask | val_mask)
+    if method != "random":
+        raise ValueError(f"eval.split_method must be 'random' or 'hash', got {method!r}")
+
+    # Stratified split by engagement tier if available
+    engagement_col = config.get("columns", {}).get("engagement_tier", "engagement_tier")
+    if engagement_col in users_df.columns:
+        from rec_engine import is_valid_scalar
+
+        raw = (
+            users_df.drop_duplicates(subset=["user_id"], keep="last")
+            .set_index("user_id")[engagement_col]
+        )
+        # Normalize: null/missing tiers get "unknown" bucket
+        tier_by_user = pd.Series(
+            ["unknown" if not is_valid_scalar(v) else str(v).lower() for v in raw.to_numpy()],
+            index=raw.index, dtype=object,
+        )
+        logger.info("Engagement tiers found: %s", sorted(tier_by_user.unique()))
+        tiers = tier_by_user.reindex(ordered_user_ids).fillna("unknown").to_numpy()
+        tier_codes, _ = pd.factorize(tiers, sort=True)
+    else:
+        tier_codes = np.zeros(n_users, dtype=np.int64)
+
+    train_mask = np.zeros(n_users, dtype=bool)
+    val_mask = np.zeros(n_users, dtype=bool)
+    test_mask = np.zeros(n_users, dtype=bool)
+    rng = np.random.RandomState(split_seed)
+
+    # Users grouped by tier (ascending ID within each), tiers in sorted order
+    by_tier = np.argsort(tier_codes, kind="stable")
+    bounds = np.cumsum(np.bincount(tier_codes, minlength=1))[:-1]
+    for tier_indices in np.split(by_tier, bounds):
+        rng.shuffle(tier_indices)
+        n = len(tier_indices)
+        n_train = int(n * split_ratios[0])
+        n_val = int(n * split_ratios[1])
+        train_mask[tier_indices[:n_train]] = True
+        val_mask[tier_indices[n_train:n_train + n_val]] = True
+        test_mask[tier_indices[n_train + n_val:]] = True
+    return train_mask, val_mask, test_mask
+
+
+def _products_by_pid(products_df: pd.DataFrame, product_to_id: Mapping[Any, int]) -> pd.DataFrame:
+    """Deduplicated products with mapped ``_pid``, sorted by it."""
+    products_df = products_df.drop_duplicates(subset=["product_id"]).copy()
+    products_df["_pid"] = as_id_index(product_to_id).encode(products_df["product_id"]).astype(np.int64)
+    products_df = products_df[products_df["_pid"] >= 0]
+    return products_df.sort_values("_pid").reset_index(drop=True)
+
+
+def _encode_edges(
+    src_ids: pd.Series,
+    src_index: IdIndex,
+    dst_ids: pd.Series,
+    dst_index: IdIndex,
+) -> tuple[np.ndarray, torch.Tensor, torch.Tensor]:
+    """Encode an edge list's endpoints, dropping rows with an unknown endpoint.
+
+    Returns:
+        ``(keep, src, dst)``: bool row mask and long tensors for kept rows.
+    """
+    src = src_index.encode(src_ids)
+    dst = dst_index.encode(dst_ids)
+    keep = (src >= 0) & (dst >= 0)
+    return (
+        keep,
+        torch.from_numpy(src[keep].astype(np.int64)),
+        torch.from_numpy(dst[keep].astype(np.int64)),
+    )
+
+
+def _coalesce_interactions(
+    interactions: pd.DataFrame,
+    src: torch.Tensor,
+    dst: torch.Tensor,
+    weights: np.ndarray,
+    n_products: int,
+    how: str,
+    config: dict[str, Any],
+) -> tuple[torch.Tensor, torch.Tensor, np.ndarray]:
+    """Merge repeated (user, product) interaction edges into one edge each.
+
+    ``how`` aggregates the weights of a pair: ``sum``, ``max``, or
+    ``decayed_sum`` (each weight scaled by ``0.5 ** (age / halflife)``, age in
+    days before the latest interaction, halflife from
+    ``graph.time_decay_halflife_days``, times from ``columns.timestamp``).
+
+    Returns:
+        ``(src, dst, weights)`` with one edge per distinct pair, ordered by
+        ``(src, dst)``.
+    """
+    if how not in COALESCE_METHODS:
+        raise ValueError(
+            f"graph.coalesce_interactions must be one of {COALESCE_METHODS}, got {how!r}"
+        )
+    if how == "decayed_sum":
+        ts_col = config.get("columns", {}).get("timestamp", "timestamp")
+        if ts_col not in interactions.columns:
+            raise ValueError(
+                f"graph.coalesce_interactions=decayed_sum needs interaction column '{ts_col}'"
+            )
+        times = pd.to_datetime(interactions[ts_col])
+        if times.isna().any():
+            raise ValueError(f"interaction column '{ts_col}' contains {int(times.isna().sum())} missing times")
+        halflife = float(config.get("graph", {}).get("time_decay_halflife_days", 30))
+        age_days = ((times.max() - times) / pd.Timedelta(days=1)).to_numpy(dtype=np.float64)
+        weights = weights * np.exp2(-age_days / halflife)
+
+    pairs, inverse = np.unique(src.numpy() * n_products + dst.numpy(), return_inverse=True)
+    if how == "max":
+        order = np.argsort(inverse, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+        merged = np.maximum.reduceat(weights[order], starts)
+    else:
+        merged = np.bincount(inverse, weights=weights, minlength=len(pairs))
+
+    logger.info(
+        "Coalesced interaction edges (%s): %d -> %d (%.1f%% fewer)",
+        how, len(weights), len(pairs), 100.0 * (1 - len(pairs) / len(weights)),
+    )
+    return (
+        torch.from_numpy(pairs // n_products),
+        torch.from_numpy(pairs % n_products),
+        merged,
+    )
+
+
+def _excluded_mask(products_df: pd.DataFrame, config: dict[str, Any]) -> np.ndarray | None:
+    """Per-row exclusion flags from the configured ``is_excluded`` column."""
+    exclude_col = config.get("columns", {}).get("is_excluded")
+    if exclude_col and exclude_col in products_df.columns:
+        return products_df[exclude_col].fillna(False).values.astype(bool)
+    return None
+
+
+def _add_entity_edges(
+    data: Any,
+    edges: dict[str, pd.DataFrame],
+    id_mappings: dict[str, dict],
+    entity_type_name: str,
+    *,
+    compact: bool = False,
+) -> None:
+    """Add fitment (product -> entity) and ownership (user -> entity) edges."""
+    user_to_id = as_id_index(id_mappings["user_to_id"])
+    product_to_id = as_id_index(id_mappings["product_to_id"])
+    entity_to_id = as_id_index(id_mappings.get("entity_to_id"))
+
+    fitment_df = edges.get("fitment", pd.DataFrame())
+    if len(fitment_df) > 0:
+        _, fit_src, fit_dst = _encode_edges(
+            fitment_df["product_id"], product_to_id, fitment_df["entity_id"], entity_to_id,
+        )
+        if len(fit_src) > 0:
+            _set_edges(
+                data, ("product", "fits", entity_type_name), fit_src, fit_dst,
+                reverse=(entity_type_name, "rev_fits", "product"), compact=compact,
+            )
+
+    ownership_df = edges.get("ownership", pd.DataFrame())
+    if len(ownership_df) > 0:
+        _, own_src, own_dst = _encode_edges(
+            ownership_df["user_id"], user_to_id, ownership_df["entity_id"], entity_to_id,
+        )
+        if len(own_src) > 0:
+            _set_edges(
+                data, ("user", "owns", entity_type_name), own_src, own_dst,
+                reverse=(entity_type_name, "rev_owns", "user"), compact=compact,
+            )
+
+
+def _set_edges(
+    data: Any,
+    edge_type: tuple[str, str, str],
+    src: torch.Tensor,
+    dst: torch.Tensor,
+    weight: torch.Tensor | None = None,
+    *,
+    reverse: tuple[str, str, str] | None = None,
+    compact: bool = False,
+) -> None:
+    """Store ``src -> dst`` edges on ``edge_type`` (and mirrored on ``reverse``).
+
+    With ``compact``, indices are int32 and weights fp16, and the reverse
+    relation shares storage with the forward one: both are views of one
+    ``[src, dst, src]`` buffer. Consumers upcast at the kernel boundary.
+    Weights beyond the fp16 range stay float32.
+    """
+    if compact:
+        if reverse is not None:
+            buffer = torch.stack([src, dst, src]).to(torch.int32)
+            edge_index, rev_index = buffer[:2], buffer[1:]
+        else:
+            edge_index = torch.stack([src, dst]).to(torch.int32)
+        if weight is not None:
+            if weight.numel() and float(weight.max()) > torch.finfo(torch.float16).max:
+                logger.warning("%s edge weights exceed the fp16 range; keeping float32", edge_type)
+            else:
+                weight = weight.half()
+    else:
+        edge_index = torch.stack([src, dst])
+        if reverse is not None:
+            rev_index = torch.stack([dst, src])
+
+    data[edge_type].edge_index = edge_index
+    if weight is not None:
+        data[edge_type].edge_weight = weight
+    if reverse is not None:
+        data[reverse].edge_index = rev_index
+        if weight is not None:
+            data[reverse].edge_weight = weight
+
+
+def graph_nbytes(data: Any) -> int:
+    """Bytes held by a graph's tensors, counting shared storage once."""
+    seen: set[int] = set()
+    total = 0
+    for store in data.stores:
+        for value in store.values():
+            if isinstance(value, torch.Tensor):
+                storage = value.untyped_storage()
+                if storage.data_ptr() not in seen:
+                    seen.add(storage.data_ptr())
+                    total += storage.nbytes()
+    return total
+
+
 def _validate_edge_weights(weights: torch.Tensor, edge_name: str) -> None:
     """Check edge weights are finite and non-negative."""
     if not torch.isfinite(weights).all():
@@ -426,6 +632,7 @@ def _log_graph_stats(data: Any, split_masks: dict) -> None:
     for edge_type in data.edge_types:
         ei = data[edge_type].edge_index
         logger.info("  %s: %d edges", edge_type, ei.shape[1])
+    logger.info("  Tensor memory: %.1f MB", graph_nbytes(data) / 1e6)
     logger.info(
         "  User split: train=%d, val=%d, test=%d",
         split_masks["train_mask"].sum().item(),
@@ -0,0 +1,264 @@
+"""On-disk cache of built graphs keyed by an input fingerprint.
+
+``build_hetero_graph`` is a pure function of the node/edge tables, the ID
+mappings and the graph-relevant config sections, yet train, evaluate and
+score each rebuild it (ID mapping, label encoding, normalization, user
+split, edge tensors). With ``graph.cache_dir`` set, the first build is
+written to ``<cache_dir>/<fingerprint>/`` and later runs on identical inputs
+load it instead of building.
+
+The fingerprint also covers the builder's identity (module and qualified
+name) and a hash of its module's source, since a changed builder turns the
+same inputs into a different graph: editing the builder module invalidates
+its cached graphs without any manual version bump.
+
+Entry layout::
+
+    manifest.json  # format version, fingerprint, node counts, metadata
+    tensors.pt     # flat {key: tensor} dict, loaded with mmap=True
+
+Only tensors go into ``tensors.pt`` (loaded with ``weights_only=True``);
+metadata is JSON, with label encoders stored as their ``classes_``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import shutil
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.preprocessing import LabelEncoder
+
+if TYPE_CHECKING:
+    from torch_geometric.data import HeteroData
+
+logger = logging.getLogger(__name__)
+
+GRAPH_CACHE_FORMAT_VERSION = 1
+
+# Config sections read by the graph builders; other sections (model,
+# training, output, ...) do not change the graph.
+_CONFIG_SECTIONS = ("topology", "columns", "entity", "graph", "eval")
+
+# Keys inside the sections that only control caching itself
+_IGNORED_KEYS = {("graph", "cache_dir")}
+
+_SEP = "|"
+
+GraphBuild = tuple["HeteroData", dict[str, torch.Tensor], dict[str, Any]]
+
+
+def _hash_frame(digest: Any, df: pd.DataFrame) -> None:
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    digest.update(json.dumps([str(t) for t in df.dtypes]).encode())
+    digest.update(str(len(df)).encode())
+    if len(df) and len(df.columns):
+        # Object columns may mix types; hash their string form
+        frame = df.apply(lambda s: s.astype(str) if s.dtype == object else s)
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+
+
+def graph_fingerprint(
+    nodes: dict[str, pd.DataFrame],
+    edges: dict[str, pd.DataFrame],
+    id_mappings: dict[str, dict],
+    config: dict[str, Any],
+    builder: Callable[..., GraphBuild] | None = None,
+) -> str:
+    """SHA-256 over the builder, input tables, ID mappings and graph config sections.
+
+    The builder contributes its module, qualified name and a hash of its
+    module's source (``_builder_source_hash``).
+    """
+    digest = hashlib.sha256()
+    digest.update(f"builder/{_builder_name(builder)}/{_builder_source_hash(builder)}".encode())
+    for group_name, group in (("nodes", nodes), ("edges", edges)):
+        for name in sorted(group):
+            digest.update(f"{group_name}/{name}".encode())
+            _hash_frame(digest, group[name])
+    for key in sorted(id_mappings):
+        digest.update(key.encode())
+        ordered = [raw for raw, _ in sorted(id_mappings[key].items(), key=lambda kv: kv[1])]
+        digest.update(json.dumps(ordered, default=str).encode())
+    relevant = {}
+    for section in _CONFIG_SECTIONS:
+        value = config.get(section)
+        if isinstance(value, dict):
+            value = {k: v for k, v in value.items() if (section, k) not in _IGNORED_KEYS}
+        relevant[section] = value
+    digest.update(json.dumps(relevant, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _builder_name(builder: Callable[..., Any] | None) -> str:
+    if builder is None:
+        return ""
+    # Callable instances have no __qualname__ of their own
+    qualname = getattr(builder, "__qualname__", type(builder).__qualname__)
+    return f"{builder.__module__}.{qualname}"
+
+
+def _builder_source_hash(builder: Callable[..., Any] | None) -> str:
+    """SHA-256 of the source of the module defining ``builder``.
+
+    Falls back to the builder's own source when its module has none on
+    disk, and to ``""`` when neither is available (e.g. a builtin).
+    """
+    if builder is None:
+        return ""
+    # Callable instances are defined by their class
+    target = builder if inspect.isroutine(builder) or inspect.isclass(builder) else type(builder)
+    for obj in (inspect.getmodule(target), target):
+        if obj is None:
+            continue
+        try:
+            source = inspect.getsource(obj)
+        except (OSError, TypeError):
+            continue
+        return hashlib.sha256(source.encode()).hexdigest()
+    return ""
+
+
+def _encode_metadata(value: Any) -> Any:
+    if isinstance(value, LabelEncoder):
+        return {"__label_encoder__": np.asarray(value.classes_).tolist()}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode_metadata(v) for v in value]}
+    if isinstance(value, dict):
+        return {k: _encode_metadata(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode_metadata(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode_metadata(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "__label_encoder__" in value:
+            encoder = LabelEncoder()
+            encoder.classes_ = np.asarray(value["__label_encoder__"])
+            return encoder
+        if "__tuple__" in value:
+            return tuple(_decode_metadata(v) for v in value["__tuple__"])
+        return {k: _decode_metadata(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_metadata(v) for v in value]
+    return value
+
+
+def save_graph(
+    directory: str | Path,
+    data: HeteroData,
+    split_masks: dict[str, torch.Tensor],
+    metadata: dict[str, Any],
+    fingerprint: str,
+) -> Path:
+    """Write one cache entry to ``directory`` (replaced atomically)."""
+    out = Path(directory)
+    tensors: dict[str, torch.Tensor] = {}
+    num_nodes: dict[str, int] = {}
+    for node_type in data.node_types:
+        store = data[node_type]
+        num_nodes[node_type] = int(store.num_nodes)
+        for attr, value in store.items():
+            if isinstance(value, torch.Tensor):
+                tensors[_SEP.join(("node", node_type, attr))] = value
+    for edge_type in data.edge_types:
+        for attr, value in data[edge_type].items():
+            if isinstance(value, torch.Tensor):
+                tensors[_SEP.join(("edge", *edge_type, attr))] = value
+    for name, mask in split_masks.items():
+        tensors[_SEP.join(("split", name))] = mask
+
+    manifest = {
+        "format_version": GRAPH_CACHE_FORMAT_VERSION,
+        "fingerprint": fingerprint,
+        "num_nodes": num_nodes,
+        "metadata": _encode_metadata(metadata),
+    }
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=out.parent, prefix=f".{out.name}."))
+    try:
+        torch.save({k: v.detach().cpu().contiguous() for k, v in tensors.items()}, tmp / "tensors.pt")
+        (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        if out.exists():
+            shutil.rmtree(out)
+        tmp.rename(out)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    logger.info("Saved graph cache %s (%d tensors)", out, len(tensors))
+    return out
+
+
+def load_graph(directory: str | Path, fingerprint: str | None = None) -> GraphBuild | None:
+    """Load a cache entry; ``None`` if missing, stale or of another format.
+
+    Tensors are memory-mapped from ``tensors.pt``.
+    """
+    from torch_geometric.data import HeteroData
+
+    src = Path(directory)
+    manifest_path = src / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("format_version") != GRAPH_CACHE_FORMAT_VERSION:
+        return None
+    if fingerprint is not None and manifest.get("fingerprint") != fingerprint:
+        return None
+
+    tensors = torch.load(src / "tensors.pt", mmap=True, weights_only=True)
+    data = HeteroData()
+    for node_type, n in manifest["num_nodes"].items():
+        data[node_type].num_nodes = n
+    split_masks: dict[str, torch.Tensor] = {}
+    for key, tensor in tensors.items():
+        kind, *parts = key.split(_SEP)
+        if kind == "node":
+            node_type, attr = parts
+            data[node_type][attr] = tensor
+        elif kind == "edge":
+            src_type, rel, dst_type, attr = parts
+            data[src_type, rel, dst_type][attr] = tensor
+        else:
+            split_masks[parts[0]] = tensor
+    return data, split_masks, _decode_metadata(manifest["metadata"])
+
+
+def cached_build(
+    builder: Callable[..., GraphBuild],
+    nodes: dict[str, pd.DataFrame],
+    edges: dict[str, pd.DataFrame],
+    id_mappings: dict[str, dict],
+    config: dict[str, Any],
+) -> GraphBuild:
+    """``builder(nodes, edges, id_mappings, config)`` through the graph cache.
+
+    Without ``graph.cache_dir`` this is a plain ``builder`` call.
+    """
+    cache_dir = config.get("graph", {}).get("cache_dir")
+    if not cache_dir:
+        return builder(nodes, edges, id_mappings, config)
+
+    fingerprint = graph_fingerprint(nodes, edges, id_mappings, config, builder)
+    entry = Path(cache_dir) / fingerprint[:32]
+    cached = load_graph(entry, fingerprint)
+    if cached is not None:
+        logger.info("Graph cache hit: %s", entry)
+        return cached
+
+    logger.info("Graph cache miss: building graph (fingerprint %s)", fingerprint[:12])
+    data, split_masks, metadata = builder(nodes, edges, id_mappings, config)
+    save_graph(entry, data, split_masks, metadata, fingerprint)
+    return data, split_masks, metadata
@@ -0,0 +1,120 @@
+"""Raw ID <-> internal integer ID index.
+
+Internal IDs are contiguous (``0..n-1``), so an ID mapping is fully described
+by its keys in ID order. ``IdIndex`` stores exactly that as a ``pd.Index``:
+``encode`` maps whole columns of raw IDs to integer codes with one hash-table
+lookup, ``decode`` is an array take, and there is no per-ID Python dict in
+either direction.
+
+``IdIndex`` is a read-only ``Mapping``, so code written against the old
+``{raw_id: internal_id}`` dicts (``in``, ``[]``, ``.get``, ``.items()``, ``len``)
+keeps working. Plain dicts passed in by callers are converted with
+``IdIndex.from_mapping``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+class IdIndex(Mapping):
+    """Raw IDs in internal-ID order; ``keys_index[i]`` has internal ID ``i``.
+
+    Args:
+        keys: Unique raw IDs ordered by internal ID.
+    """
+
+    def __init__(self, keys: Iterable[Any]):
+        index = keys if isinstance(keys, pd.Index) else pd.Index(list(keys), dtype=object)
+        if not index.is_unique:
+            raise ValueError(f"IdIndex keys must be unique ({int(index.duplicated().sum())} duplicates)")
+        self.keys_index = index
+        self._decode_keys: np.ndarray | None = None
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> IdIndex:
+        """Index of the sorted distinct ``values`` (nulls dropped)."""
+        unique = pd.unique(pd.Series(values, dtype=object).dropna())
+        return cls(pd.Index(np.sort(unique), dtype=object))
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping[Any, int]) -> IdIndex:
+        """Convert a ``{raw_id: internal_id}`` dict (IDs must be ``0..n-1``)."""
+        if isinstance(mapping, IdIndex):
+            return mapping
+        keys = np.empty(len(mapping), dtype=object)
+        ids = np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping))
+        if len(ids) and (ids.min() < 0 or ids.max() >= len(ids) or len(np.unique(ids)) != len(ids)):
+            raise ValueError("ID mapping values must be a permutation of 0..n-1")
+        keys[ids] = list(mapping.keys())
+        return cls(pd.Index(keys, dtype=object))
+
+    def encode(self, values: Any) -> np.ndarray:
+        """Internal IDs of ``values`` as int32 codes; ``-1`` for unknown IDs."""
+        values = values.to_numpy(dtype=object) if isinstance(values, pd.Series) else values
+        return self.keys_index.get_indexer(pd.Index(np.asarray(values, dtype=object))).astype(np.int32)
+
+    def decode(self, codes: Any) -> np.ndarray:
+        """Raw IDs for internal ``codes`` (object array); ``-1`` decodes to None."""
+        if self._decode_keys is None:
+            self._decode_keys = np.append(self.keys_array, None)
+        codes = np.asarray(codes, dtype=np.int64)
+        return self._decode_keys[np.where(codes >= 0, codes, len(self))]
+
+    @property
+    def keys_array(self) -> np.ndarray:
+        """Raw IDs in internal-ID order (object array)."""
+        return self.keys_index.to_numpy(dtype=object)
+
+    def __getitem__(self, key: Any) -> int:
+        try:
+            loc = self.keys_index.get_loc(key)
+        except (KeyError, TypeError):
+            raise KeyError(key) from None
+        if not isinstance(loc, (int, np.integer)):
+            raise KeyError(key)
+        return int(loc)
+
+    def __contains__(self, key: Any) -> bool:
+        try:
+            return key in self.keys_index
+        except TypeError:
+            return False
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.keys_index)
+
+    def __len__(self) -> int:
+        return len(self.keys_index)
+
+    def items(self) -> Iterable[tuple[Any, int]]:  # type: ignore[override]
+        return zip(self.keys_index, range(len(self)))
+
+    def values(self) -> Iterable[int]:  # type: ignore[override]
+        return range(len(self))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, IdIndex):
+            return self.keys_index.equals(other.keys_index)
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"IdIndex(n={len(self)})"
+
+
+def as_id_index(mapping: Mapping[Any, int] | None) -> IdIndex:
+    """``mapping`` as an ``IdIndex`` (``None`` -> empty index)."""
+    if mapping is None:
+        return IdIndex([])
+    return IdIndex.from_mapping(mapping)
+
+
+def as_id_indexes(id_mappings: Mapping[str, Mapping[Any, int]]) -> dict[str, IdIndex]:
+    """Convert every ``*_to_id`` entry of an ``id_mappings`` dict."""
+    return {name: as_id_index(mapping) for name, mapping in id_mappings.items()}
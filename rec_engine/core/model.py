@@ -2,10 +2,15 @@
 
 Generalized from HolleyGAT — edge types and node types are driven by
 topology config rather than hardcoded.
+
+``HeteroLightGCN`` (``model.type: lightgcn``) swaps the attention layers for
+parameter-free normalized propagation over the same edge types; both share
+the input encoders, projection towers and BPR loss of ``TwoTowerGNN``.
 """
 
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Any
 
 import torch
@@ -17,23 +22,24 @@ if TYPE_CHECKING:
     from torch_geometric.data import HeteroData
 
 
-class HeteroGAT(nn.Module):
-    """Two-tower heterogeneous GAT model.
+class TwoTowerGNN(nn.Module, ABC):
+    """Input encoders, projection towers and loss shared by the GNN models.
 
-    Architecture:
-        Input: learned embeddings per node type + gated feature fusion
-        GNN: 2x HeteroConv with GATConv per edge type + skip connections
-        Projection: separate user/product towers -> L2-normalized embeddings
-        Score: dot product
+    Subclasses add their message-passing layers, then create ``user_proj`` /
+    ``product_proj`` with ``_make_projection_heads`` and call ``_init_weights``.
+    They implement ``forward`` and ``inference``; the trainer, evaluator and
+    scorer only use the interface defined here.
     """
 
+    # Message-passing depth; sampled training samples this many hops
+    num_layers = 2
+
     def __init__(
         self,
         n_users: int,
         n_products: int,
         n_entities: int,
         n_categories: int,
-        edge_types: list[tuple[str, str, str]],
         config: dict[str, Any],
         *,
         entity_type_name: str = "entity",
@@ -43,21 +49,11 @@ class HeteroGAT(nn.Module):
         super().__init__()
         model_cfg = config["model"]
         emb_dim = model_cfg["embedding_dim"]
-        hidden_dim = model_cfg["hidden_dim"]
-        num_heads = model_cfg["num_heads"]
-        dropout = model_cfg["dropout"]
-        proj_dropout = model_cfg.get("proj_dropout", 0.2)
-
-        if hidden_dim % num_heads != 0:
-            raise ValueError(
-                f"hidden_dim ({hidden_dim}) must be divisible by num_heads ({num_heads})"
-            )
-        head_dim = hidden_dim // num_heads
 
         self.entity_type_name = entity_type_name
         self.has_entity = n_entities > 0
         self.emb_dim = emb_dim
-        self.hidden_dim = hidden_dim
+        self.hidden_dim = model_cfg["hidden_dim"]
 
         # Learned embeddings
         self.user_embedding = nn.Embedding(n_users, emb_dim)
@@ -86,51 +82,21 @@ class HeteroGAT(nn.Module):
             )
             self.entity_gate = nn.Linear(emb_dim * 2, emb_dim)
 
-        # Build HeteroConv layers from edge types
-        # edge_dim=1 enables edge weight integration in attention
-        def _make_conv(in_dim: int) -> HeteroConv:
-            convs = {}
-            for et in edge_types:
-                convs[et] = GATConv(
-                    in_dim, head_dim, heads=num_heads,
-                    dropout=dropout, add_self_loops=False,
-                    edge_dim=1,
-                )
-            return HeteroConv(convs, aggr="sum")
-
-        self.conv1 = _make_conv(emb_dim)
-        self.conv2 = _make_conv(hidden_dim)
-
-        # Skip connections: per-node-type linear projections for dimension matching
-        # Ensures nodes with no incoming edges retain their embeddings
-        node_types = {"user", "product"}
-        if self.has_entity:
-            node_types.add(entity_type_name)
-        self.skip1 = nn.ModuleDict({
-            nt: nn.Linear(emb_dim, hidden_dim) for nt in sorted(node_types)
-        })
-        self.skip2 = nn.ModuleDict({
-            nt: nn.Linear(hidden_dim, hidden_dim) for nt in sorted(node_types)
-        })
-
-        self.dropout = nn.Dropout(dropout)
-
-        # Projection heads
+    def _make_projection_heads(self, in_dim: int, proj_dropout: float) -> None:
+        """Separate user/product towers: ``in_dim`` -> ``hidden_dim`` -> ``emb_dim``."""
         self.user_proj = nn.Sequential(
-            nn.Linear(hidden_dim, hidden_dim),
+            nn.Linear(in_dim, self.hidden_dim),
             nn.ReLU(),
             nn.Dropout(proj_dropout),
-            nn.Linear(hidden_dim, emb_dim),
+            nn.Linear(self.hidden_dim, self.emb_dim),
         )
         self.product_proj = nn.Sequential(
-            nn.Linear(hidden_dim, hidden_dim),
+            nn.Linear(in_dim, self.hidden_dim),
             nn.ReLU(),
             nn.Dropout(proj_dropout),
-            nn.Linear(hidden_dim, emb_dim),
+            nn.Linear(self.hidden_dim, self.emb_dim),
         )
 
-        self._init_weights()
-
     def _init_weights(self):
         """Xavier initialization for embeddings."""
         nn.init.xavier_uniform_(self.user_embedding.weight)
@@ -149,23 +115,30 @@ class HeteroGAT(nn.Module):
         gate = torch.sigmoid(gate_linear(torch.cat([embedding, features], dim=1)))
         return gate * embedding + (1 - gate) * features
 
+    @staticmethod
+    def _embedding_rows(embedding: nn.Embedding, store: Any) -> torch.Tensor:
+        """Learned embeddings of a node store; sampled subgraphs carry ``n_id``."""
+        n_id = getattr(store, "n_id", None)
+        return embedding.weight if n_id is None else embedding(n_id)
+
     def get_initial_embeddings(self, data: HeteroData) -> dict[str, torch.Tensor]:
         """Compute initial node embeddings before GNN layers."""
         # User: learned embedding only
-        user_x = self.user_embedding.weight
+        user_x = self._embedding_rows(self.user_embedding, data["user"])
 
         # Product: gated fusion of learned embedding + feature MLP
         cat_emb = self.category_embedding(data["product"].category_id)
         feat_input = torch.cat([cat_emb, data["product"].x_num], dim=1)
         product_features = self.product_feature_mlp(feat_input)
         product_x = self._gated_fusion(
-            self.product_embedding.weight, product_features, self.product_gate,
+            self._embedding_rows(self.product_embedding, data["product"]),
+            product_features, self.product_gate,
         )
 
         x_dict = {"user": user_x, "product": product_x}
 
         if self.has_entity:
-            entity_emb = self.entity_embedding.weight
+            entity_emb = self._embedding_rows(self.entity_embedding, data[self.entity_type_name])
             if self.has_entity_features and hasattr(data[self.entity_type_name], "x"):
                 entity_features = self.entity_feature_mlp(data[self.entity_type_name].x)
                 entity_x = self._gated_fusion(entity_emb, entity_features, self.entity_gate)
@@ -175,6 +148,138 @@ class HeteroGAT(nn.Module):
 
         return x_dict
 
+    def _project(
+        self, user_x: torch.Tensor, product_x: torch.Tensor, chunk_size: int | None = None,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Projection towers + L2 normalization, optionally ``chunk_size`` rows at a time."""
+        if chunk_size is None:
+            return (
+                F.normalize(self.user_proj(user_x), dim=1),
+                F.normalize(self.product_proj(product_x), dim=1),
+            )
+        user_embs = torch.cat([F.normalize(self.user_proj(c), dim=1) for c in user_x.split(chunk_size)])
+        product_embs = torch.cat([
+            F.normalize(self.product_proj(c), dim=1) for c in product_x.split(chunk_size)
+        ])
+        return user_embs, product_embs
+
+    @abstractmethod
+    def forward(self, data: HeteroData) -> tuple[torch.Tensor, torch.Tensor]:
+        """L2-normalized user and product embeddings."""
+        ...
+
+    @abstractmethod
+    def inference(self, data: HeteroData, chunk_size: int = 65536) -> tuple[torch.Tensor, torch.Tensor]:
+        """Eval-mode ``forward`` in chunks of ``chunk_size`` destination nodes."""
+        ...
+
+    def embed(self, data: HeteroData, chunk_size: int | None = None) -> tuple[torch.Tensor, torch.Tensor]:
+        """Eval-mode embeddings: ``inference`` if ``chunk_size`` is set, else ``forward``."""
+        self.eval()
+        if chunk_size:
+            return self.inference(data, chunk_size)
+        return self(data)
+
+    @staticmethod
+    def score(user_embs: torch.Tensor, product_embs: torch.Tensor) -> torch.Tensor:
+        """Compute dot product scores between user and product embeddings."""
+        return torch.mm(user_embs, product_embs.t())
+
+    @staticmethod
+    def bpr_loss(
+        pos_scores: torch.Tensor,
+        neg_scores: torch.Tensor,
+        weights: torch.Tensor | None = None,
+    ) -> torch.Tensor:
+        """BPR pairwise ranking loss, optionally weighted by interaction strength.
+
+        When weights are provided, the loss is normalized by the sum of weights
+        (not the count of pairs) so that the gradient magnitude is invariant to
+        global weight scaling — only *relative* weights matter.
+        """
+        per_pair = -F.logsigmoid(pos_scores - neg_scores)
+        if weights is not None:
+            return (per_pair * weights).sum() / weights.sum().clamp(min=1e-8)
+        return per_pair.mean()
+
+
+class HeteroGAT(TwoTowerGNN):
+    """Two-tower heterogeneous GAT model.
+
+    Architecture:
+        Input: learned embeddings per node type + gated feature fusion
+        GNN: 2x HeteroConv with GATConv per edge type + skip connections
+        Projection: separate user/product towers -> L2-normalized embeddings
+        Score: dot product
+    """
+
+    def __init__(
+        self,
+        n_users: int,
+        n_products: int,
+        n_entities: int,
+        n_categories: int,
+        edge_types: list[tuple[str, str, str]],
+        config: dict[str, Any],
+        *,
+        entity_type_name: str = "entity",
+        product_num_features: int = 3,
+        entity_num_features: int = 0,
+    ):
+        model_cfg = config["model"]
+        emb_dim = model_cfg["embedding_dim"]
+        hidden_dim = model_cfg["hidden_dim"]
+        num_heads = model_cfg["num_heads"]
+        dropout = model_cfg["dropout"]
+        proj_dropout = model_cfg.get("proj_dropout", 0.2)
+
+        if hidden_dim % num_heads != 0:
+            raise ValueError(
+                f"hidden_dim ({hidden_dim}) must be divisible by num_heads ({num_heads})"
+            )
+        head_dim = hidden_dim // num_heads
+
+        super().__init__(
+            n_users, n_products, n_entities, n_categories, config,
+            entity_type_name=entity_type_name,
+            product_num_features=product_num_features,
+            entity_num_features=entity_num_features,
+        )
+
+        # Build HeteroConv layers from edge types
+        # edge_dim=1 enables edge weight integration in attention
+        def _make_conv(in_dim: int) -> HeteroConv:
+            convs = {}
+            for et in edge_types:
+                convs[et] = GATConv(
+                    in_dim, head_dim, heads=num_heads,
+                    dropout=dropout, add_self_loops=False,
+                    edge_dim=1,
+                )
+            return HeteroConv(convs, aggr="sum")
+
+        self.conv1 = _make_conv(emb_dim)
+        self.conv2 = _make_conv(hidden_dim)
+
+        # Skip connections: per-node-type linear projections for dimension matching
+        # Ensures nodes with no incoming edges retain their embeddings
+        node_types = {"user", "product"}
+        if self.has_entity:
+            node_types.add(entity_type_name)
+        self.skip1 = nn.ModuleDict({
+            nt: nn.Linear(emb_dim, hidden_dim) for nt in sorted(node_types)
+        })
+        self.skip2 = nn.ModuleDict({
+            nt: nn.Linear(hidden_dim, hidden_dim) for nt in sorted(node_types)
+        })
+
+        self.dropout = nn.Dropout(dropout)
+
+        # Projection heads
+        self._make_projection_heads(hidden_dim, proj_dropout)
+
+        self._init_weights()
+
     def forward(self, data: HeteroData) -> tuple[torch.Tensor, torch.Tensor]:
         """Forward pass producing L2-normalized user and product embeddings."""
         x_dict = self.get_initial_embeddings(data)
@@ -184,10 +289,11 @@ class HeteroGAT(nn.Module):
         for edge_type in data.edge_types:
             store = data[edge_type]
             if hasattr(store, "edge_index"):
-                edge_index_dict[edge_type] = store.edge_index
+                # Compact graphs store int32/fp16; convs need int64/fp32
+                edge_index_dict[edge_type] = store.edge_index.long()
                 if hasattr(store, "edge_weight"):
                     # GATConv expects [num_edges, edge_dim] shape
-                    edge_attr_dict[edge_type] = store.edge_weight.unsqueeze(-1)
+                    edge_attr_dict[edge_type] = store.edge_weight.float().unsqueeze(-1)
 
         conv_kwargs = {}
         if edge_attr_dict:
@@ -210,29 +316,229 @@ class HeteroGAT(nn.Module):
             x_dict[key] = F.elu(conv_out + self.skip2[key](x_in[key]))
 
         # Project and normalize
-        user_embs = F.normalize(self.user_proj(x_dict["user"]), dim=1)
-        product_embs = F.normalize(self.product_proj(x_dict["product"]), dim=1)
+        return self._project(x_dict["user"], x_dict["product"])
 
+    @torch.no_grad()
+    def inference(self, data: HeteroData, chunk_size: int = 65536) -> tuple[torch.Tensor, torch.Tensor]:
+        """Eval-mode ``forward`` computed layer by layer in destination-node chunks.
+
+        Each layer is finished for every node before the next one starts,
+        and within a layer only ``chunk_size`` destination nodes (plus the
+        source rows their edges touch) are transformed at a time. Peak memory
+        is the stored input and output of one layer plus one chunk, instead
+        of every intermediate of ``forward`` for the whole graph.
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        was_training = self.training
+        self.eval()
+        try:
+            adjacency = _dst_adjacency(data)
+            x_dict = self.get_initial_embeddings(data)
+            for conv, skip in ((self.conv1, self.skip1), (self.conv2, self.skip2)):
+                x_dict = {
+                    node_type: self._layer_in_chunks(conv, skip, x_dict, adjacency, node_type, chunk_size)
+                    for node_type in x_dict
+                }
+            user_embs, product_embs = self._project(x_dict["user"], x_dict["product"], chunk_size)
+        finally:
+            self.train(was_training)
         return user_embs, product_embs
 
     @staticmethod
-    def score(user_embs: torch.Tensor, product_embs: torch.Tensor) -> torch.Tensor:
-        """Compute dot product scores between user and product embeddings."""
-        return torch.mm(user_embs, product_embs.t())
+    def _layer_in_chunks(
+        conv: HeteroConv,
+        skip: nn.ModuleDict,
+        x_dict: dict[str, torch.Tensor],
+        adjacency: dict[tuple[str, str, str], tuple[torch.Tensor, ...]],
+        node_type: str,
+        chunk_size: int,
+    ) -> torch.Tensor:
+        """One conv + skip + ELU layer for ``node_type``, ``chunk_size`` nodes at a time."""
+        x = x_dict[node_type]
+        # keys(), not iteration: PyG's ModuleDict iterates its mangled string keys
+        edge_types = [et for et in conv.convs.keys() if et[2] == node_type and et in adjacency]
+        out = x.new_empty(x.shape[0], skip[node_type].out_features)
+        for start in range(0, x.shape[0], chunk_size):
+            end = min(start + chunk_size, x.shape[0])
+            x_dst = x[start:end]
+            h = skip[node_type](x_dst)
+            for et in edge_types:
+                order, indptr, src, dst, weight = adjacency[et]
+                edges = order[int(indptr[start]):int(indptr[end])]
+                src_nodes, src_local = torch.unique(src[edges], return_inverse=True)
+                kwargs = {} if weight is None else {"edge_attr": weight[edges].float().unsqueeze(-1)}
+                h = h + conv.convs[et](
+                    (x_dict[et[0]][src_nodes], x_dst),
+                    torch.stack([src_local, dst[edges] - start]),
+                    size=(len(src_nodes), end - start),
+                    **kwargs,
+                )
+            out[start:end] = F.elu(h)
+        return out
+
+
+class HeteroLightGCN(TwoTowerGNN):
+    """Two-tower heterogeneous LightGCN model.
+
+    Architecture:
+        Input: learned embeddings per node type + gated feature fusion
+        GNN: ``model.num_layers`` rounds of parameter-free propagation; per
+            edge type a symmetric degree-normalized (edge-weighted) sum,
+            averaged over the edge types into each node type
+        Readout: mean of the input and every propagated layer
+        Projection: separate user/product towers -> L2-normalized embeddings
+        Score: dot product
+
+    No attention is computed, so a training step costs one sparse
+    aggregation per edge type and layer.
+    """
+
+    def __init__(
+        self,
+        n_users: int,
+        n_products: int,
+        n_entities: int,
+        n_categories: int,
+        edge_types: list[tuple[str, str, str]],
+        config: dict[str, Any],
+        *,
+        entity_type_name: str = "entity",
+        product_num_features: int = 3,
+        entity_num_features: int = 0,
+    ):
+        model_cfg = config["model"]
+        num_layers = int(model_cfg.get("num_layers", 2))
+        if num_layers < 1:
+            raise ValueError(f"model.num_layers must be >= 1, got {num_layers}")
+
+        super().__init__(
+            n_users, n_products, n_entities, n_categories, config,
+            entity_type_name=entity_type_name,
+            product_num_features=product_num_features,
+            entity_num_features=entity_num_features,
+        )
+        self.num_layers = num_layers
+        self.edge_types = [tuple(et) for et in edge_types]
+
+        self._make_projection_heads(self.emb_dim, model_cfg.get("proj_dropout", 0.2))
+
+        self._init_weights()
+
+    def forward(self, data: HeteroData) -> tuple[torch.Tensor, torch.Tensor]:
+        """Forward pass producing L2-normalized user and product embeddings."""
+        x_dict = self.get_initial_embeddings(data)
+        edges = self._normalized_edges(data)
+        total = dict(x_dict)
+        for _ in range(self.num_layers):
+            x_dict = {node_type: self._propagate(x_dict, edges, node_type) for node_type in x_dict}
+            total = {node_type: total[node_type] + x_dict[node_type] for node_type in total}
+        n = self.num_layers + 1
+        return self._project(total["user"] / n, total["product"] / n)
+
+    @torch.no_grad()
+    def inference(self, data: HeteroData, chunk_size: int = 65536) -> tuple[torch.Tensor, torch.Tensor]:
+        """Eval-mode ``forward`` with each layer aggregated ``chunk_size`` destination nodes at a time."""
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        was_training = self.training
+        self.eval()
+        try:
+            x_dict = self.get_initial_embeddings(data)
+            edges = self._normalized_edges(data, by_dst=True)
+            total = {node_type: x.clone() for node_type, x in x_dict.items()}
+            for _ in range(self.num_layers):
+                x_dict = {
+                    node_type: self._propagate(x_dict, edges, node_type, chunk_size)
+                    for node_type in x_dict
+                }
+                for node_type, x in x_dict.items():
+                    total[node_type] += x
+            n = self.num_layers + 1
+            user_embs, product_embs = self._project(total["user"] / n, total["product"] / n, chunk_size)
+        finally:
+            self.train(was_training)
+        return user_embs, product_embs
+
+    def _normalized_edges(
+        self, data: HeteroData, *, by_dst: bool = False,
+    ) -> dict[tuple[str, str, str], tuple[torch.Tensor, ...]]:
+        """Per edge type: ``(src, dst, norm)``, plus ``(order, indptr)`` if ``by_dst``.
+
+        ``norm = w / sqrt(deg_out(src) * deg_in(dst))`` with weighted degrees
+        (``w = 1`` without ``edge_weight``) — LightGCN's symmetric normalization
+        applied per relation.
+        """
+        adjacency = _dst_adjacency(data) if by_dst else None
+        edges = {}
+        for edge_type in self.edge_types:
+            if edge_type not in data.edge_types or "edge_index" not in data[edge_type]:
+                continue
+            store = data[edge_type]
+            src, dst = store.edge_index.long()
+            weight = store.get("edge_weight")
+            weight = torch.ones(len(src), device=src.device) if weight is None else weight.float()
+            n_src = int(data[edge_type[0]].num_nodes)
+            n_dst = int(data[edge_type[2]].num_nodes)
+            deg_src = torch.zeros(n_src, device=src.device).index_add_(0, src, weight)
+            deg_dst = torch.zeros(n_dst, device=src.device).index_add_(0, dst, weight)
+            norm = weight * (deg_src[src] * deg_dst[dst]).clamp(min=1e-12).rsqrt()
+            edges[edge_type] = (src, dst, norm)
+            if adjacency is not None:
+                edges[edge_type] += adjacency[edge_type][:2]
+        return edges
 
     @staticmethod
-    def bpr_loss(
-        pos_scores: torch.Tensor,
-        neg_scores: torch.Tensor,
-        weights: torch.Tensor | None = None,
+    def _propagate(
+        x_dict: dict[str, torch.Tensor],
+        edges: dict[tuple[str, str, str], tuple[torch.Tensor, ...]],
+        node_type: str,
+        chunk_size: int | None = None,
     ) -> torch.Tensor:
-        """BPR pairwise ranking loss, optionally weighted by interaction strength.
+        """One propagation step into ``node_type``; a node type no edge type reaches keeps its input."""
+        x = x_dict[node_type]
+        edge_types = [et for et in edges if et[2] == node_type]
+        if not edge_types:
+            return x
+        if chunk_size is None:
+            out = x.new_zeros(x.shape)
+            for et in edge_types:
+                src, dst, norm = edges[et][:3]
+                out = out.index_add(0, dst, x_dict[et[0]][src] * norm.unsqueeze(-1))
+            return out / len(edge_types)
+
+        out = x.new_zeros(x.shape)
+        for start in range(0, x.shape[0], chunk_size):
+            end = min(start + chunk_size, x.shape[0])
+            h = out[start:end]
+            for et in edge_types:
+                src, dst, norm, order, indptr = edges[et]
+                chunk = order[int(indptr[start]):int(indptr[end])]
+                h.index_add_(0, dst[chunk] - start, x_dict[et[0]][src[chunk]] * norm[chunk].unsqueeze(-1))
+        return out / len(edge_types)
 
-        When weights are provided, the loss is normalized by the sum of weights
-        (not the count of pairs) so that the gradient magnitude is invariant to
-        global weight scaling — only *relative* weights matter.
-        """
-        per_pair = -F.logsigmoid(pos_scores - neg_scores)
-        if weights is not None:
-            return (per_pair * weights).sum() / weights.sum().clamp(min=1e-8)
-        return per_pair.mean()
+
+def _dst_adjacency(data: HeteroData) -> dict[tuple[str, str, str], tuple[torch.Tensor, ...]]:
+    """Per edge type: ``(order, indptr, src, dst, weight)`` with edges grouped by destination.
+
+    ``order[indptr[i]:indptr[i + 1]]`` are the IDs of the edges into node ``i``.
+    """
+    adjacency = {}
+    for edge_type in data.edge_types:
+        store = data[edge_type]
+        if "edge_index" not in store:
+            continue
+        src, dst = store.edge_index.long()
+        order = torch.argsort(dst, stable=True)
+        counts = torch.bincount(dst, minlength=data[edge_type[2]].num_nodes)
+        indptr = torch.zeros(len(counts) + 1, dtype=torch.long, device=dst.device)
+        torch.cumsum(counts, 0, out=indptr[1:])
+        adjacency[edge_type] = (order, indptr, src, dst, store.get("edge_weight"))
+    return adjacency
+
+
+# ``model.type`` -> model class
+MODEL_TYPES: dict[str, type[TwoTowerGNN]] = {
+    "gat": HeteroGAT,
+    "lightgcn": HeteroLightGCN,
+}
@@ -0,0 +1,122 @@
+"""Vectorized fitment-hard negative sampling.
+
+A fitment-hard negative for a training pair ``(user, positive)`` is a product
+that fits one of the user's entities but is not the positive. The fitment
+index (``user -> sorted product IDs``) is held as CSR tensors
+``(indptr, indices)``, so a whole batch is sampled with one offset draw per
+pair instead of a Python loop with per-pair ``randint``/``.item()`` calls.
+
+Optionally, candidates that are any known positive of the user (not only
+the pair's own positive) are rejected via a sorted ``user * n_products +
+product`` key lookup and redrawn for a few vectorized rounds.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from itertools import chain
+
+import numpy as np
+import torch
+
+FitmentCSR = tuple[torch.Tensor, torch.Tensor]
+
+
+def fitment_csr(
+    user_fitment_products: Mapping[int, Sequence[int]],
+    n_users: int,
+    device: torch.device | str | None = None,
+) -> FitmentCSR:
+    """CSR ``(indptr, indices)`` of a ``{user_id: sorted product IDs}`` index.
+
+    Rows must be sorted and duplicate-free (as ``build_fitment_index``
+    returns them); users missing from the mapping get empty rows.
+    """
+    counts = np.zeros(n_users, dtype=np.int64)
+    users = np.fromiter(user_fitment_products.keys(), dtype=np.int64, count=len(user_fitment_products))
+    if len(users) and users.max() >= n_users:
+        raise ValueError(f"user IDs must be < n_users ({n_users}), got {users.max()}")
+    order = np.argsort(users, kind="stable")
+    rows = [user_fitment_products[int(u)] for u in users[order]]
+    counts[users[order]] = [len(row) for row in rows]
+    indptr = np.zeros(n_users + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=int(counts.sum()))
+    return torch.from_numpy(indptr).to(device), torch.from_numpy(indices).to(device)
+
+
+def pair_keys(user_ids: torch.Tensor, product_ids: torch.Tensor, n_products: int) -> torch.Tensor:
+    """Sorted, unique ``user * n_products + product`` keys of (user, product) pairs."""
+    return torch.unique(user_ids.long() * n_products + product_ids.long())
+
+
+def sample_fitment_negatives(
+    user_ids: torch.Tensor,
+    pos_product_ids: torch.Tensor,
+    csr: FitmentCSR,
+    n_products: int,
+    *,
+    known_positive_keys: torch.Tensor | None = None,
+    max_rounds: int = 4,
+) -> torch.Tensor:
+    """One fitment-hard negative per ``(user, positive)`` pair.
+
+    Draws uniformly from the user's fitment row excluding the positive
+    (exactly, by shifting a hit to one of the other ``deg - 1`` slots). Users
+    with no other fitment product get a uniform random product.
+
+    Args:
+        known_positive_keys: Sorted keys from ``pair_keys``; candidates that
+            match are redrawn for up to ``max_rounds`` rounds, then replaced by
+            a uniform random product.
+    """
+    indptr, indices = csr
+    device = user_ids.device
+    users = user_ids.long()
+    pos = pos_product_ids.long()
+    n = len(users)
+    if len(indices) == 0:
+        return torch.randint(n_products, (n,), device=device)
+
+    start = indptr[users]
+    deg = indptr[users + 1] - start
+    first = indices[torch.where(deg > 0, start, 0)]
+    valid = (deg > 1) | ((deg == 1) & (first != pos))
+    candidate = _draw_excluding(indices, start, deg, pos)
+
+    if known_positive_keys is not None and len(known_positive_keys):
+        rejected = valid & _contains(known_positive_keys, users * n_products + candidate)
+        for _ in range(max_rounds):
+            idx = rejected.nonzero(as_tuple=True)[0]
+            if len(idx) == 0:
+                break
+            candidate[idx] = _draw_excluding(indices, start[idx], deg[idx], pos[idx])
+            rejected[idx] = _contains(known_positive_keys, users[idx] * n_products + candidate[idx])
+        valid &= ~rejected
+
+    fallback = ~valid
+    n_fallback = int(fallback.sum())
+    if n_fallback:
+        candidate[fallback] = torch.randint(n_products, (n_fallback,), device=device)
+    return candidate
+
+
+def _draw_excluding(
+    indices: torch.Tensor, start: torch.Tensor, deg: torch.Tensor, pos: torch.Tensor,
+) -> torch.Tensor:
+    """Uniform draw from each CSR row minus ``pos`` (rows with ``deg < 2`` are arbitrary)."""
+    last = (deg - 1).clamp(min=0)
+    # float32 rounding can reach deg for very long rows; clamp to the last slot
+    offset = torch.minimum((torch.rand(len(start), device=start.device) * deg).long(), last)
+    slot = torch.where(deg > 0, start + offset, 0)
+    # Rows are duplicate-free, so a hit is the positive's only slot: move it
+    # to one of the other deg - 1 slots
+    hit = (deg > 0) & (indices[slot] == pos)
+    shift = 1 + torch.minimum((torch.rand(len(start), device=start.device) * last).long(), (last - 1).clamp(min=0))
+    slot = torch.where(hit, start + (offset + shift) % deg.clamp(min=1), slot)
+    return indices[slot]
+
+
+def _contains(sorted_keys: torch.Tensor, keys: torch.Tensor) -> torch.Tensor:
+    pos = torch.searchsorted(sorted_keys, keys).clamp(max=len(sorted_keys) - 1)
+    return sorted_keys[pos] == keys
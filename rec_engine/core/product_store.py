@@ -0,0 +1,169 @@
+"""Columnar product metadata indexed by internal product ID.
+
+Scoring and evaluation look product attributes up by the integer IDs the
+graph uses, so metadata lives in flat arrays rather than per-product dicts:
+float64 prices, integer category codes, and dictionary-encoded display
+strings (name, url, image_url). Every array has one trailing sentinel row at
+index ``n_products`` (``None`` strings, ``NaN`` price) that empty rec slots
+(``-1``) can point at, so output rows are assembled by fancy indexing.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from rec_engine.core.id_index import as_id_index
+
+# Display columns stored as (codes, categories) pairs
+TEXT_COLUMNS = ("name", "url", "image_url")
+
+
+class ProductMetadataStore:
+    """Product attributes as arrays over internal product IDs.
+
+    Products missing from the metadata frame (or columns missing from it)
+    get ``""`` text, price ``0.0`` and category ``""``.
+
+    Args:
+        products_df: Product nodes with ``product_id`` and optional
+            ``price``, category, ``name``, ``url``, ``image_url`` columns.
+        product_to_id: Raw product ID -> internal ID.
+        n_products: Number of product nodes in the graph.
+        category_col: Name of the category column.
+    """
+
+    def __init__(
+        self,
+        products_df: pd.DataFrame,
+        product_to_id: Mapping[Any, int],
+        n_products: int,
+        *,
+        category_col: str = "category",
+    ):
+        index = as_id_index(product_to_id)
+        self.n_products = n_products
+        self.product_ids = np.full(n_products + 1, None, dtype=object)
+        keys = index.keys_array[:n_products]
+        self.product_ids[:len(keys)] = keys
+
+        mapped = index.encode(products_df["product_id"]).astype(np.int64)
+        src = np.flatnonzero((mapped >= 0) & (mapped < n_products))
+        rows = mapped[src]
+
+        def _text(col: str) -> np.ndarray:
+            out = np.full(n_products, "", dtype=object)
+            if col in products_df.columns:
+                out[rows] = products_df[col].fillna("").astype(str).to_numpy()[src]
+            return out
+
+        self.price = np.zeros(n_products + 1, dtype=np.float64)
+        self.price[n_products] = np.nan
+        if "price" in products_df.columns:
+            self.price[rows] = products_df["price"].fillna(0).to_numpy(dtype=np.float64)[src]
+
+        codes, self.categories = pd.factorize(_text(category_col))
+        self.category_codes = codes.astype(np.int64)
+        self.categories = np.asarray(self.categories, dtype=object)
+
+        # Sentinel code -1 -> None via a trailing None category
+        self._text: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for col in TEXT_COLUMNS:
+            text_codes, uniques = pd.factorize(_text(col))
+            text_codes = np.append(text_codes, -1).astype(np.int32)
+            self._text[col] = (text_codes, np.append(np.asarray(uniques, dtype=object), None))
+
+    def __len__(self) -> int:
+        return self.n_products
+
+    @property
+    def category_labels(self) -> np.ndarray:
+        """Category string per product, ``[n_products]`` object array."""
+        return self.categories[self.category_codes]
+
+    def category_of(self, pid: int, default: str = "") -> str:
+        """Category of one internal product ID (``default`` if out of range)."""
+        if 0 <= pid < self.n_products:
+            return self.categories[self.category_codes[pid]]
+        return default
+
+    def column(self, attr: str, idx: np.ndarray) -> np.ndarray:
+        """Values of ``attr`` at internal IDs ``idx``; ``n_products`` is the sentinel.
+
+        ``attr`` is ``product_id``, ``price`` or one of ``TEXT_COLUMNS``.
+        """
+        if attr == "product_id":
+            return self.product_ids[idx]
+        if attr == "price":
+            return self.price[idx]
+        codes, uniques = self._text[attr]
+        return uniques[codes[idx]]
+
+    def row(self, pid: int) -> dict[str, Any]:
+        """All attributes of one product as a dict."""
+        return {
+            "product_id": self.product_ids[pid],
+            "price": float(self.price[pid]),
+            "category": self.category_of(pid),
+            **{col: self.column(col, pid) for col in TEXT_COLUMNS},
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Array bytes (object arrays count pointers, not string payloads)."""
+        size = self.price.nbytes + self.category_codes.nbytes + self.product_ids.nbytes
+        for codes, uniques in self._text.values():
+            size += codes.nbytes + uniques.nbytes
+        return size
+
+    def category_map(self) -> CategoryView:
+        """``{pid: category}`` mapping view for the rule helpers."""
+        return CategoryView(self)
+
+    def metadata_map(self, product_to_id: Mapping[Any, int]) -> ProductMetaView:
+        """``{product_id_str: metadata dict}`` view, built on access."""
+        return ProductMetaView(self, product_to_id)
+
+
+class CategoryView(Mapping):
+    """Read-only ``{internal pid: category}`` over a ``ProductMetadataStore``."""
+
+    def __init__(self, store: ProductMetadataStore):
+        self._store = store
+
+    def __getitem__(self, pid: int) -> str:
+        if not 0 <= pid < self._store.n_products:
+            raise KeyError(pid)
+        return self._store.category_of(pid)
+
+    def get(self, pid: int, default: Any = None) -> Any:
+        return self._store.category_of(pid, default)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._store.n_products))
+
+    def __len__(self) -> int:
+        return self._store.n_products
+
+
+class ProductMetaView(Mapping):
+    """Read-only ``{product_id_str: metadata dict}`` over a ``ProductMetadataStore``."""
+
+    def __init__(self, store: ProductMetadataStore, product_to_id: Mapping[Any, int]):
+        self._store = store
+        self._product_to_id = product_to_id
+
+    def __getitem__(self, pid_str: Any) -> dict[str, Any]:
+        pid = self._product_to_id[pid_str]
+        if not 0 <= pid < self._store.n_products:
+            raise KeyError(pid_str)
+        return self._store.row(pid)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (p for p, pid in self._product_to_id.items() if 0 <= pid < self._store.n_products)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
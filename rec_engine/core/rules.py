@@ -6,14 +6,18 @@ popularity-based fallback selection.
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import torch
 
 
 def apply_slot_reservation_with_diversity(
     ranked_products: Iterable[int],
     fitment_set: set[int],
     excluded_set: set[int] | frozenset[int] | None,
-    category_by_product: dict[int, str],
+    category_by_product: Mapping[int, str],
     *,
     fitment_slots: int = 4,
     excluded_slots: int = 0,
@@ -75,11 +79,129 @@ def apply_slot_reservation_with_diversity(
     return result[:total_slots]
 
 
+def select_top_n_batch(
+    scores: torch.Tensor,
+    category_codes: torch.Tensor,
+    *,
+    total_slots: int = 4,
+    max_per_category: int = 2,
+    overfetch: int = 4,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """Batched top-N selection with a per-category diversity cap.
+
+    Vectorized equivalent of walking each row's candidates in descending score
+    order and greedily taking items until ``total_slots`` are filled, skipping
+    any item whose category already holds ``max_per_category`` picks.
+
+    Only a bounded window of ``total_slots * overfetch`` top candidates is
+    ranked per row. Rows that cannot fill their slots from the window (because
+    of the category cap) are retried with a doubled window until they fill or
+    run out of eligible candidates. Equal scores rank by candidate position,
+    as a stable descending sort would (the order ``select_popularity_fallback``
+    and the per-user reference walk use).
+
+    Args:
+        scores: ``[batch, n_candidates]`` scores. ``-inf`` marks ineligible
+            candidates (excluded, purchased, filtered).
+        category_codes: Integer category per candidate, ``[n_candidates]``
+            (shared) or ``[batch, n_candidates]`` (per row), values >= 0.
+
+    Returns:
+        ``(positions, values)``, both ``[batch, total_slots]``. ``positions``
+        index into the candidate axis and are ``-1`` for unfilled slots, whose
+        ``values`` are ``-inf``.
+    """
+    import torch
+
+    n_rows, n_cols = scores.shape
+    positions = torch.full((n_rows, total_slots), -1, dtype=torch.long)
+    values = torch.full((n_rows, total_slots), float("-inf"), dtype=scores.dtype)
+    if n_rows == 0 or n_cols == 0 or total_slots <= 0:
+        return positions, values
+
+    category_codes = category_codes.to(torch.long)
+    pending = torch.arange(n_rows)
+    window = min(n_cols, max(total_slots * max(overfetch, 1), 1))
+
+    while len(pending) > 0:
+        top_vals, top_idx = _stable_topk(scores[pending], window)
+        if category_codes.dim() == 1:
+            cats = category_codes[top_idx]
+        else:
+            cats = category_codes[pending].gather(1, top_idx)
+        valid = top_vals > float("-inf")
+
+        # Rank of each item within its category among higher-scored valid
+        # items: stable sort by (category, position), then distance from
+        # the start of the category run. Invalid items get their own group.
+        slot = torch.arange(window).expand_as(top_idx)
+        group = torch.where(valid, cats + 1, torch.zeros_like(cats))
+        order = torch.argsort(group * window + slot, dim=1)
+        sorted_group = group.gather(1, order)
+        run_start = torch.ones_like(valid)
+        run_start[:, 1:] = sorted_group[:, 1:] != sorted_group[:, :-1]
+        start_pos = torch.where(run_start, slot, torch.zeros_like(slot)).cummax(dim=1).values
+        rank_in_cat = torch.empty_like(slot).scatter_(1, order, slot - start_pos)
+
+        keep = valid & (rank_in_cat < max_per_category)
+        chosen = keep & (keep.cumsum(dim=1) <= total_slots)
+
+        done = (keep.sum(dim=1) >= total_slots) | ~valid[:, -1]
+        if window >= n_cols:
+            done[:] = True
+
+        if done.any():
+            rows = pending[done]
+            first = torch.argsort(
+                torch.where(chosen[done], slot[done], slot[done] + window), dim=1,
+            )[:, :total_slots]
+            n_take = first.shape[1]
+            picked = chosen[done].gather(1, first)
+            positions[rows, :n_take] = torch.where(
+                picked, top_idx[done].gather(1, first), torch.full_like(first, -1),
+            )
+            values[rows, :n_take] = torch.where(
+                picked, top_vals[done].gather(1, first),
+                torch.full_like(top_vals[done].gather(1, first), float("-inf")),
+            )
+
+        pending = pending[~done]
+        window = min(n_cols, window * 2)
+
+    return positions, values
+
+
+def _stable_topk(scores: torch.Tensor, k: int) -> tuple[torch.Tensor, torch.Tensor]:
+    """Row-wise ``torch.topk`` ordered like a stable descending sort.
+
+    ``topk`` leaves the order of tied scores unspecified, and may keep any of
+    the tied columns at the window edge; here ties go to the lower column.
+    """
+    import torch
+
+    # One extra column shows whether a tie crosses the window edge
+    top_vals, top_idx = torch.topk(scores, min(k + 1, scores.shape[1]), dim=1, sorted=True)
+    straddle = torch.zeros(len(scores), dtype=torch.bool, device=scores.device)
+    if top_vals.shape[1] > k:
+        straddle = torch.isfinite(top_vals[:, k]) & (top_vals[:, k] == top_vals[:, k - 1])
+    top_vals, top_idx = top_vals[:, :k].contiguous(), top_idx[:, :k].contiguous()
+    if straddle.any():
+        # Rare: a tie crosses the window edge; fully sort just those rows
+        rows = straddle.nonzero(as_tuple=True)[0]
+        idx = torch.sort(scores[rows], dim=1, descending=True, stable=True).indices[:, :k]
+        top_idx[rows] = idx
+        top_vals[rows] = scores[rows].gather(1, idx)
+    by_col = torch.argsort(top_idx, dim=1)
+    top_idx, top_vals = top_idx.gather(1, by_col), top_vals.gather(1, by_col)
+    order = torch.sort(top_vals, dim=1, descending=True, stable=True).indices
+    return top_vals.gather(1, order), top_idx.gather(1, order)
+
+
 def select_popularity_fallback(
     popularity_ranked_ids: list[int],
     already_selected: set[int],
     excluded_products: set[int],
-    category_by_product: dict[int, str],
+    category_by_product: Mapping[int, str],
     category_counts: dict[str, int],
     *,
     max_per_category: int = 2,
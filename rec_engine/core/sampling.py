@@ -0,0 +1,170 @@
+"""Heterogeneous neighbour sampling for mini-batch GNN training.
+
+Full-graph training runs every node through both GAT layers for a single
+optimizer step per epoch. ``NeighborSampler`` instead builds, for a batch of
+seed nodes, the subgraph a ``num_layers``-deep model needs: for each hop it
+draws up to ``fanout`` incoming edges per frontier node and relation, then
+relabels the sampled nodes and edges to a compact ``HeteroData``.
+
+Adjacency is kept as per-relation CSR over destination nodes (see
+``rec_engine.core.sparse``), and sampling is vectorized with NumPy, so no
+``pyg-lib``/``torch-sparse`` sampler is required.
+
+Subgraph node stores carry ``n_id`` (sorted global IDs) plus every node-level
+tensor of the full graph sliced to those rows; the models use ``n_id`` to
+look up the learned embeddings.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import torch
+
+from rec_engine.core.sparse import csr_gather, edges_to_csr
+
+if TYPE_CHECKING:
+    from torch_geometric.data import HeteroData
+
+EdgeType = tuple[str, str, str]
+
+
+class NeighborSampler:
+    """Layer-wise neighbour sampler over a heterogeneous graph.
+
+    Args:
+        data: Full graph; any device (adjacency is copied to CPU).
+        fanouts: Edges drawn per destination node at each hop, outermost hop
+            first (``-1`` keeps all). One list for every relation.
+        relation_fanouts: Per-relation overrides keyed by relation name
+            (e.g. ``{"rev_fits": [5, 5]}``).
+        seed: Seed for the sampling RNG.
+    """
+
+    def __init__(
+        self,
+        data: HeteroData,
+        fanouts: Sequence[int],
+        *,
+        relation_fanouts: Mapping[str, Sequence[int]] | None = None,
+        seed: int | None = None,
+    ):
+        self.data = data
+        self.num_layers = len(fanouts)
+        self.rng = np.random.default_rng(seed)
+        relation_fanouts = relation_fanouts or {}
+
+        self.fanouts: dict[EdgeType, list[int]] = {}
+        # edge type -> (indptr over dst nodes, edge IDs, edge src, edge dst)
+        self._csr: dict[EdgeType, tuple[np.ndarray, ...]] = {}
+        for edge_type in data.edge_types:
+            store = data[edge_type]
+            if "edge_index" not in store:
+                continue
+            per_hop = list(relation_fanouts.get(edge_type[1], fanouts))
+            if len(per_hop) != self.num_layers:
+                raise ValueError(
+                    f"fanouts for {edge_type[1]!r} must have {self.num_layers} entries, got {per_hop}"
+                )
+            self.fanouts[edge_type] = per_hop
+            edge_index = store.edge_index.cpu().numpy()
+            # Incoming edges per destination node; indices are edge IDs
+            indptr, edge_ids = edges_to_csr(
+                edge_index[1], np.arange(edge_index.shape[1]),
+                int(data[edge_type[2]].num_nodes), dedup=False,
+            )
+            self._csr[edge_type] = (
+                indptr, edge_ids, edge_index[0].astype(np.int64), edge_index[1].astype(np.int64),
+            )
+
+    def _sample_edges(self, edge_type: EdgeType, dst_nodes: np.ndarray, fanout: int) -> np.ndarray:
+        """Edge IDs of up to ``fanout`` random incoming edges per node."""
+        indptr, edge_ids = self._csr[edge_type][:2]
+        positions, candidates = csr_gather(indptr, edge_ids, dst_nodes)
+        if fanout < 0 or len(candidates) == 0:
+            return candidates
+        counts = np.bincount(positions, minlength=len(dst_nodes))
+        if counts.max() <= fanout:
+            return candidates
+        # Random rank within each node's edges; keep the first ``fanout``
+        order = np.lexsort((self.rng.random(len(candidates)), positions))
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        rank = np.arange(len(candidates)) - starts
+        return candidates[order[rank < fanout]]
+
+    def sample(self, seeds: Mapping[str, torch.Tensor | np.ndarray]) -> HeteroData:
+        """Subgraph around ``seeds`` (``{node_type: global IDs}``).
+
+        Use ``local_ids`` to find the seeds' rows in the result.
+        """
+        from torch_geometric.data import HeteroData
+
+        visited = {
+            node_type: np.unique(_as_numpy(seeds.get(node_type, ())))
+            for node_type in self.data.node_types
+        }
+        frontier = dict(visited)
+        sampled: dict[EdgeType, list[np.ndarray]] = {edge_type: [] for edge_type in self._csr}
+
+        for hop in range(self.num_layers):
+            reached: dict[str, list[np.ndarray]] = {}
+            for edge_type, per_hop in self.fanouts.items():
+                dst_nodes = frontier[edge_type[2]]
+                if len(dst_nodes) == 0:
+                    continue
+                edge_ids = self._sample_edges(edge_type, dst_nodes, per_hop[hop])
+                sampled[edge_type].append(edge_ids)
+                reached.setdefault(edge_type[0], []).append(self._csr[edge_type][2][edge_ids])
+            frontier = {node_type: np.empty(0, dtype=np.int64) for node_type in self.data.node_types}
+            for node_type, found in reached.items():
+                new = np.setdiff1d(np.concatenate(found), visited[node_type])
+                frontier[node_type] = new
+                visited[node_type] = np.union1d(visited[node_type], new)
+
+        sub = HeteroData()
+        for node_type in self.data.node_types:
+            n_id = visited[node_type]
+            store = self.data[node_type]
+            num_nodes = int(store.num_nodes)
+            index = torch.from_numpy(n_id).to(_store_device(store))
+            for attr, value in store.items():
+                if isinstance(value, torch.Tensor) and value.dim() > 0 and value.shape[0] == num_nodes:
+                    sub[node_type][attr] = value[index]
+            sub[node_type].n_id = index
+            sub[node_type].num_nodes = len(n_id)
+
+        for edge_type, chunks in sampled.items():
+            src_type, _, dst_type = edge_type
+            edge_ids = np.unique(np.concatenate(chunks)) if chunks else np.empty(0, dtype=np.int64)
+            store = self.data[edge_type]
+            src, dst = self._csr[edge_type][2][edge_ids], self._csr[edge_type][3][edge_ids]
+            local = np.stack([
+                np.searchsorted(visited[src_type], src),
+                np.searchsorted(visited[dst_type], dst),
+            ])
+            device = store.edge_index.device
+            sub[edge_type].edge_index = torch.from_numpy(local).to(device)
+            if "edge_weight" in store:
+                sub[edge_type].edge_weight = store.edge_weight[torch.from_numpy(edge_ids).to(device)]
+        return sub
+
+
+def local_ids(sub: HeteroData, node_type: str, global_ids: torch.Tensor) -> torch.Tensor:
+    """Rows of ``global_ids`` in a sampled subgraph's ``node_type`` store."""
+    n_id = sub[node_type].n_id
+    return torch.searchsorted(n_id, global_ids.to(n_id.device))
+
+
+def _as_numpy(ids: Any) -> np.ndarray:
+    if isinstance(ids, torch.Tensor):
+        ids = ids.detach().cpu().numpy()
+    return np.asarray(ids, dtype=np.int64)
+
+
+def _store_device(store: Any) -> torch.device:
+    for value in store.values():
+        if isinstance(value, torch.Tensor):
+            return value.device
+    return torch.device("cpu")
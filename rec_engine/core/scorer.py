@@ -6,15 +6,43 @@ No client-specific hardcoding.
 
 from __future__ import annotations
 
+import contextlib
+import copy
 import logging
+import multiprocessing
+from collections.abc import Collection, Iterator, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
 import pandas as pd
 import torch
 
-from rec_engine.core.model import HeteroGAT
-from rec_engine.core.rules import apply_slot_reservation_with_diversity, select_popularity_fallback
+from rec_engine import is_valid_scalar
+from rec_engine.core.ann import IVFIndex, exact_search, recall_at_k
+from rec_engine.core.embeddings import EmbeddingSnapshot
+from rec_engine.core.id_index import IdIndex, as_id_indexes
+from rec_engine.core.incremental import (
+    ScoringFingerprints,
+    combine_hashes,
+    config_fingerprint,
+    hash_groups,
+    hash_rows,
+    hash_values,
+)
+from rec_engine.core.model import TwoTowerGNN
+from rec_engine.core.product_store import ProductMetadataStore
+from rec_engine.core.quantize import (
+    PRECISIONS,
+    QuantizedKeys,
+    quantize,
+    quantize_keys,
+    quantized_scores,
+)
+from rec_engine.core.rules import select_popularity_fallback, select_top_n_batch
+from rec_engine.core.sparse import csr_gather, edges_to_csr
 from rec_engine.plugins import FallbackTier, RecEnginePlugin
 from rec_engine.topology import TopologyStrategy
 
@@ -25,7 +53,87 @@ logger = logging.getLogger(__name__)
 
 
 class QAFailedError(Exception):
-    """Raised when critical QA checks fail."""
+    """Raised when critical QA checks fail.
+
+    ``report`` carries the ``QAReport`` the failure was decided from.
+    """
+
+    def __init__(self, message: str, report: QAReport | None = None):
+        super().__init__(message)
+        self.report = report
+
+
+@dataclass
+class QAReport:
+    """Per-check QA counts for one scoring run.
+
+    Attributes:
+        n_rows: Output rows checked.
+        target_count: Users requested (``None`` when coverage is not checked).
+        n_duplicate_users: Rows whose user already appeared.
+        n_missing_rec1: Rows with no slot-1 recommendation.
+        n_below_min_price: Recs below ``graph.min_price``, per slot.
+        n_order_violations: Non-fallback rows whose scores increase somewhere.
+        n_prefix_violations: Fallback rows whose GNN prefix is not descending.
+        failures: Human-readable message per failed check.
+    """
+
+    n_rows: int = 0
+    target_count: int | None = None
+    n_duplicate_users: int = 0
+    n_missing_rec1: int = 0
+    n_below_min_price: list[int] = field(default_factory=list)
+    n_order_violations: int = 0
+    n_prefix_violations: int = 0
+    failures: list[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "passed": self.passed}
+
+
+# Scorer + embeddings of a scoring worker process (set by _init_worker).
+_WORKER_STATE: tuple[GNNScorer, torch.Tensor, torch.Tensor] | None = None
+
+# Shards per worker: smaller shards even out skewed entity sizes.
+_SHARDS_PER_WORKER = 4
+
+
+def _share_embeddings(embs: torch.Tensor, source: np.ndarray | None) -> torch.Tensor | str:
+    """Picklable worker handle for ``embs``.
+
+    The file path when ``embs`` is a memory-mapped snapshot array
+    (``source``), so workers map the same file; otherwise ``embs`` moved to
+    shared memory, which pickles as a handle rather than a copy.
+    """
+    filename = getattr(source, "filename", None)
+    if filename is not None and embs.data_ptr() == source.ctypes.data and tuple(embs.shape) == source.shape:
+        return str(filename)
+    return embs.share_memory_()
+
+
+def _open_embeddings(handle: torch.Tensor | str) -> torch.Tensor:
+    if isinstance(handle, str):
+        return torch.from_numpy(np.load(handle, mmap_mode="c"))
+    return handle
+
+
+def _init_worker(scorer: GNNScorer, user_embs: torch.Tensor | str, product_embs: torch.Tensor | str) -> None:
+    """Process-pool initializer: keep the scorer and open the shared embeddings."""
+    global _WORKER_STATE
+    torch.set_num_threads(1)
+    _WORKER_STATE = (scorer, _open_embeddings(user_embs), _open_embeddings(product_embs))
+
+
+def _score_shard_in_worker(uids: np.ndarray) -> pd.DataFrame:
+    """Process-pool entry point: score one shard with the worker's scorer."""
+    if _WORKER_STATE is None:
+        raise RuntimeError("Scoring worker started without scorer state")
+    scorer, user_embs, product_embs = _WORKER_STATE
+    return scorer._score_shard(user_embs, product_embs, uids)
 
 
 class GNNScorer:
@@ -33,7 +141,7 @@ class GNNScorer:
 
     def __init__(
         self,
-        model: HeteroGAT,
+        model: TwoTowerGNN | None,
         data: HeteroData,
         id_mappings: dict[str, dict],
         nodes: dict[str, pd.DataFrame],
@@ -43,41 +151,72 @@ class GNNScorer:
         *,
         device: torch.device | None = None,
         user_purchases: dict[str, set[str]] | None = None,
+        embeddings: EmbeddingSnapshot | None = None,
     ):
+        if model is None and embeddings is None:
+            raise ValueError("GNNScorer needs a model or an embedding snapshot")
+        if embeddings is not None:
+            embeddings.check_mappings(id_mappings)
         self.model = model
+        self.embeddings = embeddings
         self.data = data
-        self.id_mappings = id_mappings
+        self.id_mappings = as_id_indexes(id_mappings)
         self.nodes = nodes
         self.config = config
         self.strategy = strategy
         self.plugin = plugin
+        # Default post-rank filters keep everything; skip the calls for them
+        self._has_post_rank_filter = (
+            type(plugin).post_rank_filter is not RecEnginePlugin.post_rank_filter
+            or type(plugin).post_rank_filter_batch is not RecEnginePlugin.post_rank_filter_batch
+        )
         self.device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
         scoring_cfg = config.get("scoring", {})
         self.total_slots = scoring_cfg.get("total_slots", 4)
         self.max_per_category = scoring_cfg.get("max_per_category", 2)
+        self.topn_overfetch = int(scoring_cfg.get("topn_overfetch", 4))
+        self.num_workers = int(scoring_cfg.get("num_workers", 0))
+        self.ann_config = scoring_cfg.get("ann", {})
+        self.ann_index: IVFIndex | None = None
+        self.ann_recall: float | None = None
+        self.precision = str(scoring_cfg.get("precision", "fp32"))
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"scoring.precision must be one of {PRECISIONS}, got {self.precision!r}")
+        self.rerank_window = max(
+            int(scoring_cfg.get("rerank_window", 64)), self.total_slots * self.topn_overfetch,
+        )
+        self.precision_sample = int(scoring_cfg.get("precision_sample", 256))
+        # Candidate product rows in scoring layout at ``precision`` (see _build_candidate_keys)
+        self.candidate_keys: QuantizedKeys | None = None
+        self.precision_overlap: float | None = None
+        self.qa_report: QAReport | None = None
 
         qa_cfg = config.get("output", {}).get("qa", {})
         self.min_users = int(qa_cfg.get("min_users", 0))
         self.min_coverage = float(qa_cfg.get("min_coverage", 0.95))
 
-        # Reverse mappings
-        self.id_to_user = {v: k for k, v in id_mappings["user_to_id"].items()}
-        self.id_to_product = {v: k for k, v in id_mappings["product_to_id"].items()}
-        entity_to_id = id_mappings.get("entity_to_id", {})
-        self.id_to_entity = {v: k for k, v in entity_to_id.items()}
+        # Raw <-> internal ID indexes (internal ID order)
+        self.user_index: IdIndex = self.id_mappings["user_to_id"]
+        self.product_index: IdIndex = self.id_mappings["product_to_id"]
+        self.entity_index: IdIndex = self.id_mappings.get("entity_to_id", IdIndex([]))
+        self.user_id_array = np.full(self.data["user"].num_nodes, None, dtype=object)
+        user_keys = self.user_index.keys_array[:len(self.user_id_array)]
+        self.user_id_array[:len(user_keys)] = user_keys
 
         # Purchase exclusions
         self._build_purchase_exclusions(user_purchases or {})
 
         # Product metadata
         self._build_product_metadata()
+        self.product_id_array = self.product_store.product_ids[:-1]
 
         # Entity mappings (3-node topology)
         self._build_entity_groups()
 
-        # Excluded product set
+        # Excluded product set + static plugin filter -> GNN candidate mask
         self._build_excluded_set()
+        self._build_candidate_mask()
 
         # Popularity index
         self._build_popularity_index()
@@ -87,6 +226,13 @@ class GNNScorer:
         self.fallback_enabled = fallback_cfg.get("enabled", True)
         self.min_recs = scoring_cfg.get("min_recs", 3)
         self.score_sentinel = fallback_cfg.get("score_sentinel", 0.0)
+        self.fallback_tiers = strategy.get_fallback_tiers(
+            plugin, {"topology": config.get("topology", "user-product")},
+        )
+        # (entity IDs, groups, category counts, slots) -> exclusion-free picks
+        self.fallback_cache_size = int(fallback_cfg.get("cache_size", 100_000))
+        self._fallback_cache: dict[tuple, tuple[int, ...]] = {}
+        self._fallback_cache_hits = 0
 
         if not 0 <= self.min_recs <= self.total_slots:
             raise ValueError(
@@ -94,126 +240,190 @@ class GNNScorer:
             )
 
     def _build_product_metadata(self):
-        """Build product_id -> metadata dict from product nodes."""
-        products_df = self.nodes["products"]
-        product_to_id = self.id_mappings["product_to_id"]
+        """Build the array-backed product metadata store from product nodes."""
         category_col = self.config.get("columns", {}).get("category", "category")
-
-        self.product_meta: dict[str, dict] = {}
-        self.category_by_product_id: dict[int, str] = {}
-
-        # Vectorized: extract columns as arrays, iterate once via zip
-        # Optional columns default to empty string if missing from DataFrame
-        n = len(products_df)
-        _empty = np.full(n, "", dtype=object)
-        _zero = np.zeros(n)
-
-        pids_arr = products_df["product_id"].fillna("").to_numpy()
-        prices_arr = products_df["price"].fillna(0).to_numpy() if "price" in products_df.columns else _zero
-        cats_arr = products_df[category_col].fillna("").to_numpy() if category_col in products_df.columns else _empty
-        names_arr = products_df["name"].fillna("").to_numpy() if "name" in products_df.columns else _empty
-        urls_arr = products_df["url"].fillna("").to_numpy() if "url" in products_df.columns else _empty
-        imgs_arr = products_df["image_url"].fillna("").to_numpy() if "image_url" in products_df.columns else _empty
-
-        for i in range(len(pids_arr)):
-            pid_str = str(pids_arr[i])
-            cat = str(cats_arr[i])
-            self.product_meta[pid_str] = {
-                "product_id": pid_str,
-                "price": prices_arr[i],
-                "category": cat,
-                "name": str(names_arr[i]),
-                "url": str(urls_arr[i]),
-                "image_url": str(imgs_arr[i]),
-            }
-            pid = product_to_id.get(pid_str)
-            if pid is not None:
-                self.category_by_product_id[pid] = cat
+        self.product_store = ProductMetadataStore(
+            self.nodes["products"],
+            self.product_index,
+            self.data["product"].num_nodes,
+            category_col=category_col,
+        )
+        self.product_meta = self.product_store.metadata_map(self.product_index)
+        self.category_by_product_id = self.product_store.category_map()
+        # Integer category code per internal product ID for batched selection
+        self.category_codes = torch.from_numpy(self.product_store.category_codes)
+        logger.info(
+            "Product metadata store: %d products, %.1f MB",
+            len(self.product_store), self.product_store.nbytes / 1e6,
+        )
 
     def _build_entity_groups(self):
-        """Build entity -> (user_ids, product_ids) mappings from graph."""
-        self.entity_users: dict[int, list[int]] = {}
-        self.entity_products: dict[int, list[int]] = {}
-
+        """Build user -> entity and entity -> product CSR indexes from graph edges."""
         entity_type_name = self.config.get("entity", {}).get("type_name", "entity")
 
         own_type = ("user", "owns", entity_type_name)
         fits_type = (entity_type_name, "rev_fits", "product")
 
+        n_users = self.data["user"].num_nodes
+        n_entities = len(self.entity_index)
+        if entity_type_name in self.data.node_types:
+            n_entities = max(n_entities, int(self.data[entity_type_name].num_nodes or 0))
+
+        own_src = own_dst = np.empty(0, dtype=np.int64)
         if own_type in self.data.edge_types:
-            own_ei = self.data[own_type].edge_index
-            for u, e in zip(own_ei[0].cpu().numpy(), own_ei[1].cpu().numpy()):
-                self.entity_users.setdefault(int(e), []).append(int(u))
+            own_ei = self.data[own_type].edge_index.cpu().numpy()
+            own_src, own_dst = own_ei[0], own_ei[1]
 
+        fits_src = fits_dst = np.empty(0, dtype=np.int64)
         if fits_type in self.data.edge_types:
-            fits_ei = self.data[fits_type].edge_index
-            for e, p in zip(fits_ei[0].cpu().numpy(), fits_ei[1].cpu().numpy()):
-                self.entity_products.setdefault(int(e), []).append(int(p))
+            fits_ei = self.data[fits_type].edge_index.cpu().numpy()
+            fits_src, fits_dst = fits_ei[0], fits_ei[1]
+
+        if len(own_dst):
+            n_entities = max(n_entities, int(own_dst.max()) + 1)
+        if len(fits_src):
+            n_entities = max(n_entities, int(fits_src.max()) + 1)
+        self.n_entities = n_entities
+
+        self.user_entity_indptr, self.user_entity_indices = edges_to_csr(
+            own_src, own_dst, n_users,
+        )
+        self.entity_product_indptr, self.entity_product_indices = edges_to_csr(
+            fits_src, fits_dst, n_entities,
+        )
 
         # M10: Precompute entity_id → group mapping (avoids O(entities*df_rows) scan)
         self.entity_to_group: dict[int, str] = {}
         group_col = self.config.get("entity", {}).get("group_column")
         if group_col and "entities" in self.nodes:
             entities_df = self.nodes["entities"]
-            entity_to_id_map = self.id_mappings.get("entity_to_id", {})
-            eids_arr = entities_df["entity_id"].to_numpy()
+            eids = self.entity_index.encode(entities_df["entity_id"])
             groups_arr = entities_df[group_col].fillna("").to_numpy() if group_col in entities_df.columns else np.full(len(entities_df), "", dtype=object)
-            for raw_eid, grp in zip(eids_arr, groups_arr):
-                eid = entity_to_id_map.get(raw_eid)
-                if eid is not None:
-                    self.entity_to_group[eid] = str(grp)
+            known = eids >= 0
+            self.entity_to_group = dict(zip(eids[known].tolist(), map(str, groups_arr[known])))
+
+    def _entity_products(self, eid: int) -> np.ndarray:
+        """Fitment product IDs for one entity (CSR row view)."""
+        return self.entity_product_indices[
+            self.entity_product_indptr[eid]:self.entity_product_indptr[eid + 1]
+        ]
+
+    def _user_entity_info(self, uid: int) -> tuple[list[int] | None, list[str] | None]:
+        """Owned entity IDs and entity groups for one user (sorted, for fallback)."""
+        eids = self.user_entity_indices[
+            self.user_entity_indptr[uid]:self.user_entity_indptr[uid + 1]
+        ]
+        if len(eids) == 0:
+            return None, None
+        groups = sorted({
+            g for g in (self.entity_to_group.get(int(e)) for e in eids) if g
+        })
+        return [int(e) for e in eids], groups or None
 
     def _build_purchase_exclusions(self, user_purchases: dict[str, set[str]]):
-        """Build user_id -> set of purchased product_ids for exclusion.
+        """Build the user -> purchased-product CSR index for exclusion.
 
         UIDs are treated as opaque canonical keys (already normalized by
         mode_score). PIDs are whitespace-stripped and then deduped via
-        plugin.dedup_variant() (e.g., "140061B " -> "140061B" -> "140061").
+        plugin.dedup_variant() (e.g., "140061B " -> "140061B" -> "140061"),
+        which runs once per distinct PID string. Purchases of users or
+        products not in the graph are dropped.
         """
-        from rec_engine import is_valid_scalar
+        uid_codes, pid_codes, n_raw = self._resolve_purchases(user_purchases)
+        indptr, indices = edges_to_csr(uid_codes, pid_codes, self.data["user"].num_nodes)
+        self.purchase_indptr: np.ndarray = indptr
+        self.purchase_indices: np.ndarray = indices.astype(np.int32)
+        # Per-call replacements of a user's purchases (see with_purchase_overrides)
+        self.purchase_overrides: dict[int, np.ndarray] = {}
 
-        product_to_id = self.id_mappings["product_to_id"]
-        self.user_excluded_products: dict[str, set[int]] = {}
+        if user_purchases:
+            n_excluded = len(self.purchase_indices)
+            logger.info(
+                "Purchase exclusion: %d users, %d total product exclusions (%d input PIDs unresolved)",
+                int((np.diff(self.purchase_indptr) > 0).sum()), n_excluded, n_raw - n_excluded,
+            )
 
+    def _resolve_purchases(
+        self, user_purchases: dict[str, set[str]],
+    ) -> tuple[np.ndarray, np.ndarray, int]:
+        """``(uids, pids, n_input_pids)`` for the resolvable purchase pairs."""
+        raw_uids: list[Any] = []
+        raw_pids: list[Any] = []
         for raw_uid, product_ids in user_purchases.items():
-            if not is_valid_scalar(raw_uid):
-                continue
-            uid = str(raw_uid)
-            if not uid:
-                continue
-
             # Guard against bare-string (would iterate characters) and
             # non-iterable values (None, int, float)
             if isinstance(product_ids, str):
-                product_ids = {product_ids}
+                product_ids = (product_ids,)
             elif not hasattr(product_ids, "__iter__"):
                 continue
+            n_before = len(raw_pids)
+            raw_pids.extend(product_ids)
+            raw_uids.extend([raw_uid] * (len(raw_pids) - n_before))
+
+        uid_codes = _lookup_ids(raw_uids, self.user_index, lambda uid: uid)
+        pid_codes = _lookup_ids(
+            raw_pids, self.product_index,
+            lambda pid: self.plugin.dedup_variant(pid.strip()),
+        )
+        resolved = (uid_codes >= 0) & (pid_codes >= 0)
+        return uid_codes[resolved], pid_codes[resolved], len(raw_pids)
 
-            pids: set[int] = set()
-            for raw_pid in product_ids:
-                if not is_valid_scalar(raw_pid):
-                    continue
-                deduped = self.plugin.dedup_variant(str(raw_pid).strip())
-                if not deduped:
-                    continue
-                pid = product_to_id.get(deduped)
-                if pid is not None:
-                    pids.add(pid)
-
-            if pids:
-                self.user_excluded_products.setdefault(uid, set()).update(pids)
+    def with_purchase_overrides(self, user_purchases: dict[str, set[str]]) -> GNNScorer:
+        """Shallow copy whose listed users' purchases are replaced by ``user_purchases``.
 
-        if user_purchases:
-            n_excluded = sum(len(pids) for pids in self.user_excluded_products.values())
-            n_input_pids = sum(
-                len(p) if isinstance(p, (set, list, tuple)) else 1
-                for p in user_purchases.values()
-            )
-            n_unresolved = n_input_pids - n_excluded
-            logger.info(
-                "Purchase exclusion: %d users, %d total product exclusions (%d input PIDs unresolved)",
-                len(self.user_excluded_products), n_excluded, n_unresolved,
-            )
+        Keys and values are resolved like the constructor's
+        ``user_purchases``; an empty collection clears a user's exclusions.
+        Users absent from ``user_purchases`` keep their indexed purchases.
+        """
+        scorer = copy.copy(self)
+        scorer.purchase_overrides = dict(self.purchase_overrides)
+        user_to_id = self.user_index
+        for raw_uid in user_purchases:
+            uid = user_to_id.get(str(raw_uid)) if is_valid_scalar(raw_uid) else None
+            if uid is not None:
+                scorer.purchase_overrides[uid] = np.empty(0, dtype=np.int32)
+        uids, pids, _ = self._resolve_purchases(user_purchases)
+        if len(uids):
+            # Sorted, deduped (user, product) keys split into per-user rows
+            n_products = len(self.excluded_mask)
+            keys = np.unique(uids.astype(np.int64) * n_products + pids)
+            key_uids, key_pids = np.divmod(keys, n_products)
+            starts = np.flatnonzero(np.diff(key_uids)) + 1
+            rows = np.split(key_pids.astype(np.int32), starts)
+            for uid, row in zip(key_uids[np.r_[0, starts]].tolist(), rows):
+                scorer.purchase_overrides[uid] = row
+        return scorer
+
+    @property
+    def user_excluded_products(self) -> Mapping[str, set[int]]:
+        """Read-only ``user_id -> purchased product IDs`` view of the CSR index."""
+        return _PurchaseView(self)
+
+    def _purchased(self, uid: int) -> np.ndarray:
+        """Sorted internal product IDs purchased by internal user ``uid``."""
+        override = self.purchase_overrides.get(uid)
+        if override is not None:
+            return override
+        return self.purchase_indices[self.purchase_indptr[uid]:self.purchase_indptr[uid + 1]]
+
+    def _batch_purchases(self, batch_uids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """``(positions, product_ids)`` of purchases for a batch, overrides applied."""
+        rows, pids = csr_gather(self.purchase_indptr, self.purchase_indices, batch_uids)
+        if not self.purchase_overrides:
+            return rows, pids
+        overridden = np.fromiter(
+            (uid in self.purchase_overrides for uid in batch_uids.tolist()),
+            dtype=bool, count=len(batch_uids),
+        )
+        if not overridden.any():
+            return rows, pids
+        keep = ~overridden[rows]
+        extra = [
+            (pos, self.purchase_overrides[int(batch_uids[pos])]) for pos in np.flatnonzero(overridden)
+        ]
+        rows = np.concatenate([rows[keep]] + [np.full(len(p), pos, dtype=np.int64) for pos, p in extra])
+        pids = np.concatenate([pids[keep]] + [p for _, p in extra])
+        return rows, pids
 
     def _build_excluded_set(self):
         """Build set of excluded product IDs."""
@@ -224,26 +434,48 @@ class GNNScorer:
             )
         else:
             self.excluded_product_ids = frozenset()
+        self.excluded_mask = np.zeros(self.data["product"].num_nodes, dtype=bool)
+        if self.excluded_product_ids:
+            self.excluded_mask[list(self.excluded_product_ids)] = True
         logger.info("Excluded products (output): %d", len(self.excluded_product_ids))
 
+    def _build_candidate_mask(self):
+        """Combine exclusions with ``plugin.static_product_mask`` (called once)."""
+        n_products = len(self.excluded_mask)
+        self.category_array = self.product_store.category_labels
+        static_keep = self.plugin.static_product_mask(
+            np.arange(n_products),
+            {"product_str_ids": self.product_id_array, "categories": self.category_array},
+        )
+        self.static_keep_mask = np.ones(n_products, dtype=bool)
+        if static_keep is not None:
+            static_keep = np.asarray(static_keep, dtype=bool)
+            if static_keep.shape != (n_products,):
+                raise ValueError(
+                    f"static_product_mask returned shape {static_keep.shape}, expected ({n_products},)"
+                )
+            self.static_keep_mask = static_keep
+            logger.info("Static plugin filter rejects %d products", int((~static_keep).sum()))
+        self.candidate_mask = ~self.excluded_mask & self.static_keep_mask
+        self.candidate_ids = np.flatnonzero(self.candidate_mask)
+
     def _build_popularity_index(self):
         """Build popularity-ranked product lists for fallback tiers."""
         products_df = self.nodes["products"]
-        product_to_id = self.id_mappings["product_to_id"]
         pop_col = self.config.get("columns", {}).get("popularity", "popularity")
 
-        self.product_popularity: dict[int, float] = {}
-        pids_arr = products_df["product_id"].to_numpy()
-        pops_arr = products_df[pop_col].fillna(0.0).to_numpy() if pop_col in products_df.columns else np.zeros(len(products_df))
-        for raw_pid, pop in zip(pids_arr, pops_arr):
-            pid = product_to_id.get(raw_pid)
-            if pid is not None:
-                self.product_popularity[pid] = float(pop)
+        pids = self.product_index.encode(products_df["product_id"])
+        pops_arr = products_df[pop_col].fillna(0.0).to_numpy(dtype=np.float64) if pop_col in products_df.columns else np.zeros(len(products_df))
+        known = pids >= 0
+        self.product_popularity: dict[int, float] = dict(zip(pids[known].tolist(), pops_arr[known].tolist()))
 
         # Entity-level fitment by popularity
         self.entity_fitment_by_popularity: dict[int, list[int]] = {}
-        for eid, pids in self.entity_products.items():
-            fitment_only = [p for p in pids if p not in self.excluded_product_ids]
+        for eid in range(self.n_entities):
+            pids = self._entity_products(eid)
+            if len(pids) == 0:
+                continue
+            fitment_only = [int(p) for p in pids if self.candidate_mask[p]]
             self.entity_fitment_by_popularity[eid] = sorted(
                 fitment_only, key=lambda p: -self.product_popularity.get(p, 0.0)
             )
@@ -253,31 +485,26 @@ class GNNScorer:
         self.group_fitment_by_popularity: dict[str, list[int]] = {}
         if group_col and "entities" in self.nodes:
             entities_df = self.nodes["entities"]
-            entity_to_id_map = self.id_mappings.get("entity_to_id", {})
             group_products: dict[str, set[int]] = {}
-            eids_arr = entities_df["entity_id"].to_numpy()
+            eids = self.entity_index.encode(entities_df["entity_id"])
             groups_arr = entities_df[group_col].fillna("").to_numpy() if group_col in entities_df.columns else np.full(len(entities_df), "", dtype=object)
-            for raw_eid, grp in zip(eids_arr, groups_arr):
-                group = str(grp)
-                eid = entity_to_id_map.get(raw_eid)
-                if eid is not None:
-                    prods = self.entity_fitment_by_popularity.get(eid, [])
-                    group_products.setdefault(group, set()).update(prods)
+            known = eids >= 0
+            for eid, grp in zip(eids[known].tolist(), groups_arr[known]):
+                prods = self.entity_fitment_by_popularity.get(eid, [])
+                group_products.setdefault(str(grp), set()).update(prods)
             for group, pids in group_products.items():
                 self.group_fitment_by_popularity[group] = sorted(
                     pids, key=lambda p: -self.product_popularity.get(p, 0.0)
                 )
 
         # Global fitment by popularity
-        all_fitment: set[int] = set()
-        for pids in self.entity_products.values():
-            all_fitment.update(p for p in pids if p not in self.excluded_product_ids)
+        all_fitment: set[int] = {
+            int(p) for p in np.unique(self.entity_product_indices)
+            if self.candidate_mask[p]
+        }
         if not all_fitment:
             # 2-node: all non-excluded products
-            all_fitment = {
-                p for p in range(self.data["product"].num_nodes)
-                if p not in self.excluded_product_ids
-            }
+            all_fitment = {int(p) for p in np.flatnonzero(self.candidate_mask)}
         self.global_fitment_by_popularity: list[int] = sorted(
             all_fitment, key=lambda p: -self.product_popularity.get(p, 0.0)
         )
@@ -290,36 +517,80 @@ class GNNScorer:
         excluded_products: set[int] | None,
         category_counts: dict[str, int],
     ) -> list[tuple[int, float, bool]]:
-        """Apply tiered popularity fallback to fill up to min_recs."""
+        """Apply tiered popularity fallback to fill up to min_recs.
+
+        Picks are memoized per (entity IDs, groups, category counts) as if
+        the user had no exclusions, so cold users sharing an entity set reuse
+        one walk. A user's own exclusions and existing recs only invalidate
+        the cached picks from the first one they hit; the walk then resumes
+        with the still-valid prefix, which gives the same picks as an
+        uncached walk (skipped products are never picked, category caps
+        only tighten).
+        """
         slots_needed = self.min_recs - len(existing_recs)
         if slots_needed <= 0:
             return []
 
+        key = (
+            tuple(entity_ids or ()), tuple(entity_groups or ()),
+            tuple(sorted(category_counts.items())), slots_needed,
+        )
+        cached = self._fallback_cache.get(key)
+        if cached is None:
+            cached = tuple(self._popularity_walk(
+                entity_ids, entity_groups, set(), dict(category_counts), slots_needed,
+            ))
+            if self.fallback_cache_size > 0:
+                if len(self._fallback_cache) >= self.fallback_cache_size:
+                    self._fallback_cache.pop(next(iter(self._fallback_cache)))
+                self._fallback_cache[key] = cached
+        else:
+            self._fallback_cache_hits += 1
+
         already_selected = {pid for pid, _, _ in existing_recs}
         excluded = excluded_products or set()
-        fallback_recs: list[tuple[int, float, bool]] = []
-
-        tiers = self.strategy.get_fallback_tiers(
-            self.plugin,
-            {"topology": self.config.get("topology", "user-product")},
+        n_valid = next(
+            (i for i, pid in enumerate(cached) if pid in already_selected or pid in excluded),
+            len(cached),
         )
+        picks = list(cached[:n_valid])
+        if n_valid < len(cached):
+            counts = dict(category_counts)
+            for pid in picks:
+                cat = self.product_store.category_of(pid)
+                counts[cat] = counts.get(cat, 0) + 1
+            picks.extend(self._popularity_walk(
+                entity_ids, entity_groups, already_selected | set(picks) | excluded,
+                counts, slots_needed - n_valid,
+            ))
+        return [(pid, self.score_sentinel, True) for pid in picks]
+
+    def _popularity_walk(
+        self,
+        entity_ids: list[int] | None,
+        entity_groups: list[str] | None,
+        skip: set[int],
+        category_counts: dict[str, int],
+        slots_needed: int,
+    ) -> list[int]:
+        """Walk the fallback tiers' popularity pools in order, skipping ``skip``."""
+        picks: list[int] = []
 
         def _pick_from_pool(pool: list[int]) -> None:
             nonlocal slots_needed
             if slots_needed <= 0:
                 return
-            picks = select_popularity_fallback(
-                pool, already_selected, excluded,
+            new = select_popularity_fallback(
+                pool, skip, set(),
                 self.category_by_product_id, category_counts,
                 max_per_category=self.max_per_category, slots_needed=slots_needed,
                 additional_excluded_ids=self.excluded_product_ids,
             )
-            for pid in picks:
-                fallback_recs.append((pid, self.score_sentinel, True))
-                already_selected.add(pid)
-            slots_needed -= len(picks)
+            picks.extend(new)
+            skip.update(new)
+            slots_needed -= len(new)
 
-        for tier in tiers:
+        for tier in self.fallback_tiers:
             if slots_needed <= 0:
                 break
             if tier == FallbackTier.ENTITY and entity_ids:
@@ -335,7 +606,7 @@ class GNNScorer:
             elif tier == FallbackTier.GLOBAL:
                 _pick_from_pool(self.global_fitment_by_popularity)
 
-        return fallback_recs
+        return picks
 
     def _output_columns(self) -> list[str]:
         """Canonical output schema."""
@@ -358,330 +629,1192 @@ class GNNScorer:
             target_user_ids: Optional set of user IDs to score.
                 If None, scores all users in the graph.
         """
-        self.model.eval()
+        chunks = list(self.iter_score_chunks(target_user_ids, chunk_size=0))
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
+
+    @torch.no_grad()
+    def iter_score_chunks(
+        self,
+        target_user_ids: set[str] | None = None,
+        *,
+        chunk_size: int | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Score target users in fixed-size chunks, yielding one DataFrame each.
+
+        Only one chunk of recommendations is alive at a time, so peak memory
+        is bounded by ``chunk_size`` rather than the number of target users.
+        Fallback runs per chunk; QA (coverage, duplicates, ordering, price
+        floor) accumulates running counters across chunks and raises
+        ``QAFailedError`` after the last chunk has been yielded. The final
+        ``QAReport`` is kept on ``self.qa_report`` either way.
+
+        Args:
+            target_user_ids: Optional set of user IDs to score.
+                If None, scores all users in the graph.
+            chunk_size: Users per chunk. Defaults to ``scoring.chunk_size``;
+                ``0`` scores everything as a single chunk.
+        """
+        if chunk_size is None:
+            chunk_size = int(self.config.get("scoring", {}).get("chunk_size", 0))
+        if chunk_size < 0:
+            raise ValueError(f"chunk_size must be >= 0, got {chunk_size}")
+
+        user_embs, product_embs = self.warm()
+
+        if target_user_ids is None:
+            target_user_ids = self.user_index.keys_array
+        target_uids = self._target_uids(target_user_ids)
+
+        qa = _QAAccumulator(self)
+        n_chunks = 0
+        for df in self._iter_scored(user_embs, product_embs, target_uids, chunk_size):
+            qa.update(df)
+            n_chunks += 1
+            yield df
+
+        logger.info("Scored %d users in %d chunk(s)", qa.n_rows, n_chunks)
+        self.qa_report = qa.raise_on_failures(target_count=len(target_user_ids))
+
+    @torch.no_grad()
+    def warm(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """Compute embeddings and build the per-embedding scoring state.
+
+        Builds the ANN index (``scoring.ann``) and the candidate key matrix
+        (``scoring.precision``) for the returned embeddings; pass them to
+        ``score_users`` to score users without redoing any of that work.
+
+        Returns:
+            ``(user_embs, product_embs)`` on CPU.
+        """
+        user_embs, product_embs = self._compute_embeddings()
+        self._build_ann_index(user_embs, product_embs)
+        self._build_candidate_keys(user_embs, product_embs)
+        return user_embs, product_embs
+
+    @torch.no_grad()
+    def score_users(
+        self,
+        user_ids: Collection[str],
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+    ) -> pd.DataFrame:
+        """Score canonical ``user_ids`` against embeddings from ``warm``.
+
+        Runs the per-user scoring and fallback path only: no chunking and
+        no QA. Users not in the graph are skipped.
+
+        Returns:
+            DataFrame in ``_output_columns()`` order, sorted by internal user ID.
+        """
+        return self._score_shard(user_embs, product_embs, self._target_uids(user_ids))
+
+    def _target_uids(self, target_user_ids: Collection[str]) -> np.ndarray:
+        """Sorted unique internal IDs of the target users present in the graph."""
+        if not isinstance(target_user_ids, (np.ndarray, pd.Series, list)):
+            target_user_ids = list(target_user_ids)
+        uids = self.user_index.encode(target_user_ids).astype(np.int64)
+        return np.unique(uids[uids >= 0])
+
+    def _iter_scored(
+        self,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+        target_uids: np.ndarray,
+        chunk_size: int,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield scored frames for ``target_uids`` in ``chunk_size`` chunks (no QA)."""
+        step = chunk_size or max(len(target_uids), 1)
+        with self._worker_pool(user_embs, product_embs) as pool:
+            for chunk_start in range(0, max(len(target_uids), 1), step):
+                chunk_uids = target_uids[chunk_start:chunk_start + step]
+                yield self._score_chunk(user_embs, product_embs, chunk_uids, pool=pool)
+
+    @torch.no_grad()
+    def score_incremental(
+        self,
+        previous_output: pd.DataFrame | None,
+        previous_fingerprints: ScoringFingerprints | None,
+        target_user_ids: set[str] | None = None,
+        *,
+        interactions: pd.DataFrame | None = None,
+    ) -> dict[str, Any]:
+        """Re-score only users whose inputs changed; carry the rest forward.
+
+        A target user is re-scored when their fingerprint (embedding, owned
+        entities with their fitment rows and groups, interactions, purchases)
+        changed, when a product in their previous recs changed or
+        disappeared, or when a changed product could now enter their top-N
+        (its score reaches their lowest previous rec score, or their previous
+        row was not a full GNN row). Selection is greedy by score, so a
+        changed product scoring below every previous rec cannot alter the
+        result. Any scoring-config change, or missing
+        previous state, re-scores everyone.
+
+        Args:
+            previous_output: Output of the previous run (``_output_columns``).
+            previous_fingerprints: ``fingerprints`` returned by that run.
+            target_user_ids: Optional set of user IDs to score.
+            interactions: Canonical interactions DataFrame for user
+                fingerprints (``user_id`` plus any per-interaction columns).
+
+        Returns:
+            Dict with ``recommendations`` (full merged output), ``rescored``
+            (rows produced by this run), ``removed_user_ids`` (previous rows
+            no longer present), ``fingerprints`` (to pass to the next run),
+            ``n_rescored`` and ``n_carried``.
+        """
+        user_embs, product_embs = self.warm()
+        fingerprints = self.compute_fingerprints(user_embs, product_embs, interactions=interactions)
+
+        if target_user_ids is None:
+            target_user_ids = self.user_index.keys_array
+        target_uids = self._target_uids(target_user_ids)
+
+        dirty = self._dirty_users(
+            target_uids, fingerprints, previous_fingerprints, previous_output,
+            user_embs, product_embs,
+        )
+        rescore_uids = target_uids[dirty]
+        chunk_size = int(self.config.get("scoring", {}).get("chunk_size", 0))
+        rescored = pd.concat(
+            list(self._iter_scored(user_embs, product_embs, rescore_uids, chunk_size)),
+            ignore_index=True,
+        )
+
+        frames = [rescored]
+        if previous_output is not None and (~dirty).any():
+            carried_ids = self.user_id_array[target_uids[~dirty]]
+            carried = previous_output.loc[
+                previous_output["user_id"].isin(carried_ids), self._output_columns()
+            ]
+            frames.insert(0, carried)
+        merged = pd.concat([f for f in frames if not f.empty] or [rescored], ignore_index=True)
+        order = self.user_index.encode(merged["user_id"])
+        merged = merged.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
+
+        removed: np.ndarray = np.empty(0, dtype=object)
+        if previous_output is not None:
+            removed = np.setdiff1d(
+                previous_output["user_id"].to_numpy(dtype=object),
+                merged["user_id"].to_numpy(dtype=object),
+            )
+        n_carried = len(merged) - len(rescored)
+        logger.info(
+            "Incremental scoring: %d/%d target users re-scored, %d rows carried forward, %d removed",
+            len(rescore_uids), len(target_uids), n_carried, len(removed),
+        )
+        self.qa_report = self._qa_checks(merged, target_count=len(target_user_ids))
+        return {
+            "recommendations": merged,
+            "rescored": rescored,
+            "removed_user_ids": removed,
+            "fingerprints": fingerprints,
+            "n_rescored": len(rescore_uids),
+            "n_carried": n_carried,
+        }
+
+    def compute_fingerprints(
+        self,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+        *,
+        interactions: pd.DataFrame | None = None,
+    ) -> ScoringFingerprints:
+        """Hash every user's and product's scoring inputs.
+
+        User: embedding row, owned entities (ID, fitment products and group
+        of each), purchase exclusions, and interaction rows. Product: embedding row, its product-table row
+        (price, popularity, category, display fields, exclusion column), and
+        whether it is a GNN candidate (exclusions + static plugin filter).
+        """
+        n_users = len(self.user_id_array)
+        n_products = len(self.excluded_mask)
+        product_ids = self.product_id_array
+        product_id_hash = hash_values(product_ids)
+
+        # Owned entities: ID, fitment product row and group of each
+        entity_ids = np.full(self.n_entities, None, dtype=object)
+        entity_keys = self.entity_index.keys_array[:self.n_entities]
+        entity_ids[:len(entity_keys)] = entity_keys
+        entity_groups = np.full(self.n_entities, "", dtype=object)
+        if self.entity_to_group:
+            grouped = np.fromiter(self.entity_to_group.keys(), dtype=np.int64, count=len(self.entity_to_group))
+            in_range = grouped < self.n_entities
+            entity_groups[grouped[in_range]] = np.asarray(list(self.entity_to_group.values()), dtype=object)[in_range]
+        fitted = np.repeat(np.arange(self.n_entities), np.diff(self.entity_product_indptr))
+        fitment_hash = hash_groups(fitted, product_id_hash[self.entity_product_indices], self.n_entities)
+        entity_fp = combine_hashes(hash_values(entity_ids), fitment_hash, hash_values(entity_groups))
+        owner = np.repeat(np.arange(n_users), np.diff(self.user_entity_indptr))
+        entity_hash = hash_groups(owner, entity_fp[self.user_entity_indices], n_users)
+
+        # Purchase exclusions
+        buyer = np.repeat(np.arange(n_users), np.diff(self.purchase_indptr))
+        purchase_hash = hash_groups(buyer, product_id_hash[self.purchase_indices], n_users)
+
+        # Interactions
+        interaction_hash = np.zeros(n_users, dtype=np.uint64)
+        if interactions is not None and not interactions.empty:
+            uids = self.user_index.encode(interactions["user_id"])
+            known = uids >= 0
+            rows = interactions.loc[known].drop(columns=["user_id"])
+            interaction_hash = hash_groups(
+                uids[known].astype(np.int64),
+                pd.util.hash_pandas_object(rows, index=False).to_numpy(),
+                n_users,
+            )
+
+        user_fp = combine_hashes(
+            hash_rows(user_embs.numpy()), entity_hash, purchase_hash, interaction_hash,
+        )
+
+        # Products: table row + exclusion + embedding
+        meta_hash = np.zeros(n_products, dtype=np.uint64)
+        products = self.nodes.get("products")
+        if products is not None and not products.empty:
+            products = products.drop_duplicates(subset=["product_id"])
+            pids = self.product_index.encode(products["product_id"])
+            known = pids >= 0
+            meta_hash[pids[known]] = pd.util.hash_pandas_object(
+                products.loc[known], index=False,
+            ).to_numpy()
+        product_fp = combine_hashes(
+            hash_rows(product_embs.numpy()), meta_hash, self.candidate_mask.astype(np.uint64),
+        )
+
+        plugin_cls = type(self.plugin)
+        return ScoringFingerprints(
+            users=pd.Series(user_fp, index=pd.Index(self.user_id_array, name="user_id")),
+            products=pd.Series(product_fp, index=pd.Index(product_ids, name="product_id")),
+            config_hash=config_fingerprint(
+                self.config, f"{plugin_cls.__module__}.{plugin_cls.__qualname__}",
+            ),
+        )
+
+    def _dirty_users(
+        self,
+        target_uids: np.ndarray,
+        fingerprints: ScoringFingerprints,
+        previous_fingerprints: ScoringFingerprints | None,
+        previous_output: pd.DataFrame | None,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+    ) -> np.ndarray:
+        """Bool mask over ``target_uids`` of users that must be re-scored."""
+        if (
+            previous_output is None
+            or previous_fingerprints is None
+            or previous_fingerprints.config_hash != fingerprints.config_hash
+        ):
+            return np.ones(len(target_uids), dtype=bool)
+
+        user_ids = self.user_id_array[target_uids]
+        dirty = fingerprints.changed_users(previous_fingerprints, user_ids)
+        changed, removed = fingerprints.changed_products(previous_fingerprints)
+        if len(changed) == 0 and len(removed) == 0:
+            return dirty
+
+        prev = previous_output.drop_duplicates(subset=["user_id"]).set_index("user_id").reindex(user_ids)
+        slots = range(1, self.total_slots + 1)
+        prev_recs = prev[[f"rec{i}_product_id" for i in slots]]
+        dirty |= prev_recs.isin(set(changed) | set(removed)).any(axis=1).to_numpy()
+
+        # Only full, GNN-only rows have a score threshold a new product must beat
+        full = (
+            prev["rec_count"].eq(self.total_slots) & prev["is_fallback"].eq(False)
+        ).to_numpy()
+        dirty |= ~full
+
+        threshold = prev[[f"rec{i}_score" for i in slots]].min(axis=1).to_numpy(dtype=np.float64)
+        cand = self.product_index.encode(list(changed)).astype(np.int64)
+        cand = cand[self.candidate_mask[cand]] if len(cand) else cand
+        rows = np.flatnonzero(~dirty)
+        if len(cand) == 0 or len(rows) == 0:
+            return dirty
+
+        # Small tolerance: previous scores went through a float64 round trip
+        if self.strategy.is_entity_topology:
+            dirty[self._fitment_threshold_hits(
+                target_uids, rows, cand, threshold - 1e-6, user_embs, product_embs,
+            )] = True
+        else:
+            cand_embs = product_embs[torch.from_numpy(cand)]
+            batch_size = self.config.get("scoring", {}).get("batch_size", 512)
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                scores = torch.mm(user_embs[torch.from_numpy(target_uids[batch])], cand_embs.t())
+                best = scores.max(dim=1).values.numpy()
+                dirty[batch[best >= threshold[batch] - 1e-6]] = True
+        return dirty
+
+    def _fitment_threshold_hits(
+        self,
+        target_uids: np.ndarray,
+        rows: np.ndarray,
+        cand: np.ndarray,
+        threshold: np.ndarray,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+    ) -> np.ndarray:
+        """Rows whose user owns an entity fitting a candidate scoring >= threshold."""
+        n_users = len(self.user_id_array)
+        product_entity = edges_to_csr(
+            self.entity_product_indices,
+            np.repeat(np.arange(self.n_entities), np.diff(self.entity_product_indptr)),
+            len(self.excluded_mask),
+        )
+        entity_user = edges_to_csr(
+            self.user_entity_indices,
+            np.repeat(np.arange(n_users), np.diff(self.user_entity_indptr)),
+            self.n_entities,
+        )
+        cand_pos, entities = csr_gather(*product_entity, cand)
+        entity_pos, users = csr_gather(*entity_user, entities)
+        products = cand[cand_pos[entity_pos]]
+
+        row_of_user = np.full(n_users, -1, dtype=np.int64)
+        row_of_user[target_uids[rows]] = rows
+        pair_rows = row_of_user[users]
+        keep = pair_rows >= 0
+        pair_rows, users, products = pair_rows[keep], users[keep], products[keep]
+        if len(pair_rows) == 0:
+            return pair_rows
+
+        scores = (user_embs[torch.from_numpy(users)] * product_embs[torch.from_numpy(products)]).sum(dim=1)
+        return np.unique(pair_rows[scores.numpy() >= threshold[pair_rows]])
+
+    def score_to_parquet(
+        self,
+        output_dir: str | Path,
+        target_user_ids: set[str] | None = None,
+        *,
+        chunk_size: int | None = None,
+    ) -> dict[str, Any]:
+        """Stream scored chunks to ``part-NNNNN.parquet`` shards in ``output_dir``.
+
+        Existing shards in ``output_dir`` are removed first. A ``_SUCCESS``
+        marker is written only after global QA passes, so downstream loaders
+        can tell a complete run from a partial one.
+
+        Returns:
+            Dict with ``output_dir``, ``shards`` (paths), ``n_rows`` and
+            ``qa`` (``QAReport.to_dict()``), plus ``ann_recall`` when ANN
+            retrieval was used and ``precision_overlap`` (top-``total_slots``
+            overlap with fp32) under reduced ``scoring.precision``.
+        """
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        (out / "_SUCCESS").unlink(missing_ok=True)
+        for stale in out.glob("part-*.parquet"):
+            stale.unlink()
+
+        shards: list[str] = []
+        n_rows = 0
+        for df in self.iter_score_chunks(target_user_ids, chunk_size=chunk_size):
+            if df.empty:
+                continue
+            path = out / f"part-{len(shards):05d}.parquet"
+            df.to_parquet(path, index=False)
+            shards.append(str(path))
+            n_rows += len(df)
+
+        (out / "_SUCCESS").touch()
+        logger.info("Wrote %d rows to %d shard(s) in %s", n_rows, len(shards), out)
+        summary: dict[str, Any] = {
+            "output_dir": str(out), "shards": shards, "n_rows": n_rows, "qa": self.qa_report.to_dict(),
+        }
+        if self.ann_recall is not None:
+            summary["ann_recall"] = self.ann_recall
+        if self.precision_overlap is not None:
+            summary["precision_overlap"] = self.precision_overlap
+        return summary
+
+    def _compute_embeddings(self) -> tuple[torch.Tensor, torch.Tensor]:
+        """CPU user/product embeddings: from the snapshot, else a forward pass."""
+        if self.embeddings is not None:
+            return self.embeddings.tensors()
+
         self.model = self.model.to(self.device)
         self.data = self.data.to(self.device)
 
-        user_embs, product_embs = self.model(self.data)
-        user_embs = user_embs.cpu()
-        product_embs = product_embs.cpu()
+        user_embs, product_embs = self.model.embed(
+            self.data, self.config.get("model", {}).get("inference_chunk_size"),
+        )
+        return user_embs.cpu(), product_embs.cpu()
 
-        user_to_id = self.id_mappings["user_to_id"]
+    def _build_ann_index(self, user_embs: torch.Tensor, product_embs: torch.Tensor) -> None:
+        """Build the IVF index for 2-node candidate retrieval (``scoring.ann``).
 
-        if target_user_ids is None:
-            target_user_ids = set(user_to_id.keys())
+        Indexes the non-excluded products, then measures recall@``top_m``
+        against exact search on a sample of users so ``n_probe`` can be tuned.
+        """
+        self.ann_index = None
+        self.ann_recall = None
+        if self.strategy.is_entity_topology or not self.ann_config.get("enabled", False):
+            return
+
+        candidate_ids = self.candidate_ids
+        if len(candidate_ids) == 0:
+            return
+        candidate_vecs = product_embs.numpy()[candidate_ids]
+        seed = int(self.ann_config.get("seed", 42))
+        self.ann_index = IVFIndex(
+            n_lists=int(self.ann_config.get("n_lists", 0)),
+            n_probe=int(self.ann_config.get("n_probe", 8)),
+            pq_subspaces=int(self.ann_config.get("pq_subspaces", 0)),
+            pq_bits=int(self.ann_config.get("pq_bits", 8)),
+            seed=seed,
+        ).fit(candidate_vecs, ids=candidate_ids)
+
+        n_sample = min(int(self.ann_config.get("recall_sample", 256)), len(user_embs))
+        if n_sample > 0:
+            top_m = self._ann_top_m()
+            sample = np.random.RandomState(seed).choice(len(user_embs), n_sample, replace=False)
+            queries = user_embs.numpy()[sample]
+            approx_ids, _ = self.ann_index.search(queries, top_m)
+            exact_ids, _ = exact_search(queries, candidate_vecs, candidate_ids, top_m)
+            self.ann_recall = recall_at_k(approx_ids, exact_ids)
+            logger.info(
+                "ANN recall@%d vs exact: %.4f (n_probe=%d, %d sampled users)",
+                top_m, self.ann_recall, self.ann_index.n_probe, n_sample,
+            )
+
+    def _build_candidate_keys(self, user_embs: torch.Tensor, product_embs: torch.Tensor) -> None:
+        """Candidate key matrix at ``scoring.precision``, built once per set of embeddings.
+
+        The candidate product rows are laid out once as ``QuantizedKeys``
+        (transposed, contiguous), so scoring batches neither re-gather the
+        candidates nor transpose them. fp32 keys are only needed by dense
+        2-node scoring; 3-node fp32 batches gather their small fitment union
+        directly. Under reduced precision, query rows are quantized per batch
+        and the fp32 re-rank gathers just each row's window from
+        ``product_embs``; the top-``total_slots`` overlap of quantized scoring
+        plus re-rank against exact fp32 ranking is measured on a sample of
+        users.
+        """
+        self.candidate_keys = None
+        self.precision_overlap = None
+        if self.precision == "fp32":
+            if not self.strategy.is_entity_topology and self.ann_index is None:
+                self.candidate_keys = quantize_keys(
+                    product_embs[torch.from_numpy(self.candidate_ids)], "fp32",
+                )
+            return
+
+        candidate_ids = self.candidate_ids
+        self.candidate_keys = quantize_keys(product_embs[torch.from_numpy(candidate_ids)], self.precision)
+        logger.info(
+            "Scoring at %s: candidate matrix %.1f MB -> %.1f MB, fp32 re-rank of top %d",
+            self.precision, len(candidate_ids) * product_embs.shape[1] * 4 / 1e6,
+            self.candidate_keys.nbytes / 1e6, self.rerank_window,
+        )
+
+        n_sample = min(self.precision_sample, len(user_embs))
+        if n_sample == 0 or len(candidate_ids) == 0:
+            return
+        sample = np.sort(np.random.RandomState(42).choice(len(user_embs), n_sample, replace=False))
+        approx = quantized_scores(
+            quantize(user_embs[torch.from_numpy(sample)], self.precision), self.candidate_keys,
+        )
+        ids, scores = self._rerank_exact(sample, candidate_ids, approx, user_embs, product_embs)
+        k = min(self.total_slots, ids.shape[1])
+        top = torch.topk(scores, k, dim=1)
+        approx_ids = np.where(
+            torch.isfinite(top.values).numpy(), np.take_along_axis(ids, top.indices.numpy(), axis=1), -1,
+        )
+        exact_ids, _ = exact_search(
+            user_embs.numpy()[sample], product_embs.numpy()[candidate_ids], candidate_ids, k,
+        )
+        self.precision_overlap = recall_at_k(approx_ids, exact_ids)
+        logger.info(
+            "%s top-%d overlap vs fp32: %.4f (%d sampled users)",
+            self.precision, k, self.precision_overlap, n_sample,
+        )
 
+    def _rerank_exact(
+        self,
+        batch_uids: np.ndarray,
+        candidate_ids: np.ndarray,
+        approx_scores: torch.Tensor,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+    ) -> tuple[np.ndarray, torch.Tensor]:
+        """Re-score each row's top ``rerank_window`` approximate candidates in fp32.
+
+        ``candidate_ids`` is ``[C]`` shared or ``[B, C]`` per row, as in
+        ``_select_batch``; ``-inf`` approximate scores mark non-candidates.
+
+        Returns:
+            ``(candidate_ids [B, W], scores [B, W])``, ``-1`` / ``-inf`` padded.
+        """
+        width = min(self.rerank_window, approx_scores.shape[1])
+        top_scores, cols = torch.topk(approx_scores, width, dim=1)
+        cols_np = cols.numpy()
+        if candidate_ids.ndim == 2:
+            ids = np.take_along_axis(candidate_ids, cols_np, axis=1)
+        else:
+            ids = candidate_ids[cols_np]
+        valid = torch.isfinite(top_scores)
+        ids = np.where(valid.numpy(), ids, -1)
+
+        batch_embs = user_embs[torch.from_numpy(batch_uids)]
+        cand_embs = product_embs[torch.from_numpy(ids.clip(min=0))]
+        scores = torch.bmm(cand_embs, batch_embs.unsqueeze(2)).squeeze(2)
+        scores[~valid] = float("-inf")
+        return ids, scores
+
+    def _candidate_keys(self, product_embs: torch.Tensor) -> QuantizedKeys:
+        """Warm ``candidate_keys``, or keys built for this call on an unwarmed scorer."""
+        if self.candidate_keys is not None:
+            return self.candidate_keys
+        return quantize_keys(product_embs[torch.from_numpy(self.candidate_ids)], self.precision)
+
+    def _ann_top_m(self) -> int:
+        """Candidates retrieved per user; at least the top-N over-fetch window."""
+        return max(int(self.ann_config.get("top_m", 200)), self.total_slots * self.topn_overfetch)
+
+    @contextlib.contextmanager
+    def _worker_pool(
+        self,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+    ) -> Iterator[Executor | None]:
+        """Process pool of scoring workers. Yields None (in-process scoring)
+        when ``scoring.num_workers <= 1``.
+
+        Workers are started with ``forkserver`` (``spawn`` where that is
+        unavailable), not forked from this process: torch's intra-op thread
+        pool makes it multi-threaded, and forking it can deadlock the child.
+        Each worker receives a copy of the scorer without the model, graph
+        and node tables (scoring shards needs none of them); tensors,
+        including the embeddings, travel as shared-memory handles, and
+        memory-mapped snapshot embeddings as their file paths, so no worker
+        re-runs the model or copies the embeddings.
+        """
+        if self.num_workers <= 1:
+            yield None
+            return
+
+        snapshot = self.embeddings
+        worker_scorer = copy.copy(self)
+        worker_scorer.model = worker_scorer.data = worker_scorer.embeddings = None
+        worker_scorer.nodes = {}
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(
+                worker_scorer,
+                _share_embeddings(user_embs, snapshot.user_embs if snapshot is not None else None),
+                _share_embeddings(product_embs, snapshot.product_embs if snapshot is not None else None),
+            ),
+        ) as pool:
+            logger.info("Scoring with %d %s worker processes", self.num_workers, start_method)
+            yield pool
+
+    def _shard_users(self, target_uids: np.ndarray, n_shards: int) -> list[np.ndarray]:
+        """Split users into contiguous shards for the worker pool.
+
+        3-node users are ordered by first owned entity first, so users of the
+        same vehicle share a shard and its fitment candidate matrix.
+        """
         if self.strategy.is_entity_topology:
-            return self._score_3node(user_embs, product_embs, target_user_ids)
-        return self._score_2node(user_embs, product_embs, target_user_ids)
+            owning = self._rows_by_first_entity(target_uids)
+            rest = np.setdiff1d(np.arange(len(target_uids)), owning, assume_unique=True)
+            target_uids = target_uids[np.concatenate([owning, rest])]
+        return [shard for shard in np.array_split(target_uids, n_shards) if len(shard)]
 
-    def _score_2node(
+    def _score_chunk(
         self,
         user_embs: torch.Tensor,
         product_embs: torch.Tensor,
-        target_user_ids: set[str],
+        target_uids: np.ndarray,
+        *,
+        pool: Executor | None = None,
     ) -> pd.DataFrame:
+        """Score one chunk of internal user IDs, in-process or across the pool.
+
+        Pool results are merged back into internal-user-ID order, so output
+        matches in-process scoring (up to float rounding from different
+        matmul shapes) regardless of how shards were assigned.
+        """
+        if pool is None or len(target_uids) < 2:
+            return self._score_shard(user_embs, product_embs, target_uids)
+
+        shards = self._shard_users(target_uids, self.num_workers * _SHARDS_PER_WORKER)
+        frames = list(pool.map(_score_shard_in_worker, shards))
+        df = pd.concat(frames, ignore_index=True)
+        uids = self.user_index.encode(df["user_id"])
+        return df.iloc[np.argsort(uids, kind="stable")].reset_index(drop=True)
+
+    def _score_shard(
+        self,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+        target_uids: np.ndarray,
+    ) -> pd.DataFrame:
+        """Score, apply fallback, and format a set of internal user IDs."""
+        if self.strategy.is_entity_topology:
+            rec_pids, rec_scores = self._score_3node(user_embs, product_embs, target_uids)
+        else:
+            rec_pids, rec_scores = self._score_2node(user_embs, product_embs, target_uids)
+        return self._finalize(target_uids, rec_pids, rec_scores)
+
+    def _empty_recs(self, n_users: int) -> tuple[np.ndarray, np.ndarray]:
+        """Allocate ``[n_users, total_slots]`` product-ID and score matrices."""
+        return (
+            np.full((n_users, self.total_slots), -1, dtype=np.int32),
+            np.full((n_users, self.total_slots), np.nan, dtype=np.float64),
+        )
+
+    def _score_2node(
+        self,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+        target_uids: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
         """Score for 2-node topology: all products are candidates.
 
-        Uses batched matrix multiply for scalability.
+        Uses batched matrix multiply for scalability. With an ANN index
+        (``scoring.ann.enabled``), each user's top-M candidates are retrieved
+        from the index instead and re-scored exactly before selection. Under
+        reduced ``scoring.precision`` the matmul runs on the quantized candidate
+        keys and each row's top ``rerank_window`` is re-scored in fp32.
+
+        Returns:
+            ``(rec_pids, rec_scores)`` aligned with ``target_uids``.
         """
-        user_to_id = self.id_mappings["user_to_id"]
-        user_recs: dict[str, list[tuple[int, float, bool]]] = {}
+        if self.ann_index is not None:
+            return self._score_2node_ann(user_embs, product_embs, target_uids)
+        rec_pids, rec_scores = self._empty_recs(len(target_uids))
 
-        candidate_ids = [
-            p for p in range(self.data["product"].num_nodes)
-            if p not in self.excluded_product_ids
-        ]
-        candidate_t = torch.tensor(candidate_ids, dtype=torch.long)
-        candidate_embs = product_embs[candidate_t]
-
-        # Collect valid user mappings
-        uid_pairs = [
-            (uid_str, user_to_id[uid_str])
-            for uid_str in target_user_ids
-            if uid_str in user_to_id
-        ]
+        candidate_ids = self.candidate_ids
+        candidate_keys = self._candidate_keys(product_embs)
 
         # Batched scoring
         batch_size = self.config.get("scoring", {}).get("batch_size", 512)
-        for batch_start in range(0, len(uid_pairs), batch_size):
-            batch = uid_pairs[batch_start:batch_start + batch_size]
-            batch_int_ids = torch.tensor(
-                [uid for _, uid in batch], dtype=torch.long
-            )
-            batch_embs = user_embs[batch_int_ids]
+        for batch_start in range(0, len(target_uids), batch_size):
+            batch_end = batch_start + batch_size
+            batch_uids = target_uids[batch_start:batch_end]
             # [batch_size, n_candidates]
-            all_scores = torch.mm(batch_embs, candidate_embs.t())
-
-            for i, (uid_str, _uid) in enumerate(batch):
-                excluded = self.user_excluded_products.get(uid_str)
-                recs = self._select_top_n(
-                    candidate_ids, all_scores[i],
-                    excluded_products=excluded, user_id=uid_str,
+            approx = quantized_scores(
+                quantize(user_embs[torch.from_numpy(batch_uids)], self.precision), candidate_keys,
+            )
+            if self.precision == "fp32":
+                batch_ids, all_scores = candidate_ids, approx
+            else:
+                batch_ids, all_scores = self._rerank_quantized(
+                    batch_uids, candidate_ids, approx, user_embs, product_embs,
                 )
-                if recs:
-                    user_recs[uid_str] = recs
+            rec_pids[batch_start:batch_end], rec_scores[batch_start:batch_end] = (
+                self._select_batch(batch_uids, batch_ids, all_scores)
+            )
 
-        return self._finalize(user_recs, target_user_ids)
+        return rec_pids, rec_scores
+
+    def _score_2node_ann(
+        self,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+        target_uids: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """2-node scoring over per-user ANN candidates, exactly re-scored."""
+        rec_pids, rec_scores = self._empty_recs(len(target_uids))
+        top_m = self._ann_top_m()
+
+        batch_size = self.config.get("scoring", {}).get("batch_size", 512)
+        for batch_start in range(0, len(target_uids), batch_size):
+            batch_end = batch_start + batch_size
+            batch_uids = target_uids[batch_start:batch_end]
+            batch_embs = user_embs[torch.from_numpy(batch_uids)]
+            candidate_ids, _ = self.ann_index.search(batch_embs.numpy(), top_m)
+            # [batch_size, top_m] exact scores; padded slots stay -inf
+            cand_embs = product_embs[torch.from_numpy(candidate_ids.clip(min=0))]
+            scores = torch.bmm(cand_embs, batch_embs.unsqueeze(2)).squeeze(2)
+            scores[torch.from_numpy(candidate_ids < 0)] = float("-inf")
+            rec_pids[batch_start:batch_end], rec_scores[batch_start:batch_end] = (
+                self._select_batch(batch_uids, candidate_ids, scores)
+            )
+
+        return rec_pids, rec_scores
 
     def _score_3node(
         self,
         user_embs: torch.Tensor,
         product_embs: torch.Tensor,
-        target_user_ids: set[str],
-    ) -> pd.DataFrame:
-        """Score for 3-node topology: entity-grouped batch inference + merge."""
-        user_product_scores: dict[str, dict[int, float]] = {}
-        user_entities: dict[str, list[tuple[int, str | None]]] = {}
-        entity_target_users: set[str] = set()
+        target_uids: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Score for 3-node topology: CSR fitment candidates + scatter-max merge.
 
-        for eid, user_ids in self.entity_users.items():
-            group = self.entity_to_group.get(eid)
+        Users are processed in batches ordered by their first owned entity, so
+        users sharing a vehicle land in the same batch and the union of their
+        fitment candidates stays small. Users owning no entity get no GNN recs.
 
-            target_uids = [
-                uid for uid in user_ids
-                if self.id_to_user.get(uid) in target_user_ids
-            ]
-            if not target_uids:
+        Returns:
+            ``(rec_pids, rec_scores)`` aligned with ``target_uids``.
+        """
+        rec_pids, rec_scores = self._empty_recs(len(target_uids))
+        rows = self._rows_by_first_entity(target_uids)
+
+        batch_size = self.config.get("scoring", {}).get("batch_size", 512)
+        for batch_start in range(0, len(rows), batch_size):
+            batch_rows = rows[batch_start:batch_start + batch_size]
+            batch_uids = target_uids[batch_rows]
+            candidate_ids, scores = self._fitment_scores(batch_uids, user_embs, product_embs)
+            if len(candidate_ids) == 0:
                 continue
+            if self.precision != "fp32":
+                candidate_ids, scores = self._rerank_quantized(
+                    batch_uids, candidate_ids, scores, user_embs, product_embs,
+                )
+            rec_pids[batch_rows], rec_scores[batch_rows] = self._select_batch(
+                batch_uids, candidate_ids, scores,
+            )
 
-            for uid in target_uids:
-                uid_str = self.id_to_user[uid]
-                entity_target_users.add(uid_str)
-                user_entities.setdefault(uid_str, []).append((eid, group))
+        return rec_pids, rec_scores
 
-            fitment_ids = [
-                p for p in self.entity_products.get(eid, [])
-                if p not in self.excluded_product_ids
-            ]
-            if not fitment_ids:
-                continue
+    def _rows_by_first_entity(self, target_uids: np.ndarray) -> np.ndarray:
+        """Positions of entity-owning users in ``target_uids``, by first entity."""
+        n_owned = self.user_entity_indptr[target_uids + 1] - self.user_entity_indptr[target_uids]
+        rows = np.flatnonzero(n_owned > 0)
+        first_entity = self.user_entity_indices[self.user_entity_indptr[target_uids[rows]]]
+        return rows[np.lexsort((rows, first_entity))]
 
-            target_uids_t = torch.tensor(target_uids, dtype=torch.long)
-            batch_user_embs = user_embs[target_uids_t]
-            fitment_ids_t = torch.tensor(fitment_ids, dtype=torch.long)
-            fitment_embs = product_embs[fitment_ids_t]
-            fitment_scores = torch.mm(batch_user_embs, fitment_embs.t())
-
-            for i, uid in enumerate(target_uids):
-                uid_str = self.id_to_user[uid]
-                scores_dict = user_product_scores.setdefault(uid_str, {})
-                for j, pid in enumerate(fitment_ids):
-                    score = fitment_scores[i][j].item()
-                    if pid not in scores_dict or score > scores_dict[pid]:
-                        scores_dict[pid] = score
-
-        # Select top-N with diversity
-        user_recs: dict[str, list[tuple[int, float, bool]]] = {}
-        for uid_str, product_scores in user_product_scores.items():
-            if not product_scores:
-                continue
-            sorted_items = sorted(product_scores.items(), key=lambda x: -x[1])
-            merged_ids = [pid for pid, _ in sorted_items]
-            merged_scores = torch.tensor([s for _, s in sorted_items])
-            excluded = self.user_excluded_products.get(uid_str)
-            recs = self._select_top_n(merged_ids, merged_scores, excluded_products=excluded, user_id=uid_str)
-            if recs:
-                user_recs[uid_str] = recs
+    def _fitment_scores(
+        self,
+        batch_uids: np.ndarray,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+    ) -> tuple[np.ndarray, torch.Tensor]:
+        """Max score per (user, product) over the union of owned-entity fitment.
+
+        Expands user -> entity -> product through the CSR indexes, scores the
+        batch against the union of candidates with one matmul, then
+        scatter-maxes each (user, product) pair into a dense matrix. Multi-vehicle
+        users therefore get the max per product across all owned entities.
 
-        return self._finalize(user_recs, target_user_ids, user_entities=user_entities)
+        Scores come from the quantized candidate keys under reduced
+        ``scoring.precision`` (float16 under fp16).
 
-    def _select_top_n(
+        Returns:
+            ``(candidate_ids [C], scores [B, C])`` with ``-inf`` where a product
+            is not in the user's fitment set.
+        """
+        rows, entities = csr_gather(
+            self.user_entity_indptr, self.user_entity_indices, batch_uids,
+        )
+        entity_pos, products = csr_gather(
+            self.entity_product_indptr, self.entity_product_indices, entities,
+        )
+        rows = rows[entity_pos]
+
+        keep = self.candidate_mask[products]
+        rows, products = rows[keep], products[keep]
+        if len(products) == 0:
+            return products, torch.empty(len(batch_uids), 0)
+
+        candidate_ids, cols = np.unique(products, return_inverse=True)
+        batch_embs = user_embs[torch.from_numpy(batch_uids)]
+        if self.precision != "fp32":
+            key_cols = torch.from_numpy(np.searchsorted(self.candidate_ids, candidate_ids))
+            candidate_scores = quantized_scores(
+                quantize(batch_embs, self.precision), self._candidate_keys(product_embs).columns(key_cols),
+            )
+        else:
+            candidate_scores = torch.mm(batch_embs, product_embs[torch.from_numpy(candidate_ids)].t())
+
+        n_cols = len(candidate_ids)
+        flat_idx = torch.from_numpy(rows * n_cols + cols)
+        pair_scores = candidate_scores.reshape(-1)[flat_idx]
+        scores = torch.full((len(batch_uids) * n_cols,), float("-inf"), dtype=candidate_scores.dtype)
+        scores.scatter_reduce_(0, flat_idx, pair_scores, reduce="amax")
+        return candidate_ids, scores.view(len(batch_uids), n_cols)
+
+    def _select_batch(
         self,
-        product_ids: list[int],
+        batch_uids: np.ndarray,
+        candidate_ids: np.ndarray,
         scores: torch.Tensor,
-        excluded_products: set[int] | None = None,
-        user_id: str | None = None,
-    ) -> list[tuple[int, float, bool]]:
-        """Select top-N products with category diversity."""
-        scored = sorted(
-            zip(product_ids, scores.numpy()),
-            key=lambda x: -x[1],
-        )
-        # Apply plugin post-rank filter with enriched context
-        filter_context = {"scorer": True, "user_id": user_id}
-        scored = [
-            (pid, s) for pid, s in scored
-            if self.plugin.post_rank_filter(pid, {
-                **filter_context,
-                "product_str_id": self.id_to_product.get(pid, ""),
-                "category": self.category_by_product_id.get(pid, ""),
-            })
-        ]
-        ranked_products = [pid for pid, _ in scored]
-        fitment_set = set(product_ids)
-
-        selected = apply_slot_reservation_with_diversity(
-            ranked_products=ranked_products,
-            fitment_set=fitment_set,
-            excluded_set=frozenset(),
-            category_by_product=self.category_by_product_id,
-            fitment_slots=self.total_slots,
-            excluded_slots=0,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Select top-N with category diversity for a batch of users.
+
+        Purchased products (one vectorized lookup against the CSR purchase
+        index for the whole batch) and plugin-rejected products are masked to
+        ``-inf`` in ``scores`` (modified in place), then all rows go through one
+        vectorized selection pass. ``candidate_ids`` is either shared by all
+        rows (``[C]``, sorted ascending) or per row (``[batch, C]``, ``-1``
+        padded with ``-inf`` scores).
+
+        Returns:
+            ``(rec_pids, rec_scores)``, both ``[batch, total_slots]``; empty
+            slots hold ``-1`` / ``NaN``.
+        """
+        if candidate_ids.size == 0:
+            return self._empty_recs(len(batch_uids))
+        per_row = candidate_ids.ndim == 2
+
+        self._mask_purchases(batch_uids, candidate_ids, scores)
+
+        if self._has_post_rank_filter:
+            for i, uid in enumerate(batch_uids):
+                row_ids = candidate_ids[i] if per_row else candidate_ids
+                cols = np.flatnonzero(torch.isfinite(scores[i]).numpy())
+                rejected = self._post_rank_rejected(self.user_id_array[uid], row_ids[cols])
+                scores[i, torch.from_numpy(cols[rejected])] = float("-inf")
+
+        positions, values = select_top_n_batch(
+            scores,
+            self.category_codes[torch.from_numpy(candidate_ids.clip(min=0))],
             total_slots=self.total_slots,
             max_per_category=self.max_per_category,
-            excluded_products=excluded_products,
+            overfetch=self.topn_overfetch,
         )
 
-        score_by_product: dict[int, float] = {}
-        for pid, score in scored:
-            if pid not in score_by_product:
-                score_by_product[pid] = float(score)
+        positions_np = positions.numpy()
+        picked = positions_np >= 0
+        if per_row:
+            picked_ids = np.take_along_axis(candidate_ids, positions_np.clip(min=0), axis=1)
+        else:
+            picked_ids = candidate_ids[positions_np.clip(min=0)]
+        rec_pids = np.where(picked, picked_ids, -1).astype(np.int32)
+        rec_scores = np.where(picked, values.numpy(), np.nan).astype(np.float64)
+        return rec_pids, rec_scores
+
+    def _mask_purchases(
+        self,
+        batch_uids: np.ndarray,
+        candidate_ids: np.ndarray,
+        scores: torch.Tensor,
+    ) -> None:
+        """Set purchased candidates to ``-inf`` in ``scores`` (in place).
+
+        One vectorized lookup against the CSR purchase index for the batch;
+        ``candidate_ids`` is ``[C]`` sorted or ``[B, C]`` per row.
+        """
+        rows, pids = self._batch_purchases(batch_uids)
+        if len(rows) == 0:
+            return
+        pids = pids.astype(np.int64)
+        if candidate_ids.ndim == 2:
+            # Match (row, product) pairs via one flat key per pair
+            stride = len(self.excluded_mask) + 1
+            row_of_col = np.arange(len(candidate_ids))[:, None]
+            hit = np.isin(row_of_col * stride + candidate_ids, rows * stride + pids)
+            hit_rows, cols = np.nonzero(hit & (candidate_ids >= 0))
+        else:
+            cols = np.searchsorted(candidate_ids, pids).clip(max=len(candidate_ids) - 1)
+            found = candidate_ids[cols] == pids
+            hit_rows, cols = rows[found], cols[found]
+        scores[torch.from_numpy(hit_rows), torch.from_numpy(cols)] = float("-inf")
+
+    def _rerank_quantized(
+        self,
+        batch_uids: np.ndarray,
+        candidate_ids: np.ndarray,
+        approx_scores: torch.Tensor,
+        user_embs: torch.Tensor,
+        product_embs: torch.Tensor,
+    ) -> tuple[np.ndarray, torch.Tensor]:
+        """Mask purchases in reduced-precision scores, then fp32 re-rank the window."""
+        self._mask_purchases(batch_uids, candidate_ids, approx_scores)
+        return self._rerank_exact(batch_uids, candidate_ids, approx_scores, user_embs, product_embs)
 
-        return [(pid, score_by_product.get(pid, float("-inf")), False) for pid in selected]
+    def _post_rank_rejected(self, user_id: str, product_ids: np.ndarray) -> np.ndarray:
+        """Boolean mask of products rejected by ``plugin.post_rank_filter_batch``.
+
+        Plugins that only override the per-item ``post_rank_filter`` are
+        served by the base-class batch hook, which loops over it.
+        """
+        keep = self.plugin.post_rank_filter_batch(product_ids, {
+            "scorer": True,
+            "user_id": user_id,
+            "product_str_ids": self.product_id_array[product_ids],
+            "categories": self.category_array[product_ids],
+        })
+        return ~np.asarray(keep, dtype=bool)
 
     def _finalize(
         self,
-        user_recs: dict[str, list[tuple[int, float, bool]]],
-        target_user_ids: set[str],
-        *,
-        user_entities: dict[str, list[tuple[int, str | None]]] | None = None,
+        target_uids: np.ndarray,
+        rec_pids: np.ndarray,
+        rec_scores: np.ndarray,
     ) -> pd.DataFrame:
-        """Apply fallback and build output DataFrame."""
+        """Apply fallback and build output DataFrame.
+
+        ``rec_pids``/``rec_scores`` are filled in place with fallback picks
+        after each user's GNN recs.
+        """
         n_fallback = 0
+        cache_hits_before = self._fallback_cache_hits
+        rec_count = (rec_pids >= 0).sum(axis=1)
+        # GNN recs always precede fallback recs, so the first fallback slot
+        # is the GNN rec count (== rec_count when no fallback applies).
+        fallback_start = rec_count.copy()
 
         if self.fallback_enabled:
-            for uid_str in target_user_ids:
-                existing = user_recs.get(uid_str, [])
-                if len(existing) >= self.min_recs:
-                    continue
-
-                entity_info = (user_entities or {}).get(uid_str, [])
-                eids = sorted({e[0] for e in entity_info}) if entity_info else None
-                groups_set = {e[1] for e in entity_info if e[1]} if entity_info else None
-                groups = sorted(groups_set) if groups_set else None
-                excluded = self.user_excluded_products.get(uid_str)
+            for row in np.flatnonzero(rec_count < self.min_recs):
+                uid = int(target_uids[row])
+                n_existing = int(rec_count[row])
+                existing = [
+                    (pid, score, False)
+                    for pid, score in zip(
+                        rec_pids[row, :n_existing].tolist(),
+                        rec_scores[row, :n_existing].tolist(),
+                    )
+                ]
+                eids, groups = self._user_entity_info(uid)
+                excluded = set(self._purchased(uid).tolist())
 
                 category_counts: dict[str, int] = {}
                 for pid, _, _ in existing:
-                    cat = self.category_by_product_id.get(pid, "")
+                    cat = self.product_store.category_of(pid)
                     category_counts[cat] = category_counts.get(cat, 0) + 1
 
                 fallback_recs = self._apply_fallback(
                     eids, groups, existing, excluded, category_counts,
                 )
                 if fallback_recs:
-                    user_recs[uid_str] = existing + fallback_recs
+                    end = n_existing + len(fallback_recs)
+                    rec_pids[row, n_existing:end] = [pid for pid, _, _ in fallback_recs]
+                    rec_scores[row, n_existing:end] = [score for _, score, _ in fallback_recs]
+                    rec_count[row] = end
                     n_fallback += 1
 
         if n_fallback > 0:
-            logger.info("Fallback applied to %d users", n_fallback)
+            logger.info(
+                "Fallback applied to %d users (%d cache hits)",
+                n_fallback, self._fallback_cache_hits - cache_hits_before,
+            )
 
-        # Build output
-        rows = []
-        for uid_str, recs in user_recs.items():
-            rows.append(self._format_row(uid_str, recs))
+        has_recs = rec_count > 0
+        df = self._build_output_frame(
+            target_uids[has_recs], rec_pids[has_recs], rec_scores[has_recs],
+            fallback_start[has_recs],
+        )
+        return df
 
-        df = pd.DataFrame(rows, columns=self._output_columns())
-        logger.info("Scored %d users", len(df))
+    def _build_output_frame(
+        self,
+        uids: np.ndarray,
+        rec_pids: np.ndarray,
+        rec_scores: np.ndarray,
+        fallback_start: np.ndarray,
+    ) -> pd.DataFrame:
+        """Assemble the wide output DataFrame column by column.
 
-        self._qa_checks(df, target_count=len(target_user_ids))
-        return df
+        Metadata columns are filled by fancy-indexing ``product_store`` with
+        the ``[n_users, total_slots]`` product-ID matrix; empty slots (``-1``)
+        map to the trailing sentinel row (``None``/``NaN``).
+        """
+        n_products = self.product_store.n_products
+        meta_idx = np.where(rec_pids >= 0, rec_pids, n_products)
+        rec_count = (rec_pids >= 0).sum(axis=1)
+
+        columns: dict[str, Any] = {"user_id": self.user_id_array[uids]}
+        for i in range(self.total_slots):
+            slot_idx = meta_idx[:, i]
+            for attr in ("product_id", "name", "url", "image_url", "price"):
+                columns[f"rec{i + 1}_{attr}"] = self.product_store.column(attr, slot_idx)
+            columns[f"rec{i + 1}_score"] = rec_scores[:, i]
+        columns["rec_count"] = rec_count
+        columns["is_fallback"] = rec_count > fallback_start
+        columns["fallback_start_idx"] = fallback_start
+        columns["model_version"] = self.config.get("output", {}).get("model_version", "1.0")
+
+        return pd.DataFrame(columns, columns=self._output_columns())
 
     def _format_row(self, user_id: str, recs: list[tuple[int, float, bool]]) -> dict:
         """Format a single user's recommendations as a wide-format row."""
-        row: dict[str, Any] = {"user_id": user_id}
-        has_fallback = False
-        fallback_start_idx = len(recs)
-
-        for i, (pid, score, from_fallback) in enumerate(recs, 1):
-            pid_str = self.id_to_product.get(pid, "")
-            meta = self.product_meta.get(pid_str, {})
-            row[f"rec{i}_product_id"] = meta.get("product_id", pid_str)
-            row[f"rec{i}_name"] = meta.get("name", "")
-            row[f"rec{i}_url"] = meta.get("url", "")
-            row[f"rec{i}_image_url"] = meta.get("image_url", "")
-            row[f"rec{i}_price"] = meta.get("price", 0)
-            row[f"rec{i}_score"] = score
-            if from_fallback and not has_fallback:
-                fallback_start_idx = i - 1
-                has_fallback = True
-
-        for i in range(len(recs) + 1, self.total_slots + 1):
-            row[f"rec{i}_product_id"] = None
-            row[f"rec{i}_name"] = None
-            row[f"rec{i}_url"] = None
-            row[f"rec{i}_image_url"] = None
-            row[f"rec{i}_price"] = None
-            row[f"rec{i}_score"] = None
-
-        row["rec_count"] = len(recs)
-        row["is_fallback"] = has_fallback
-        row["fallback_start_idx"] = fallback_start_idx
-        row["model_version"] = self.config.get("output", {}).get("model_version", "1.0")
-        return row
-
-    def _qa_checks(self, df: pd.DataFrame, target_count: int | None = None) -> None:
-        """Run QA checks. Raises QAFailedError on critical failures."""
-        failures: list[str] = []
-
-        required_cols = self._output_columns()
-        missing_cols = [c for c in required_cols if c not in df.columns]
+        rec_pids, rec_scores = self._empty_recs(1)
+        for i, (pid, score, _) in enumerate(recs):
+            rec_pids[0, i] = pid
+            rec_scores[0, i] = score
+        fallback_start = next(
+            (i for i, (_, _, from_fallback) in enumerate(recs) if from_fallback), len(recs),
+        )
+        df = self._build_output_frame(
+            np.zeros(1, dtype=np.int64), rec_pids, rec_scores, np.array([fallback_start]),
+        )
+        df["user_id"] = user_id
+        return df.to_dict("records")[0]
+
+    def _qa_checks(self, df: pd.DataFrame, target_count: int | None = None) -> QAReport:
+        """Run QA checks and return the report. Raises QAFailedError on critical failures."""
+        qa = _QAAccumulator(self)
+        qa.update(df)
+        return qa.raise_on_failures(target_count=target_count)
+
+
+class _QAAccumulator:
+    """Running QA counters over scored output chunks.
+
+    Each chunk is checked in one vectorized pass over its score and price
+    matrices; the failure decision is made once over the totals, so chunked
+    and single-frame scoring apply identical thresholds.
+    """
+
+    def __init__(self, scorer: GNNScorer):
+        self.required_cols = scorer._output_columns()
+        self.total_slots = scorer.total_slots
+        self.min_users = scorer.min_users
+        self.min_coverage = scorer.min_coverage
+        self.min_price = scorer.config.get("graph", {}).get("min_price", 0)
+
+        self.n_rows = 0
+        self.user_hashes: list[np.ndarray] = []
+        self.null_slot1 = 0
+        self.below_price = np.zeros(self.total_slots, dtype=np.int64)
+        self.order_violations = 0
+        self.prefix_violations = 0
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Fold one output chunk into the running counters."""
+        missing_cols = [c for c in self.required_cols if c not in df.columns]
         if missing_cols:
             raise QAFailedError("Missing required output columns: " + ", ".join(missing_cols))
 
-        if self.min_users > 0 and len(df) < self.min_users:
-            failures.append(f"Only {len(df)} users (expected >= {self.min_users})")
+        self.n_rows += len(df)
+        # 8-byte hashes instead of user strings keep the duplicate check cheap
+        self.user_hashes.append(
+            pd.util.hash_pandas_object(df["user_id"], index=False).to_numpy()
+        )
+        self.null_slot1 += int(df["rec1_product_id"].isna().sum())
+        if df.empty:
+            return
+
+        if self.min_price > 0:
+            slots = [i for i in range(self.total_slots) if f"rec{i + 1}_price" in df.columns]
+            prices = df[[f"rec{i + 1}_price" for i in slots]].to_numpy(dtype=np.float64, na_value=np.nan)
+            # NaN compares False, so empty slots never count
+            self.below_price[slots] += (prices < self.min_price).sum(axis=0)
+
+        # Score ordering: one masked comparison of adjacent slots. Non-fallback
+        # rows check every slot (empty slots rank as -inf); fallback rows check
+        # only the GNN prefix [0, fallback_start_idx), skipping empty slots.
+        scores = df[[f"rec{i}_score" for i in range(1, self.total_slots + 1)]].to_numpy(
+            dtype=np.float64, na_value=np.nan,
+        )
+        is_fb = df["is_fallback"].where(df["is_fallback"].notna(), False).to_numpy(dtype=bool)
+        limit = np.where(
+            is_fb,
+            df["fallback_start_idx"].fillna(0).to_numpy(dtype=np.int64),
+            self.total_slots,
+        )
+        in_range = np.arange(1, self.total_slots)[None, :] < limit[:, None]
+        left, right = scores[:, :-1], scores[:, 1:]
+        filled = np.where(np.isnan(scores), -np.inf, scores)
+        increases = np.where(is_fb[:, None], left < right, filled[:, :-1] < filled[:, 1:])
+        bad_rows = (increases & in_range).any(axis=1)
+        self.order_violations += int((bad_rows & ~is_fb).sum())
+        self.prefix_violations += int((bad_rows & is_fb).sum())
+
+    def report(self, target_count: int | None = None) -> QAReport:
+        """``QAReport`` for the totals seen so far."""
+        failures: list[str] = []
+        n_rows = self.n_rows
+
+        if self.min_users > 0 and n_rows < self.min_users:
+            failures.append(f"Only {n_rows} users (expected >= {self.min_users})")
 
         if target_count is not None and target_count > 0:
-            coverage = len(df) / target_count
+            coverage = n_rows / target_count
             if coverage < self.min_coverage:
                 failures.append(
-                    f"Low target coverage: {len(df)}/{target_count} "
+                    f"Low target coverage: {n_rows}/{target_count} "
                     f"({coverage:.1%}, expected >= {self.min_coverage:.0%})"
                 )
 
-        n_dupes = df["user_id"].duplicated().sum()
+        hashes = np.concatenate(self.user_hashes) if self.user_hashes else np.empty(0, np.uint64)
+        n_dupes = len(hashes) - len(np.unique(hashes))
         if n_dupes > 0:
             failures.append(f"{n_dupes} duplicate users")
 
-        null_slot1 = df["rec1_product_id"].isna().sum()
-        if null_slot1 > 0:
-            failures.append(f"{null_slot1} users missing rec1")
-
-        min_price = self.config.get("graph", {}).get("min_price", 0)
-        if min_price > 0:
-            for i in range(1, self.total_slots + 1):
-                col = f"rec{i}_price"
-                if col in df.columns:
-                    below = (df[col].dropna() < min_price).sum()
-                    if below > 0:
-                        failures.append(f"{below} recs in slot {i} below ${min_price}")
-
-        # Score ordering check using provenance
-        score_cols = [f"rec{i}_score" for i in range(1, self.total_slots + 1)]
-        is_fb = df["is_fallback"].where(df["is_fallback"].notna(), False).astype(bool)
-
-        non_fallback = df[~is_fb]
-        if not non_fallback.empty:
-            sm = non_fallback[score_cols].to_numpy(dtype=np.float64, copy=False)
-            sm = np.where(np.isnan(sm), -np.inf, sm)
-            if np.any(sm[:, :-1] < sm[:, 1:]):
-                failures.append("Score ordering violated (non-fallback rows)")
-
-        fallback_rows = df[is_fb]
-        if not fallback_rows.empty:
-            sm = fallback_rows[score_cols].to_numpy(dtype=np.float64, copy=False)
-            fb_idx = fallback_rows["fallback_start_idx"].to_numpy(dtype=int)
-            prefix_violated = False
-            for i in range(len(sm)):
-                prefix_len = fb_idx[i]
-                if prefix_len < 2:
-                    continue
-                prefix = sm[i, :prefix_len]
-                left, right = prefix[:-1], prefix[1:]
-                mask = ~np.isnan(left) & ~np.isnan(right)
-                if mask.any() and np.any(left[mask] < right[mask]):
-                    prefix_violated = True
-                    break
-            if prefix_violated:
-                failures.append("Score ordering violated (GNN prefix in fallback rows)")
-
-        if failures:
-            for f in failures:
+        if self.null_slot1 > 0:
+            failures.append(f"{self.null_slot1} users missing rec1")
+
+        for i, below in enumerate(self.below_price.tolist(), 1):
+            if below > 0:
+                failures.append(f"{below} recs in slot {i} below ${self.min_price}")
+
+        if self.order_violations:
+            failures.append(
+                f"Score ordering violated (non-fallback rows): {self.order_violations} rows"
+            )
+        if self.prefix_violations:
+            failures.append(
+                f"Score ordering violated (GNN prefix in fallback rows): {self.prefix_violations} rows"
+            )
+        return QAReport(
+            n_rows=n_rows,
+            target_count=target_count,
+            n_duplicate_users=n_dupes,
+            n_missing_rec1=self.null_slot1,
+            n_below_min_price=self.below_price.tolist(),
+            n_order_violations=self.order_violations,
+            n_prefix_violations=self.prefix_violations,
+            failures=failures,
+        )
+
+    def failures(self, target_count: int | None = None) -> list[str]:
+        """Failure messages for the totals seen so far."""
+        return self.report(target_count).failures
+
+    def raise_on_failures(self, target_count: int | None = None) -> QAReport:
+        """Return the ``QAReport``; log and raise QAFailedError if any check failed."""
+        report = self.report(target_count)
+        if report.failures:
+            for f in report.failures:
                 logger.warning("QA FAIL: %s", f)
             raise QAFailedError(
-                f"QA checks failed ({len(failures)} issues): {'; '.join(failures)}"
+                f"QA checks failed ({len(report.failures)} issues): {'; '.join(report.failures)}",
+                report=report,
             )
 
         logger.info("QA checks PASSED")
+        return report
+
+
+# Values is_valid_scalar rejects besides nulls
+_CONTAINER_TYPES = (list, tuple, dict, set)
+
+
+def _lookup_ids(raw: list[Any], to_id: IdIndex, canonical) -> np.ndarray:
+    """Internal ID per raw value (``-1`` for nulls, empties and unknowns).
+
+    ``canonical`` maps a value's string form to its ID-mapping key and runs
+    once per distinct value.
+    """
+    values = pd.Series(raw, dtype=object)
+    valid = values.notna().to_numpy() & ~values.map(type).isin(_CONTAINER_TYPES).to_numpy()
+    codes = np.full(len(values), -1, dtype=np.int64)
+    if not valid.any():
+        return codes
+    positions, uniques = pd.factorize(values[valid].astype(str))
+    keys = np.array([canonical(value) or None for value in uniques], dtype=object)
+    codes[valid] = to_id.encode(keys)[positions]
+    return codes
+
+
+class _PurchaseView(Mapping):
+    """``user_id -> set[int]`` mapping over the scorer's CSR purchase index."""
+
+    def __init__(self, scorer: GNNScorer):
+        self._scorer = scorer
+        self._buyers = np.flatnonzero(np.diff(scorer.purchase_indptr) > 0)
+
+    def __getitem__(self, user_id: str) -> set[int]:
+        uid = self._scorer.user_index.get(user_id)
+        if uid is None or uid >= len(self._scorer.purchase_indptr) - 1:
+            raise KeyError(user_id)
+        pids = self._scorer._purchased(uid)
+        if len(pids) == 0:
+            raise KeyError(user_id)
+        return set(pids.tolist())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._scorer.user_id_array[self._buyers])
+
+    def __len__(self) -> int:
+        return len(self._buyers)
@@ -0,0 +1,70 @@
+"""Compressed sparse row (CSR) helpers for graph adjacency lookups.
+
+Scoring and sampling need "all neighbours of these nodes" for whole batches.
+CSR arrays (``indptr``, ``indices``) answer that with a few vectorized NumPy
+operations instead of per-node Python dict/list walks.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def edges_to_csr(
+    src: np.ndarray,
+    dst: np.ndarray,
+    n_src: int,
+    *,
+    dedup: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Build CSR adjacency from an edge list.
+
+    Args:
+        src: Source node IDs, shape ``[n_edges]``.
+        dst: Destination node IDs, shape ``[n_edges]``.
+        n_src: Number of source nodes (``len(indptr) == n_src + 1``).
+        dedup: Drop parallel (src, dst) edges.
+
+    Returns:
+        ``(indptr, indices)`` where the neighbours of node ``i`` are
+        ``indices[indptr[i]:indptr[i + 1]]``, sorted ascending.
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    if len(src) != len(dst):
+        raise ValueError(f"src and dst lengths differ: {len(src)} vs {len(dst)}")
+    if len(src) and (src.min() < 0 or src.max() >= n_src):
+        raise ValueError(f"src IDs must be in [0, {n_src}), got range [{src.min()}, {src.max()}]")
+
+    order = np.lexsort((dst, src))
+    src, dst = src[order], dst[order]
+    if dedup and len(src) > 1:
+        keep = np.ones(len(src), dtype=bool)
+        keep[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        src, dst = src[keep], dst[keep]
+
+    indptr = np.zeros(n_src + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n_src), out=indptr[1:])
+    return indptr, dst
+
+
+def csr_gather(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    rows: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Gather the neighbours of several rows at once.
+
+    Returns:
+        ``(positions, values)``: ``positions[j]`` is the index into ``rows``
+        that neighbour ``values[j]`` belongs to.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    total = int(counts.sum())
+    positions = np.repeat(np.arange(len(rows), dtype=np.int64), counts)
+    if total == 0:
+        return positions, indices[:0]
+    offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    return positions, indices[np.repeat(starts, counts) + offsets]
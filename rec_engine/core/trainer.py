@@ -7,6 +7,7 @@ Uses RecEnginePlugin for client-specific behavior.
 from __future__ import annotations
 
 import logging
+import time
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -14,8 +15,12 @@ import numpy as np
 import torch
 import torch.nn as nn
 
+from rec_engine.core.compilation import compile_report
+from rec_engine.core.id_index import IdIndex
 from rec_engine.core.metrics import hit_rate_at_k
-from rec_engine.core.model import HeteroGAT
+from rec_engine.core.model import TwoTowerGNN
+from rec_engine.core.negatives import fitment_csr, pair_keys
+from rec_engine.core.sampling import NeighborSampler, local_ids
 from rec_engine.plugins import RecEnginePlugin
 from rec_engine.topology import TopologyStrategy
 
@@ -24,13 +29,15 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+TRAINING_MODES = ("full", "sampled")
+
 
 class GNNTrainer:
-    """Train HeteroGAT with BPR loss and early stopping."""
+    """Train a GNN recommender (``TwoTowerGNN``) with BPR loss and early stopping."""
 
     def __init__(
         self,
-        model: HeteroGAT,
+        model: TwoTowerGNN,
         data: HeteroData,
         split_masks: dict[str, torch.Tensor],
         test_interactions: dict[int, set[int]],
@@ -53,6 +60,12 @@ class GNNTrainer:
         self.patience = train_cfg["patience"]
         self.grad_clip = train_cfg.get("grad_clip", 1.0)
         self.neg_mix = train_cfg.get("negative_mix", {"in_batch": 0.5, "random": 0.5})
+        self.mode = train_cfg.get("mode", "full")
+        if self.mode not in TRAINING_MODES:
+            raise ValueError(f"training.mode must be one of {TRAINING_MODES}, got {self.mode!r}")
+        self.batch_size = int(train_cfg.get("batch_size", 1024))
+        if self.batch_size <= 0:
+            raise ValueError(f"training.batch_size must be positive, got {self.batch_size}")
 
         # Validate negative_mix
         mix_keys = ("in_batch", "fitment_hard", "random")
@@ -83,8 +96,32 @@ class GNNTrainer:
 
         self._prepare_training_edges()
 
-        # Build fitment index via strategy
+        # Sampled mode: BPR steps over per-batch neighbourhood subgraphs
+        self.sampler: NeighborSampler | None = None
+        if self.mode == "sampled":
+            self.sampler = NeighborSampler(
+                self.data,
+                train_cfg.get("fanouts", [10, 10]),
+                relation_fanouts=train_cfg.get("relation_fanouts"),
+                seed=config.get("eval", {}).get("random_seed", 42),
+            )
+            if self.sampler.num_layers != model.num_layers:
+                raise ValueError(
+                    f"training.fanouts needs one entry per GNN layer ({model.num_layers}), "
+                    f"got {self.sampler.num_layers}"
+                )
+
+        # Build fitment index via strategy; hard negatives sample from its CSR form
         self.user_fitment_products = strategy.build_fitment_index(self.data)
+        self.fitment_index_csr = fitment_csr(
+            self.user_fitment_products, self.data["user"].num_nodes, self.device,
+        )
+        # Optionally reject hard negatives that are any training positive of the user
+        self.known_positive_keys: torch.Tensor | None = None
+        if train_cfg.get("hard_negative_reject_positives", False):
+            self.known_positive_keys = pair_keys(
+                self.pos_users, self.pos_products, self.data["product"].num_nodes,
+            )
 
         # Excluded product IDs (excluded from eval candidates)
         excluded_mask = getattr(self.data["product"], "is_excluded", None)
@@ -129,14 +166,14 @@ class GNNTrainer:
         """
         edge_type = ("user", "interacts", "product")
         if edge_type in self.data.edge_types and hasattr(self.data[edge_type], "edge_index"):
-            ei = self.data[edge_type].edge_index
+            ei = self.data[edge_type].edge_index.long()
             # Transductive: filter to train edges only for loss computation
             train_mask = getattr(self.data[edge_type], "train_mask", None)
             if train_mask is not None:
                 self.pos_users = ei[0][train_mask]
                 self.pos_products = ei[1][train_mask]
                 if hasattr(self.data[edge_type], "edge_weight"):
-                    self.edge_weights = self.data[edge_type].edge_weight[train_mask]
+                    self.edge_weights = self.data[edge_type].edge_weight[train_mask].float()
                 else:
                     self.edge_weights = torch.ones(len(self.pos_users), device=self.device)
             else:
@@ -148,7 +185,7 @@ class GNNTrainer:
                 self.pos_users = ei[0]
                 self.pos_products = ei[1]
                 if hasattr(self.data[edge_type], "edge_weight"):
-                    self.edge_weights = self.data[edge_type].edge_weight
+                    self.edge_weights = self.data[edge_type].edge_weight.float()
                 else:
                     self.edge_weights = torch.ones(len(self.pos_users), device=self.device)
         else:
@@ -185,6 +222,8 @@ class GNNTrainer:
         self.model.train()
         if len(self.pos_users) == 0:
             return 0.0
+        if self.sampler is not None:
+            return self._train_epoch_sampled()
 
         perm = torch.randperm(len(self.pos_users), device=self.device)
         pos_u = self.pos_users[perm]
@@ -197,11 +236,50 @@ class GNNTrainer:
         neg_p = self.strategy.build_negative_samples(
             pos_u, pos_p, self.data, self.plugin, self.config,
             user_fitment_products=self.user_fitment_products,
+            fitment_index_csr=self.fitment_index_csr,
+            known_positive_keys=self.known_positive_keys,
         )
         neg_scores = (user_embs[pos_u] * product_embs[neg_p]).sum(dim=1)
 
-        loss = HeteroGAT.bpr_loss(pos_scores, neg_scores, weights=weights)
+        loss = TwoTowerGNN.bpr_loss(pos_scores, neg_scores, weights=weights)
+        self._step(loss)
+        return loss.item()
+
+    def _train_epoch_sampled(self) -> float:
+        """One pass over the training edges in ``batch_size`` mini-batches.
+
+        Each batch draws its negatives, samples the neighbourhood of its
+        users and positive/negative products, and takes one optimizer step
+        on that subgraph. Returns the edge-weighted mean batch loss.
+        """
+        perm = torch.randperm(len(self.pos_users), device=self.device)
+        total_loss, total_weight = 0.0, 0.0
+        for start in range(0, len(perm), self.batch_size):
+            batch = perm[start:start + self.batch_size]
+            pos_u = self.pos_users[batch]
+            pos_p = self.pos_products[batch]
+            weights = self.edge_weights[batch]
+            neg_p = self.strategy.build_negative_samples(
+                pos_u, pos_p, self.data, self.plugin, self.config,
+                user_fitment_products=self.user_fitment_products,
+                fitment_index_csr=self.fitment_index_csr,
+                known_positive_keys=self.known_positive_keys,
+            )
 
+            sub = self.sampler.sample({"user": pos_u, "product": torch.cat([pos_p, neg_p])})
+            user_embs, product_embs = self.model(sub)
+            u = user_embs[local_ids(sub, "user", pos_u)]
+            pos_scores = (u * product_embs[local_ids(sub, "product", pos_p)]).sum(dim=1)
+            neg_scores = (u * product_embs[local_ids(sub, "product", neg_p)]).sum(dim=1)
+
+            loss = TwoTowerGNN.bpr_loss(pos_scores, neg_scores, weights=weights)
+            self._step(loss)
+            batch_weight = float(weights.sum())
+            total_loss += loss.item() * batch_weight
+            total_weight += batch_weight
+        return total_loss / max(total_weight, 1e-8)
+
+    def _step(self, loss: torch.Tensor) -> None:
         self.opt_emb.zero_grad()
         self.opt_gnn.zero_grad()
         loss.backward()
@@ -209,8 +287,6 @@ class GNNTrainer:
         self.opt_emb.step()
         self.opt_gnn.step()
 
-        return loss.item()
-
     @torch.no_grad()
     def validate(self, split: str = "val") -> dict[str, float]:
         """Compute validation metrics on val or test split.
@@ -218,8 +294,9 @@ class GNNTrainer:
         Uses batched scoring when all users share the same candidate pool
         (2-node topology). Falls back to per-user scoring otherwise.
         """
-        self.model.eval()
-        user_embs, product_embs = self.model(self.data)
+        user_embs, product_embs = self.model.embed(
+            self.data, self.config.get("model", {}).get("inference_chunk_size"),
+        )
 
         mask = self.split_masks[f"{split}_mask"]
         k_values = self.config["eval"]["k_values"]
@@ -300,13 +377,14 @@ class GNNTrainer:
 
         epoch = 0
         for epoch in range(self.max_epochs):
+            start = time.perf_counter()
             loss = self.train_epoch()
             val_metrics = self.validate("val")
             val_hr4 = val_metrics.get("hit_rate_at_4", 0.0)
 
             logger.info(
-                "Epoch %d: loss=%.4f, val_hr@4=%.4f (n_eval=%d)",
-                epoch, loss, val_hr4, val_metrics.get("n_evaluated", 0),
+                "Epoch %d: loss=%.4f, val_hr@4=%.4f (n_eval=%d) [%.2fs]",
+                epoch, loss, val_hr4, val_metrics.get("n_evaluated", 0), time.perf_counter() - start,
             )
 
             if val_hr4 > best_val_hr4:
@@ -325,21 +403,49 @@ class GNNTrainer:
             self.model.load_state_dict(best_state)
             self.model = self.model.to(self.device)
 
-        return {
+        results = {
             "best_epoch": best_epoch,
             "best_val_hit_rate_at_4": best_val_hr4,
             "total_epochs": epoch + 1,
         }
+        report = compile_report(self.model)
+        if report is not None:
+            _log_compile_report(report)
+            results["compile"] = report
+        return results
 
     def save_checkpoint(self, path: str, id_mappings: dict | None = None) -> str:
-        """Save model checkpoint with ID mappings."""
+        """Save model checkpoint with ID mappings.
+
+        ``IdIndex`` mappings are stored as plain ``{raw_id: int}`` dicts, the
+        format checkpoint loaders expect.
+        """
         Path(path).parent.mkdir(parents=True, exist_ok=True)
         checkpoint = {
             "model_state_dict": self.model.state_dict(),
             "config": self.config,
         }
         if id_mappings is not None:
-            checkpoint["id_mappings"] = id_mappings
+            checkpoint["id_mappings"] = {
+                key: dict(zip(value.keys_array.tolist(), range(len(value))))
+                if isinstance(value, IdIndex) else value
+                for key, value in id_mappings.items()
+            }
         torch.save(checkpoint, path)
         logger.info("Saved checkpoint to %s", path)
         return path
+
+
+def _log_compile_report(report: dict[str, Any]) -> None:
+    if not report["active"]:
+        logger.warning("torch.compile fell back to eager: %s", report.get("fallback_reason"))
+    for mode in ("train", "eval"):
+        if mode not in report:
+            continue
+        stats = report[mode]
+        logger.info(
+            "torch.compile %s forward: eager %.3fs -> compiled %.3fs per call, "
+            "compile %.1fs, break-even after %s calls (%d calls this run)",
+            mode, stats["eager_s"], stats["compiled_s"], stats["compile_s"],
+            stats["break_even_calls"], stats["calls"],
+        )
@@ -0,0 +1,151 @@
+"""Runtime scoring inputs shared by ``mode_score`` and ``RecommendationService``.
+
+Raw user/product IDs arriving at scoring time (target users, purchase
+exclusions) are resolved to the canonical graph keys through the plugin's
+normalization hooks, and embedding snapshots are loaded together with the
+structural graph that scoring needs.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import pandas as pd
+
+from rec_engine import is_valid_scalar
+from rec_engine.plugins import RecEnginePlugin
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_target_user_ids(
+    target_user_ids: Any,
+    user_to_id: dict[str, int],
+    plugin: RecEnginePlugin,
+) -> set[str]:
+    """Resolve runtime user IDs to graph keys (raw first, then plugin-normalized).
+
+    Unresolvable IDs are logged and dropped.
+    """
+    # Guard against bare-string (would iterate characters)
+    if isinstance(target_user_ids, str):
+        target_user_ids = {target_user_ids}
+    elif not hasattr(target_user_ids, "__iter__"):
+        raise TypeError(
+            f"target_user_ids must be an iterable of user IDs or None, "
+            f"got {type(target_user_ids).__name__}"
+        )
+
+    normalized_targets: set[str] = set()
+    for raw_uid in target_user_ids:
+        if not is_valid_scalar(raw_uid):
+            continue
+        uid = str(raw_uid)
+        if uid in user_to_id:
+            normalized_targets.add(uid)
+        else:
+            canon = plugin.normalize_user_id(uid)
+            if canon in user_to_id:
+                normalized_targets.add(canon)
+            else:
+                logger.warning("Runtime target user ID %r not in graph, skipping", raw_uid)
+    if not normalized_targets:
+        logger.warning("All target_user_ids were unresolvable — result will be empty")
+    return normalized_targets
+
+
+def normalize_user_purchases(
+    user_purchases: Any,
+    user_to_id: dict[str, int],
+    plugin: RecEnginePlugin,
+) -> dict[str, set[str]]:
+    """Normalize purchase UID keys and PID values through plugin hooks.
+
+    Keeps purchase exclusion lookups consistent with the canonical
+    ``user_to_id`` / ``product_to_id`` keys; users not in the graph are dropped.
+    """
+    if not hasattr(user_purchases, "items"):
+        raise TypeError(
+            f"user_purchases must be a dict-like mapping (uid -> product_ids), "
+            f"got {type(user_purchases).__name__}"
+        )
+    normalized_purchases: dict[str, set[str]] = {}
+    for raw_uid, pids in user_purchases.items():
+        if not is_valid_scalar(raw_uid):
+            continue
+        uid = str(raw_uid)
+        if uid in user_to_id:
+            canon_uid = uid
+        else:
+            canon_uid = plugin.normalize_user_id(uid)
+            if canon_uid not in user_to_id:
+                continue
+        # Guard against bare-string values (would iterate characters)
+        # and non-iterable values (None, int, float) that would crash .update()
+        if isinstance(pids, str):
+            pids = {pids}
+        elif not hasattr(pids, "__iter__"):
+            logger.warning("user_purchases[%r] is non-iterable (%s), skipping", raw_uid, type(pids).__name__)
+            continue
+        existing = normalized_purchases.setdefault(canon_uid, set())
+        for pid in pids:
+            if is_valid_scalar(pid):
+                existing.add(plugin.normalize_product_id(str(pid)))
+            else:
+                logger.warning("user_purchases[%r] contains non-scalar element (%s), skipping element", raw_uid, type(pid).__name__)
+    return normalized_purchases
+
+
+def load_snapshot_inputs(
+    snapshot_dir: str,
+    dataframes: dict[str, Any],
+    config: dict[str, Any],
+) -> tuple[Any, Any, dict[str, dict], dict[str, pd.DataFrame]]:
+    """Load an embedding snapshot and the structural graph scoring needs.
+
+    ID mappings come from the snapshot, so users/products added to the data
+    since training are ignored until the next training run.
+
+    Returns:
+        ``(snapshot, data, id_mappings, nodes)``.
+    """
+    from rec_engine.core.embeddings import EmbeddingSnapshot
+    from rec_engine.core.graph_builder import build_scoring_graph
+
+    snapshot = EmbeddingSnapshot.load(snapshot_dir)
+    id_mappings = snapshot.id_mappings
+    n_new_users = dataframes["users"]["user_id"].nunique() - len(id_mappings["user_to_id"])
+    if n_new_users > 0:
+        logger.warning(
+            "%d users are not in embedding snapshot %s and will not be scored",
+            n_new_users, snapshot_dir,
+        )
+    nodes, edges = prepare_graph_inputs(dataframes)
+    data = build_scoring_graph(nodes, edges, id_mappings, config)
+    return snapshot, data, id_mappings, nodes
+
+
+def prepare_graph_inputs(
+    dataframes: dict[str, Any],
+) -> tuple[dict[str, pd.DataFrame], dict[str, pd.DataFrame]]:
+    """Extract node and edge DataFrames from canonical dataframes dict.
+
+    Returns (nodes, edges) ready for build_hetero_graph.
+    """
+    nodes: dict[str, pd.DataFrame] = {
+        "users": dataframes["users"],
+        "products": dataframes["products"],
+    }
+    edges: dict[str, pd.DataFrame] = {
+        "interactions": dataframes["interactions"],
+    }
+    if "entities" in dataframes:
+        nodes["entities"] = dataframes["entities"]
+    if "fitment" in dataframes:
+        edges["fitment"] = dataframes["fitment"]
+    if "ownership" in dataframes:
+        edges["ownership"] = dataframes["ownership"]
+    if "copurchase" in dataframes:
+        edges["copurchase"] = dataframes["copurchase"]
+    return nodes, edges
@@ -11,6 +11,8 @@ import enum
 from abc import ABC, abstractmethod
 from typing import Any
 
+import numpy as np
+
 
 class FallbackTier(enum.Enum):
     """Typed fallback tier identifiers."""
@@ -63,6 +65,62 @@ class RecEnginePlugin(ABC):
         """
         return True
 
+    def post_rank_filter_batch(
+        self, product_ids: np.ndarray, context: dict[str, Any],
+    ) -> np.ndarray:
+        """Vectorized ``post_rank_filter`` for one user's ranked candidates.
+
+        Override this instead of ``post_rank_filter`` when the rule can be
+        evaluated on arrays; the scorer calls it once per user rather than
+        once per (user, product). Default: per-item ``post_rank_filter``.
+
+        Args:
+            product_ids: Internal integer product IDs, shape ``[n]``.
+            context: Dict with:
+                - scorer (bool): True when called from scorer
+                - user_id (str | None): User being scored
+                - product_str_ids (np.ndarray): Original string IDs, aligned
+                - categories (np.ndarray): Category labels, aligned
+
+        Returns:
+            Boolean array, shape ``[n]``; True keeps the product.
+        """
+        base = {k: v for k, v in context.items() if k not in ("product_str_ids", "categories")}
+        str_ids = context.get("product_str_ids")
+        categories = context.get("categories")
+        return np.fromiter(
+            (
+                self.post_rank_filter(int(pid), {
+                    **base,
+                    "product_str_id": str_ids[i] if str_ids is not None else "",
+                    "category": categories[i] if categories is not None else "",
+                })
+                for i, pid in enumerate(np.asarray(product_ids).tolist())
+            ),
+            dtype=bool,
+            count=len(product_ids),
+        )
+
+    def static_product_mask(
+        self, product_ids: np.ndarray, context: dict[str, Any],
+    ) -> np.ndarray | None:
+        """User-independent product filter, evaluated once at scorer init.
+
+        Products it rejects are dropped from the GNN candidates and fallback
+        pools for every user, so rules that do not depend on the user
+        (discontinued SKUs, restricted categories) cost nothing per user.
+        Default: None (no static filter).
+
+        Args:
+            product_ids: All internal integer product IDs, shape ``[n]``.
+            context: Dict with ``product_str_ids`` and ``categories`` arrays
+                aligned with ``product_ids``.
+
+        Returns:
+            Boolean array, shape ``[n]`` (True keeps the product), or None.
+        """
+        return None
+
     def fallback_tiers(self, user_context: dict[str, Any]) -> list[FallbackTier]:
         """Define fallback tier order.
 
@@ -117,6 +175,25 @@ def validate_plugin(plugin_cls: type[RecEnginePlugin]) -> list[str]:
             instance.dedup_variant("TEST123")
             instance.map_interaction_weight("view")
             instance.post_rank_filter(0, {})
+            probe_ids = np.arange(2)
+            probe_context = {
+                "scorer": False,
+                "user_id": None,
+                "product_str_ids": np.array(["TEST0", "TEST1"], dtype=object),
+                "categories": np.array(["", ""], dtype=object),
+            }
+            errors.extend(_check_mask_hook(
+                "post_rank_filter_batch",
+                instance.post_rank_filter_batch(probe_ids, probe_context),
+                len(probe_ids),
+                allow_none=False,
+            ))
+            errors.extend(_check_mask_hook(
+                "static_product_mask",
+                instance.static_product_mask(probe_ids, probe_context),
+                len(probe_ids),
+                allow_none=True,
+            ))
             instance.fallback_tiers({"topology": "user-product"})
             instance.fallback_tiers({"topology": "user-entity-product"})
             instance.get_go_no_go_thresholds()
@@ -126,3 +203,13 @@ def validate_plugin(plugin_cls: type[RecEnginePlugin]) -> list[str]:
             errors.append(f"Plugin smoke test failed: {exc}")
 
     return errors
+
+
+def _check_mask_hook(name: str, result: Any, n: int, *, allow_none: bool) -> list[str]:
+    """Validate a vectorized filter hook returned a length-``n`` bool array."""
+    if result is None:
+        return [] if allow_none else [f"{name} returned None; expected a bool array"]
+    arr = np.asarray(result)
+    if arr.dtype != bool or arr.shape != (n,):
+        return [f"{name} must return a bool array of shape ({n},), got {arr.dtype} {arr.shape}"]
+    return []
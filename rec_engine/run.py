@@ -19,6 +19,13 @@ import yaml
 
 from rec_engine import CONTRACT_VERSION, is_valid_scalar
 from rec_engine.contracts import check_contract_version
+from rec_engine.core.id_index import IdIndex, as_id_index
+from rec_engine.inputs import (
+    load_snapshot_inputs,
+    normalize_target_user_ids,
+    normalize_user_purchases,
+    prepare_graph_inputs,
+)
 from rec_engine.plugins import RecEnginePlugin, validate_plugin
 from rec_engine.topology import create_strategy
 
@@ -79,10 +86,18 @@ def build_model(
     product_num_features: int = 3,
     entity_num_features: int = 0,
 ):
-    """Instantiate HeteroGAT."""
-    from rec_engine.core.model import HeteroGAT
+    """Instantiate the model class selected by ``model.type`` (default ``gat``).
+
+    With ``model.compile`` set, ``forward`` runs through ``torch.compile``.
+    """
+    from rec_engine.core.compilation import compile_model
+    from rec_engine.core.model import MODEL_TYPES
 
-    return HeteroGAT(
+    model_type = config["model"].get("type", "gat")
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"model.type must be one of {sorted(MODEL_TYPES)}, got {model_type!r}")
+
+    model = MODEL_TYPES[model_type](
         n_users=n_users,
         n_products=n_products,
         n_entities=n_entities,
@@ -93,6 +108,7 @@ def build_model(
         product_num_features=product_num_features,
         entity_num_features=entity_num_features,
     )
+    return compile_model(model, config)
 
 
 def preprocess_dataframes(
@@ -171,6 +187,7 @@ def mode_train(
     """Full training pipeline: preprocess -> validate -> build -> train -> evaluate."""
     from rec_engine.contracts import validate
     from rec_engine.core.graph_builder import build_hetero_graph
+    from rec_engine.core.graph_cache import cached_build
 
     strategy = create_strategy(config)
 
@@ -184,8 +201,8 @@ def mode_train(
     id_mappings = _build_id_mappings(dataframes, config)
 
     # Build graph
-    nodes, edges = _prepare_graph_inputs(dataframes)
-    data, split_masks, metadata = build_hetero_graph(nodes, edges, id_mappings, config)
+    nodes, edges = prepare_graph_inputs(dataframes)
+    data, split_masks, metadata = cached_build(build_hetero_graph, nodes, edges, id_mappings, config)
 
     # Build test interactions
     test_df = dataframes.get("test_interactions")
@@ -224,6 +241,15 @@ def mode_train(
     train_results = trainer.train()
     logger.info("Training complete: %s", train_results)
 
+    snapshot_dir = config.get("output", {}).get("embedding_snapshot_dir")
+    if snapshot_dir:
+        from rec_engine.core.embeddings import compute_snapshot
+
+        compute_snapshot(
+            model, data, id_mappings, split_masks=split_masks,
+            chunk_size=config.get("model", {}).get("inference_chunk_size"),
+        ).save(snapshot_dir)
+
     return {
         "train_results": train_results,
         "model": model,
@@ -233,6 +259,7 @@ def mode_train(
         "metadata": metadata,
         "nodes": nodes,
         "strategy": strategy,
+        "embedding_snapshot_dir": snapshot_dir or None,
     }
 
 
@@ -244,19 +271,24 @@ def mode_evaluate(
     model_checkpoint: str | None = None,
     train_result: dict[str, Any] | None = None,
     baseline_df: pd.DataFrame | None = None,
+    embedding_snapshot: str | None = None,
 ) -> dict[str, Any]:
     """Full evaluation pipeline: preprocess -> validate -> build -> evaluate.
 
-    Can use either a pre-trained model (from train_result) or load from checkpoint.
+    Can use either a pre-trained model (from train_result), an embedding
+    snapshot written by training (skips graph features and the forward
+    pass), or load from checkpoint.
     """
     from rec_engine.contracts import validate
     from rec_engine.core.evaluator import GNNEvaluator
     from rec_engine.core.graph_builder import build_hetero_graph
+    from rec_engine.core.graph_cache import cached_build
 
     strategy = create_strategy(config)
     dataframes = preprocess_dataframes(dataframes, plugin, config)
     validate(dataframes, config)
 
+    snapshot = None
     if train_result is not None:
         # Use in-memory model from training
         model = train_result["model"]
@@ -265,16 +297,27 @@ def mode_evaluate(
         id_mappings = train_result["id_mappings"]
         nodes = train_result["nodes"]
         metadata = train_result["metadata"]
+    elif embedding_snapshot:
+        snapshot, data, id_mappings, nodes = load_snapshot_inputs(
+            embedding_snapshot, dataframes, config,
+        )
+        model = None
+        split_masks = snapshot.split_mask_tensors()
+        if "test_mask" not in split_masks:
+            raise ValueError(
+                f"Embedding snapshot {embedding_snapshot} has no split masks; "
+                "re-export it from mode_train to evaluate."
+            )
     else:
         if not model_checkpoint:
             raise ValueError(
-                "mode_evaluate requires either train_result or model_checkpoint. "
+                "mode_evaluate requires either train_result or model_checkpoint (or embedding_snapshot). "
                 "Evaluating with an untrained model would produce meaningless metrics."
             )
         # Build fresh from dataframes
         id_mappings = _build_id_mappings(dataframes, config)
-        nodes, edges = _prepare_graph_inputs(dataframes)
-        data, split_masks, metadata = build_hetero_graph(nodes, edges, id_mappings, config)
+        nodes, edges = prepare_graph_inputs(dataframes)
+        data, split_masks, metadata = cached_build(build_hetero_graph, nodes, edges, id_mappings, config)
 
         model = _load_model_from_checkpoint(
             model_checkpoint, data, id_mappings, metadata, strategy, config,
@@ -293,6 +336,7 @@ def mode_evaluate(
         strategy=strategy,
         plugin=plugin,
         baseline_df=baseline_df,
+        embeddings=snapshot,
     )
     results = evaluator.generate_report()
     logger.info("Evaluation complete: go/no-go=%s", results["go_no_go"]["decision"])
@@ -309,34 +353,158 @@ def mode_score(
     train_result: dict[str, Any] | None = None,
     target_user_ids: set[str] | None = None,
     user_purchases: dict[str, set[str]] | None = None,
+    embedding_snapshot: str | None = None,
 ) -> pd.DataFrame:
     """Full scoring pipeline: preprocess -> validate -> build -> score.
 
-    Can use either a pre-trained model (from train_result) or load from checkpoint.
-    Returns scored recommendations DataFrame.
+    Can use either a pre-trained model (from train_result), an embedding
+    snapshot written by training (skips graph features and the forward
+    pass), or load from checkpoint. Returns the scored recommendations
+    DataFrame; see ``mode_score_to_parquet`` for streamed output and
+    ``mode_score_incremental`` for re-scoring only changed users.
+    """
+    scorer, _, target_user_ids = _build_scorer(
+        config, dataframes, plugin,
+        model_checkpoint=model_checkpoint,
+        train_result=train_result,
+        target_user_ids=target_user_ids,
+        user_purchases=user_purchases,
+        embedding_snapshot=embedding_snapshot,
+    )
+    df = scorer.score_all_users(target_user_ids)
+    logger.info("Scoring complete: %d users scored", len(df))
+
+    return df
+
+
+def mode_score_incremental(
+    config: dict[str, Any],
+    dataframes: dict[str, Any],
+    plugin: RecEnginePlugin,
+    fingerprint_dir: str,
+    *,
+    previous_output: pd.DataFrame | None = None,
+    model_checkpoint: str | None = None,
+    train_result: dict[str, Any] | None = None,
+    target_user_ids: set[str] | None = None,
+    user_purchases: dict[str, set[str]] | None = None,
+    embedding_snapshot: str | None = None,
+) -> dict[str, Any]:
+    """``mode_score`` that re-scores only users whose inputs changed.
+
+    Input fingerprints of the previous run are read from ``fingerprint_dir``;
+    users whose inputs are unchanged are carried forward from
+    ``previous_output`` and the new fingerprints are written back. Without
+    previous output or fingerprints every target user is scored. Model
+    inputs are as for ``mode_score``.
+
+    Returns:
+        The ``GNNScorer.score_incremental`` result dict (``recommendations``
+        holds the full merged output).
+    """
+    from rec_engine.core.incremental import ScoringFingerprints
+
+    scorer, dataframes, target_user_ids = _build_scorer(
+        config, dataframes, plugin,
+        model_checkpoint=model_checkpoint,
+        train_result=train_result,
+        target_user_ids=target_user_ids,
+        user_purchases=user_purchases,
+        embedding_snapshot=embedding_snapshot,
+    )
+    result = scorer.score_incremental(
+        previous_output,
+        ScoringFingerprints.load(fingerprint_dir),
+        target_user_ids,
+        interactions=dataframes.get("interactions"),
+    )
+    result["fingerprints"].save(fingerprint_dir)
+    logger.info(
+        "Scoring complete: %d users re-scored, %d carried forward",
+        result["n_rescored"], result["n_carried"],
+    )
+    return result
+
+
+def mode_score_to_parquet(
+    config: dict[str, Any],
+    dataframes: dict[str, Any],
+    plugin: RecEnginePlugin,
+    output_dir: str,
+    *,
+    model_checkpoint: str | None = None,
+    train_result: dict[str, Any] | None = None,
+    target_user_ids: set[str] | None = None,
+    user_purchases: dict[str, set[str]] | None = None,
+    embedding_snapshot: str | None = None,
+) -> dict[str, Any]:
+    """``mode_score`` streamed to Parquet shards under ``output_dir``.
+
+    Users are scored in ``scoring.chunk_size`` chunks and each chunk is
+    written as one shard, so peak memory does not grow with the number of
+    users. Model inputs are as for ``mode_score``.
+
+    Returns:
+        The ``GNNScorer.score_to_parquet`` shard summary.
+    """
+    scorer, _, target_user_ids = _build_scorer(
+        config, dataframes, plugin,
+        model_checkpoint=model_checkpoint,
+        train_result=train_result,
+        target_user_ids=target_user_ids,
+        user_purchases=user_purchases,
+        embedding_snapshot=embedding_snapshot,
+    )
+    summary = scorer.score_to_parquet(output_dir, target_user_ids)
+    logger.info("Scoring complete: %d users scored", summary["n_rows"])
+    return summary
+
+
+def _build_scorer(
+    config: dict[str, Any],
+    dataframes: dict[str, Any],
+    plugin: RecEnginePlugin,
+    *,
+    model_checkpoint: str | None,
+    train_result: dict[str, Any] | None,
+    target_user_ids: set[str] | None,
+    user_purchases: dict[str, set[str]] | None,
+    embedding_snapshot: str | None,
+) -> tuple[Any, dict[str, Any], set[str] | None]:
+    """Preprocess, validate and build the ``GNNScorer`` for the scoring modes.
+
+    Returns:
+        ``(scorer, preprocessed dataframes, normalized target_user_ids)``.
     """
     from rec_engine.contracts import validate
     from rec_engine.core.graph_builder import build_hetero_graph
+    from rec_engine.core.graph_cache import cached_build
     from rec_engine.core.scorer import GNNScorer
 
     strategy = create_strategy(config)
     dataframes = preprocess_dataframes(dataframes, plugin, config)
     validate(dataframes, config)
 
+    snapshot = None
     if train_result is not None:
         model = train_result["model"]
         data = train_result["data"]
         id_mappings = train_result["id_mappings"]
         nodes = train_result["nodes"]
+    elif embedding_snapshot:
+        snapshot, data, id_mappings, nodes = load_snapshot_inputs(
+            embedding_snapshot, dataframes, config,
+        )
+        model = None
     else:
         if not model_checkpoint:
             raise ValueError(
-                "mode_score requires either train_result or model_checkpoint. "
+                "mode_score requires either train_result or model_checkpoint (or embedding_snapshot). "
                 "Scoring with an untrained model would produce meaningless results."
             )
         id_mappings = _build_id_mappings(dataframes, config)
-        nodes, edges = _prepare_graph_inputs(dataframes)
-        data, _, metadata = build_hetero_graph(nodes, edges, id_mappings, config)
+        nodes, edges = prepare_graph_inputs(dataframes)
+        data, _, metadata = cached_build(build_hetero_graph, nodes, edges, id_mappings, config)
 
         model = _load_model_from_checkpoint(
             model_checkpoint, data, id_mappings, metadata, strategy, config,
@@ -345,68 +513,10 @@ def mode_score(
     # Normalize runtime inputs conditionally: keep IDs already in graph,
     # normalize only unknown raw IDs, drop unresolvable ones.
     user_to_id = id_mappings["user_to_id"]
-
     if target_user_ids is not None:
-        # Guard against bare-string (would iterate characters)
-        if isinstance(target_user_ids, str):
-            target_user_ids = {target_user_ids}
-        elif not hasattr(target_user_ids, "__iter__"):
-            raise TypeError(
-                f"target_user_ids must be an iterable of user IDs or None, "
-                f"got {type(target_user_ids).__name__}"
-            )
-
-    if target_user_ids is not None:
-        normalized_targets: set[str] = set()
-        for raw_uid in target_user_ids:
-            if not _is_valid_scalar(raw_uid):
-                continue
-            uid = str(raw_uid)
-            if uid in user_to_id:
-                normalized_targets.add(uid)
-            else:
-                canon = plugin.normalize_user_id(uid)
-                if canon in user_to_id:
-                    normalized_targets.add(canon)
-                else:
-                    logger.warning("Runtime target user ID %r not in graph, skipping", raw_uid)
-        if not normalized_targets:
-            logger.warning("All target_user_ids were unresolvable — result will be empty")
-        target_user_ids = normalized_targets
-
+        target_user_ids = normalize_target_user_ids(target_user_ids, user_to_id, plugin)
     if user_purchases is not None:
-        if not hasattr(user_purchases, "items"):
-            raise TypeError(
-                f"user_purchases must be a dict-like mapping (uid -> product_ids), "
-                f"got {type(user_purchases).__name__}"
-            )
-        # Normalize UID keys and PID values through plugin hooks so
-        # purchase exclusion lookups match the canonical product_to_id keys.
-        normalized_purchases: dict[str, set[str]] = {}
-        for raw_uid, pids in user_purchases.items():
-            if not _is_valid_scalar(raw_uid):
-                continue
-            uid = str(raw_uid)
-            if uid in user_to_id:
-                canon_uid = uid
-            else:
-                canon_uid = plugin.normalize_user_id(uid)
-                if canon_uid not in user_to_id:
-                    continue
-            # Guard against bare-string values (would iterate characters)
-            # and non-iterable values (None, int, float) that would crash .update()
-            if isinstance(pids, str):
-                pids = {pids}
-            elif not hasattr(pids, "__iter__"):
-                logger.warning("user_purchases[%r] is non-iterable (%s), skipping", raw_uid, type(pids).__name__)
-                continue
-            existing = normalized_purchases.setdefault(canon_uid, set())
-            for pid in pids:
-                if _is_valid_scalar(pid):
-                    existing.add(plugin.normalize_product_id(str(pid)))
-                else:
-                    logger.warning("user_purchases[%r] contains non-scalar element (%s), skipping element", raw_uid, type(pid).__name__)
-        user_purchases = normalized_purchases
+        user_purchases = normalize_user_purchases(user_purchases, user_to_id, plugin)
 
     scorer = GNNScorer(
         model=model,
@@ -417,11 +527,9 @@ def mode_score(
         strategy=strategy,
         plugin=plugin,
         user_purchases=user_purchases,
+        embeddings=snapshot,
     )
-    df = scorer.score_all_users(target_user_ids)
-    logger.info("Scoring complete: %d users scored", len(df))
-
-    return df
+    return scorer, dataframes, target_user_ids
 
 
 def _load_model_from_checkpoint(
@@ -432,7 +540,7 @@ def _load_model_from_checkpoint(
     strategy: Any,
     config: dict[str, Any],
 ) -> Any:
-    """Load a trained HeteroGAT model from a checkpoint file.
+    """Load a trained model (``model.type``) from a checkpoint file.
 
     Security note: uses weights_only=False because checkpoints contain both
     model_state_dict (tensors) and config (plain dict). This allows arbitrary
@@ -463,64 +571,17 @@ def _load_model_from_checkpoint(
     return model
 
 
-def _prepare_graph_inputs(
-    dataframes: dict[str, Any],
-) -> tuple[dict[str, pd.DataFrame], dict[str, pd.DataFrame]]:
-    """Extract node and edge DataFrames from canonical dataframes dict.
-
-    Returns (nodes, edges) ready for build_hetero_graph.
-    """
-    nodes: dict[str, pd.DataFrame] = {
-        "users": dataframes["users"],
-        "products": dataframes["products"],
-    }
-    edges: dict[str, pd.DataFrame] = {
-        "interactions": dataframes["interactions"],
-    }
-    if "entities" in dataframes:
-        nodes["entities"] = dataframes["entities"]
-    if "fitment" in dataframes:
-        edges["fitment"] = dataframes["fitment"]
-    if "ownership" in dataframes:
-        edges["ownership"] = dataframes["ownership"]
-    if "copurchase" in dataframes:
-        edges["copurchase"] = dataframes["copurchase"]
-    return nodes, edges
-
-
 def _build_id_mappings(
     dataframes: dict[str, Any],
     config: dict[str, Any],
-) -> dict[str, dict]:
-    """Build deterministic ID mappings from canonical DataFrames."""
-    users_df = dataframes["users"]
-    products_df = dataframes["products"]
-
-    user_to_id = {
-        uid: i for i, uid in enumerate(
-            sorted(users_df["user_id"].drop_duplicates().tolist())
-        )
-    }
-    product_to_id = {
-        pid: i for i, pid in enumerate(
-            sorted(products_df["product_id"].drop_duplicates().tolist())
-        )
-    }
-
+) -> dict[str, IdIndex]:
+    """Build deterministic ID mappings (sorted raw IDs) from canonical DataFrames."""
     mappings = {
-        "user_to_id": user_to_id,
-        "product_to_id": product_to_id,
+        "user_to_id": IdIndex.from_values(dataframes["users"]["user_id"]),
+        "product_to_id": IdIndex.from_values(dataframes["products"]["product_id"]),
     }
-
     if "entities" in dataframes:
-        entities_df = dataframes["entities"]
-        entity_to_id = {
-            eid: i for i, eid in enumerate(
-                sorted(entities_df["entity_id"].drop_duplicates().tolist())
-            )
-        }
-        mappings["entity_to_id"] = entity_to_id
-
+        mappings["entity_to_id"] = IdIndex.from_values(dataframes["entities"]["entity_id"])
     return mappings
 
 
@@ -532,18 +593,14 @@ def _build_test_interactions(
     if test_df is None or test_df.empty:
         return {}
 
-    user_to_id = id_mappings["user_to_id"]
-    product_to_id = id_mappings["product_to_id"]
-
     interactions: dict[int, set[int]] = {}
     pairs = test_df.assign(
-        _uid=test_df["user_id"].map(user_to_id),
-        _pid=test_df["product_id"].map(product_to_id),
-    ).dropna(subset=["_uid", "_pid"])
+        _uid=as_id_index(id_mappings["user_to_id"]).encode(test_df["user_id"]),
+        _pid=as_id_index(id_mappings["product_to_id"]).encode(test_df["product_id"]),
+    )
+    pairs = pairs[(pairs["_uid"] >= 0) & (pairs["_pid"] >= 0)]
 
     if not pairs.empty:
-        pairs["_uid"] = pairs["_uid"].astype(int)
-        pairs["_pid"] = pairs["_pid"].astype(int)
         for uid, group in pairs.groupby("_uid"):
             interactions[int(uid)] = set(group["_pid"].tolist())
 
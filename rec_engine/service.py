@@ -0,0 +1,145 @@
+"""Warm in-process recommendation service for single users and small batches.
+
+``mode_score`` rebuilds the graph and scores every user. Triggered sends
+(cart abandonment, browse follow-ups) need one user's recommendations in
+milliseconds, so ``RecommendationService`` does the expensive work once —
+embeddings (snapshot or forward pass), product metadata arrays, fitment CSR,
+purchase index, popularity fallback pools, ANN index, candidate key matrix —
+and each ``recommend`` call only runs the per-user scoring path of
+``GNNScorer``.
+Rows are identical to what ``GNNScorer`` produces for the same users.
+
+Usage::
+
+    service = RecommendationService.from_snapshot(config, dataframes, plugin, "snapshots/latest")
+    df = service.recommend(["user@example.com"], purchases_override={"user@example.com": cart_skus})
+    service.latency_percentiles()  # {"count": ..., "p50_ms": ..., "p95_ms": ..., "p99_ms": ...}
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import torch
+
+from rec_engine.core.scorer import GNNScorer
+from rec_engine.inputs import (
+    load_snapshot_inputs,
+    normalize_target_user_ids,
+    normalize_user_purchases,
+)
+from rec_engine.plugins import RecEnginePlugin
+from rec_engine.run import preprocess_dataframes
+from rec_engine.topology import create_strategy
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationService:
+    """Low-latency ``recommend()`` over a warm ``GNNScorer``.
+
+    Not thread-safe: use one instance per worker thread or process.
+
+    Args:
+        scorer: Fully constructed scorer (model or embedding snapshot).
+        latency_window: Most recent calls kept for latency percentiles.
+    """
+
+    def __init__(self, scorer: GNNScorer, *, latency_window: int = 10_000):
+        self.scorer = scorer
+        start = time.perf_counter()
+        self.user_embs, self.product_embs = scorer.warm()
+        self._latencies_ms: deque[float] = deque(maxlen=latency_window)
+        logger.info(
+            "RecommendationService warm in %.1f ms (%d users, %d products)",
+            (time.perf_counter() - start) * 1e3, len(self.user_embs), len(self.product_embs),
+        )
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        config: dict[str, Any],
+        dataframes: dict[str, Any],
+        plugin: RecEnginePlugin,
+        embedding_snapshot: str,
+        *,
+        user_purchases: dict[str, set[str]] | None = None,
+        latency_window: int = 10_000,
+    ) -> RecommendationService:
+        """Build from an embedding snapshot plus the scoring dataframes.
+
+        Inputs are preprocessed, validated and normalized as in ``mode_score``.
+        """
+        from rec_engine.contracts import validate
+
+        dataframes = preprocess_dataframes(dataframes, plugin, config)
+        validate(dataframes, config)
+        snapshot, data, id_mappings, nodes = load_snapshot_inputs(
+            embedding_snapshot, dataframes, config,
+        )
+        if user_purchases is not None:
+            user_purchases = normalize_user_purchases(
+                user_purchases, id_mappings["user_to_id"], plugin,
+            )
+        scorer = GNNScorer(
+            model=None,
+            data=data,
+            id_mappings=id_mappings,
+            nodes=nodes,
+            config=config,
+            strategy=create_strategy(config),
+            plugin=plugin,
+            user_purchases=user_purchases,
+            embeddings=snapshot,
+        )
+        return cls(scorer, latency_window=latency_window)
+
+    @torch.no_grad()
+    def recommend(
+        self,
+        user_ids: Any,
+        purchases_override: dict[str, set[str]] | None = None,
+    ) -> pd.DataFrame:
+        """Recommendations for ``user_ids`` (one ID or an iterable).
+
+        Args:
+            user_ids: Raw or canonical user IDs; unknown users are skipped.
+            purchases_override: ``user_id -> product IDs`` replacing those
+                users' indexed purchases for this call only (e.g. a cart that
+                was just bought). Normalized like ``mode_score`` purchases.
+
+        Returns:
+            DataFrame in ``GNNScorer._output_columns()`` order, one row per
+            resolvable user with recommendations, sorted like batch output.
+        """
+        start = time.perf_counter()
+        scorer = self.scorer
+        user_to_id = scorer.id_mappings["user_to_id"]
+        targets = normalize_target_user_ids(user_ids, user_to_id, scorer.plugin)
+        if purchases_override:
+            scorer = scorer.with_purchase_overrides(
+                normalize_user_purchases(purchases_override, user_to_id, scorer.plugin),
+            )
+
+        df = scorer.score_users(targets, self.user_embs, self.product_embs)
+        self._latencies_ms.append((time.perf_counter() - start) * 1e3)
+        return df
+
+    def latency_percentiles(self) -> dict[str, float]:
+        """p50/p95/p99/max ``recommend`` latency (ms) over the recent window."""
+        if not self._latencies_ms:
+            return {"count": 0}
+        latencies = np.fromiter(self._latencies_ms, dtype=np.float64)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "count": len(latencies),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(latencies.max()),
+        }
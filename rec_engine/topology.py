@@ -11,6 +11,7 @@ from typing import TYPE_CHECKING, Any
 
 import torch
 
+from rec_engine.core.negatives import FitmentCSR, fitment_csr, sample_fitment_negatives
 from rec_engine.plugins import FallbackTier, RecEnginePlugin
 
 if TYPE_CHECKING:
@@ -43,8 +44,16 @@ class TopologyStrategy(ABC):
         config: dict[str, Any],
         *,
         user_fitment_products: dict[int, list[int]] | None = None,
+        fitment_index_csr: FitmentCSR | None = None,
+        known_positive_keys: torch.Tensor | None = None,
     ) -> torch.Tensor:
-        """Sample negative products for BPR training."""
+        """Sample negative products for BPR training.
+
+        ``fitment_index_csr`` is ``user_fitment_products`` as CSR tensors
+        (built from the dict when omitted); ``known_positive_keys`` (sorted
+        ``pair_keys`` of all known positives) rejects hard negatives the user
+        already interacted with.
+        """
         ...
 
     @abstractmethod
@@ -100,6 +109,8 @@ class UserProductStrategy(TopologyStrategy):
         config: dict[str, Any],
         *,
         user_fitment_products: dict[int, list[int]] | None = None,
+        fitment_index_csr: FitmentCSR | None = None,
+        known_positive_keys: torch.Tensor | None = None,
     ) -> torch.Tensor:
         """Random-only negative sampling (no entity-aware hard negatives)."""
         n = len(user_ids)
@@ -179,6 +190,8 @@ class UserEntityProductStrategy(TopologyStrategy):
         config: dict[str, Any],
         *,
         user_fitment_products: dict[int, list[int]] | None = None,
+        fitment_index_csr: FitmentCSR | None = None,
+        known_positive_keys: torch.Tensor | None = None,
     ) -> torch.Tensor:
         """Mixed negative sampling: in-batch + fitment-hard + random."""
         n = len(user_ids)
@@ -196,39 +209,17 @@ class UserEntityProductStrategy(TopologyStrategy):
         perm = torch.randperm(n, device=device)
         neg_products[:n_inbatch] = pos_product_ids[perm[:n_inbatch]]
 
-        # Fitment-hard negatives (entity-aware)
-        fitment_map = user_fitment_products or {}
-        for i in range(n_inbatch, n_inbatch + n_fitment):
-            uid = user_ids[i].item()
-            fitment_prods = fitment_map.get(uid, [])
-            pos_pid = pos_product_ids[i].item()
-
-            if not fitment_prods:
-                neg_products[i] = torch.randint(n_products, (1,), device=device)
-                continue
-
-            if len(fitment_prods) == 1 and fitment_prods[0] == pos_pid:
-                neg_products[i] = torch.randint(n_products, (1,), device=device)
-                continue
-
-            # Rejection sampling
-            candidate = pos_pid
-            for _ in range(4):
-                sampled_idx = torch.randint(
-                    len(fitment_prods), (1,), device=device
-                ).item()
-                candidate = fitment_prods[sampled_idx]
-                if candidate != pos_pid:
-                    break
-
-            if candidate == pos_pid:
-                fallback = next((p for p in fitment_prods if p != pos_pid), None)
-                if fallback is None:
-                    neg_products[i] = torch.randint(n_products, (1,), device=device)
-                else:
-                    neg_products[i] = fallback
-            else:
-                neg_products[i] = candidate
+        # Fitment-hard negatives (entity-aware), sampled for the whole segment at once
+        if n_fitment > 0:
+            if fitment_index_csr is None:
+                fitment_map = user_fitment_products or {}
+                n_users = max(data["user"].num_nodes, max(fitment_map, default=-1) + 1)
+                fitment_index_csr = fitment_csr(fitment_map, n_users, device)
+            segment = slice(n_inbatch, n_inbatch + n_fitment)
+            neg_products[segment] = sample_fitment_negatives(
+                user_ids[segment], pos_product_ids[segment], fitment_index_csr, n_products,
+                known_positive_keys=known_positive_keys,
+            )
 
         # Random negatives
         neg_products[n_inbatch + n_fitment:] = torch.randint(
@@ -102,11 +102,12 @@ def load_data(config, run_exports: bool = True):
 
 def build_graph(loader, nodes, edges, config):
     """Build PyG HeteroData graph."""
+    from rec_engine.core.graph_cache import cached_build
     from src.gnn.graph_builder import build_hetero_graph
 
     logger.info("Building heterogeneous graph...")
-    data, split_masks, metadata = build_hetero_graph(
-        nodes, edges, loader.get_id_mappings(), config
+    data, split_masks, metadata = cached_build(
+        build_hetero_graph, nodes, edges, loader.get_id_mappings(), config
     )
     return data, split_masks, metadata
 
@@ -10,6 +10,7 @@ import numpy as np
 import torch
 import torch.nn as nn
 
+from rec_engine.core.negatives import fitment_csr, pair_keys, sample_fitment_negatives
 from src.gnn.model import HolleyGAT
 from src.gnn.rules import build_fitment_index
 from src.metrics import hit_rate_at_k
@@ -79,8 +80,16 @@ class GNNTrainer:
         # Precompute training edges
         self._prepare_training_edges()
 
-        # Build fitment index for hard negative sampling
+        # Build fitment index for hard negative sampling (CSR form for the sampler)
         self.user_fitment_products = build_fitment_index(self.data)
+        self.fitment_index_csr = fitment_csr(
+            self.user_fitment_products, self.data["user"].num_nodes, self.device,
+        )
+        self.known_positive_keys: torch.Tensor | None = None
+        if train_cfg.get("hard_negative_reject_positives", False):
+            self.known_positive_keys = pair_keys(
+                self.pos_users, self.pos_products, self.data["product"].num_nodes,
+            )
 
         # Universal product IDs (excluded from eval candidates — v5.18 alignment).
         universal_mask = getattr(self.data["product"], "is_universal", None)
@@ -158,35 +167,12 @@ class GNNTrainer:
         neg_products[:n_inbatch] = pos_product_ids[perm[:n_inbatch]]
 
         # Fitment-hard negatives: sample from user's fitment catalog (excluding positive)
-        for i in range(n_inbatch, n_inbatch + n_fitment):
-            uid = user_ids[i].item()
-            fitment_prods = self.user_fitment_products.get(uid, [])
-            pos_pid = pos_product_ids[i].item()
-
-            if not fitment_prods:
-                neg_products[i] = torch.randint(n_products, (1,), device=self.device)
-                continue
-
-            # Rejection sampling avoids per-example list allocations.
-            if len(fitment_prods) == 1 and fitment_prods[0] == pos_pid:
-                neg_products[i] = torch.randint(n_products, (1,), device=self.device)
-                continue
-
-            candidate = pos_pid
-            for _ in range(4):
-                sampled_idx = torch.randint(len(fitment_prods), (1,), device=self.device).item()
-                candidate = fitment_prods[sampled_idx]
-                if candidate != pos_pid:
-                    break
-
-            if candidate == pos_pid:
-                fallback = next((p for p in fitment_prods if p != pos_pid), None)
-                if fallback is None:
-                    neg_products[i] = torch.randint(n_products, (1,), device=self.device)
-                else:
-                    neg_products[i] = fallback
-            else:
-                neg_products[i] = candidate
+        if n_fitment > 0:
+            segment = slice(n_inbatch, n_inbatch + n_fitment)
+            neg_products[segment] = sample_fitment_negatives(
+                user_ids[segment], pos_product_ids[segment], self.fitment_index_csr, n_products,
+                known_positive_keys=self.known_positive_keys,
+            )
 
         # Random negatives
         neg_products[n_inbatch + n_fitment:] = torch.randint(
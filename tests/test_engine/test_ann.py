@@ -0,0 +1,76 @@
+"""Tests for rec_engine.core.ann — IVF approximate nearest-neighbour index."""
+
+import numpy as np
+import pytest
+
+from rec_engine.core.ann import IVFIndex, exact_search, kmeans, recall_at_k
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(8, 16))
+    x = centers[rng.integers(0, 8, 500)] + 0.2 * rng.normal(size=(500, 16))
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+class TestKmeans:
+    def test_labels_match_nearest_centroid(self, vectors):
+        centroids, labels = kmeans(vectors, 8, seed=1)
+        dists = ((vectors[:, None, :] - centroids[None]) ** 2).sum(-1)
+        np.testing.assert_array_equal(labels, dists.argmin(axis=1))
+        assert len(np.unique(labels)) == 8
+
+    def test_too_many_clusters_raises(self, vectors):
+        with pytest.raises(ValueError, match="n_clusters"):
+            kmeans(vectors[:3], 4)
+
+
+class TestIVFIndex:
+    def test_probing_all_lists_is_exact(self, vectors):
+        ids = np.arange(len(vectors)) * 10
+        index = IVFIndex(n_lists=8, n_probe=8).fit(vectors, ids=ids)
+        approx_ids, approx_scores = index.search(vectors[:20], 15)
+        exact_ids, exact_scores = exact_search(vectors[:20], vectors, ids, 15)
+        np.testing.assert_array_equal(approx_ids, exact_ids)
+        np.testing.assert_allclose(approx_scores, exact_scores, rtol=1e-5)
+
+    def test_recall_grows_with_n_probe(self, vectors):
+        queries = vectors[::25]
+        exact_ids, _ = exact_search(queries, vectors, np.arange(len(vectors)), 30)
+        index = IVFIndex(n_lists=16, n_probe=1).fit(vectors)
+        low = recall_at_k(index.search(queries, 30)[0], exact_ids)
+        index.n_probe = 6
+        high = recall_at_k(index.search(queries, 30)[0], exact_ids)
+        assert high >= low
+        assert high > 0.9
+
+    def test_pq_scores_approximate_inner_product(self, vectors):
+        index = IVFIndex(n_lists=4, n_probe=4, pq_subspaces=4, pq_bits=6).fit(vectors)
+        ids, scores = index.search(vectors[:10], 5)
+        assert index.vectors is None
+        assert index.codes.shape == (500, 4)
+        true = np.einsum("bd,bkd->bk", vectors[:10], vectors[ids])
+        assert np.abs(scores - true).max() < 0.25
+
+    def test_pads_when_fewer_than_k(self, vectors):
+        index = IVFIndex(n_lists=2, n_probe=1).fit(vectors[:6])
+        ids, scores = index.search(vectors[:2], 10)
+        assert ids.shape == (2, 10)
+        assert (ids[:, -1] == -1).all()
+        assert np.isneginf(scores[:, -1]).all()
+
+    def test_pq_subspaces_must_divide_dim(self, vectors):
+        with pytest.raises(ValueError, match="must divide"):
+            IVFIndex(pq_subspaces=5).fit(vectors)
+
+    def test_search_before_fit_raises(self):
+        with pytest.raises(RuntimeError, match="before fit"):
+            IVFIndex().search(np.zeros((1, 4), dtype=np.float32), 3)
+
+
+class TestRecallAtK:
+    def test_partial_overlap(self):
+        approx = np.array([[1, 2, 3], [4, 5, -1]])
+        exact = np.array([[1, 2, 9], [4, -1, -1]])
+        assert recall_at_k(approx, exact) == pytest.approx((2 / 3 + 1.0) / 2)
@@ -0,0 +1,117 @@
+"""Tests for rec_engine.core.compilation — opt-in torch.compile with eager fallback."""
+
+import logging
+import os
+
+import pytest
+import torch
+
+from rec_engine.core.compilation import GuardedForward, compile_model, compile_report
+from rec_engine.core.model import HeteroGAT
+
+
+def _failing_backend(gm, example_inputs):
+    raise NotImplementedError("op not supported")
+
+
+@pytest.fixture
+def model_and_data(small_graph_2node):
+    data, _, _, metadata = small_graph_2node
+    config = {"model": {"embedding_dim": 16, "hidden_dim": 16, "num_heads": 2, "dropout": 0.0}}
+    torch.manual_seed(0)
+    model = HeteroGAT(
+        n_users=10, n_products=20, n_entities=0,
+        n_categories=metadata["n_categories"],
+        edge_types=list(data.edge_types),
+        config=config,
+        product_num_features=metadata["product_num_features"],
+    )
+    return model, data, config
+
+
+def _compile(model, config, **model_cfg):
+    config = {"model": dict(config["model"], compile=True, **model_cfg)}
+    return compile_model(model, config)
+
+
+class TestCompileModel:
+    def test_disabled_by_default(self, model_and_data):
+        model, _, config = model_and_data
+        assert compile_model(model, config) is model
+        assert "forward" not in model.__dict__
+        assert compile_report(model) is None
+
+    def test_compiled_matches_eager(self, model_and_data):
+        model, data, config = model_and_data
+        model.eval()
+        keys = list(model.state_dict())
+        with torch.no_grad():
+            expected = model(data)
+            _compile(model, config, compile_backend="eager")
+            assert isinstance(model.forward, GuardedForward)
+            for _ in range(3):
+                user_embs, product_embs = model(data)
+        torch.testing.assert_close(user_embs, expected[0])
+        torch.testing.assert_close(product_embs, expected[1])
+        assert list(model.state_dict()) == keys
+
+        report = compile_report(model)
+        assert report["active"]
+        assert report["eval"]["calls"] == 3
+        assert set(report["eval"]) >= {"eager_s", "compiled_s", "compile_s", "break_even_calls"}
+
+    def test_falls_back_to_eager_on_compile_error(self, model_and_data, caplog):
+        model, data, config = model_and_data
+        model.eval()
+        with torch.no_grad():
+            expected = model(data)
+            _compile(model, config, compile_backend=_failing_backend)
+            with caplog.at_level(logging.WARNING, logger="rec_engine.core.compilation"):
+                for _ in range(3):
+                    user_embs, _ = model(data)
+        torch.testing.assert_close(user_embs, expected[0])
+        report = compile_report(model)
+        assert not report["active"]
+        assert "op not supported" in report["fallback_reason"]
+        assert sum("falling back to eager" in r.message for r in caplog.records) == 1
+
+    def test_non_compile_error_propagates(self, model_and_data):
+        model, data, config = model_and_data
+        _compile(model, config, compile_backend="eager")
+
+        def _broken(*args, **kwargs):
+            raise ValueError("bad input")
+
+        model.forward.compiled = _broken
+        model(data)
+        with pytest.raises(ValueError, match="bad input"):
+            model(data)
+        assert compile_report(model)["active"]
+
+    def test_cache_dir_scoped_to_compiled_calls(self, model_and_data, tmp_path, monkeypatch):
+        model, data, config = model_and_data
+        monkeypatch.setenv("TORCHINDUCTOR_CACHE_DIR", "/previous")
+        _compile(model, config, compile_backend="eager", compile_cache_dir=str(tmp_path))
+        seen = []
+
+        def _record(*args, **kwargs):
+            seen.append(os.environ["TORCHINDUCTOR_CACHE_DIR"])
+            return model.forward.eager(*args, **kwargs)
+
+        model.forward.compiled = _record
+        with torch.no_grad():
+            model(data)
+            model(data)
+        assert seen == [str(tmp_path.resolve())]
+        assert os.environ["TORCHINDUCTOR_CACHE_DIR"] == "/previous"
+
+    def test_train_results_include_compile_report(self, all_dataframes_2node, config_2node):
+        from plugins.defaults import DefaultPlugin
+        from rec_engine.run import mode_train
+
+        config_2node["model"].update(compile=True, compile_backend="eager")
+        config_2node["training"]["max_epochs"] = 3
+        result = mode_train(config_2node, all_dataframes_2node, DefaultPlugin(salt="test"))
+        report = result["train_results"]["compile"]
+        assert report["active"]
+        assert report["train"]["calls"] == result["train_results"]["total_epochs"]
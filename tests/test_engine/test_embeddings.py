@@ -0,0 +1,67 @@
+"""Tests for rec_engine.core.embeddings — persisted embedding snapshots."""
+
+import numpy as np
+import pytest
+import torch
+
+from rec_engine.core.embeddings import EmbeddingSnapshot, model_hash
+
+
+@pytest.fixture
+def snapshot():
+    rng = np.random.default_rng(0)
+    return EmbeddingSnapshot(
+        user_embs=rng.normal(size=(3, 4)).astype(np.float32),
+        product_embs=rng.normal(size=(5, 4)).astype(np.float32),
+        id_mappings={
+            "user_to_id": {"u_b": 0, "u_a": 1, "u_c": 2},
+            "product_to_id": {f"p{i}": i for i in range(5)},
+        },
+        model_hash="abc123",
+        split_masks={"test_mask": np.array([True, False, True])},
+    )
+
+
+class TestEmbeddingSnapshot:
+    def test_round_trip_mmap(self, snapshot, tmp_path):
+        snapshot.save(tmp_path)
+        loaded = EmbeddingSnapshot.load(tmp_path)
+        assert isinstance(loaded.user_embs, np.memmap)
+        np.testing.assert_array_equal(loaded.user_embs, snapshot.user_embs)
+        np.testing.assert_array_equal(loaded.product_embs, snapshot.product_embs)
+        assert loaded.id_mappings == snapshot.id_mappings
+        assert loaded.model_hash == "abc123"
+        assert loaded.split_mask_tensors()["test_mask"].tolist() == [True, False, True]
+
+    def test_tensors_share_memory(self, snapshot):
+        user_t, product_t = snapshot.tensors()
+        assert user_t.dtype == torch.float32
+        assert user_t.data_ptr() == snapshot.user_embs.ctypes.data
+
+    def test_row_count_mismatch_raises(self, snapshot):
+        with pytest.raises(ValueError, match="2 users"):
+            EmbeddingSnapshot(
+                user_embs=snapshot.user_embs,
+                product_embs=snapshot.product_embs,
+                id_mappings={"user_to_id": {"a": 0, "b": 1}, "product_to_id": snapshot.id_mappings["product_to_id"]},
+                model_hash="x",
+            )
+
+    def test_check_mappings(self, snapshot):
+        snapshot.check_mappings(snapshot.id_mappings)
+        with pytest.raises(ValueError, match="user_to_id does not match"):
+            snapshot.check_mappings({**snapshot.id_mappings, "user_to_id": {"u_a": 0, "u_b": 1, "u_c": 2}})
+
+    def test_missing_manifest_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError, match="manifest"):
+            EmbeddingSnapshot.load(tmp_path)
+
+
+class TestModelHash:
+    def test_changes_with_weights(self):
+        model = torch.nn.Linear(3, 2)
+        before = model_hash(model)
+        assert model_hash(model) == before
+        with torch.no_grad():
+            model.weight[0, 0] += 1.0
+        assert model_hash(model) != before
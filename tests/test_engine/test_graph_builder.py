@@ -1,10 +1,16 @@
 """Tests for rec_engine.core.graph_builder — config-driven graph construction."""
 
+import numpy as np
 import pandas as pd
 import pytest
 import torch
 
-from rec_engine.core.graph_builder import build_hetero_graph
+from rec_engine.core.graph_builder import (
+    _split_users,
+    build_hetero_graph,
+    build_scoring_graph,
+    graph_nbytes,
+)
 
 
 class TestBuildHeteroGraph:
@@ -424,3 +430,183 @@ class TestBuildHeteroGraph:
             and torch.equal(masks1["test_mask"], masks2["test_mask"])
         )
         assert differs, "Different random seeds should produce different user splits"
+
+
+class TestSplitUsers:
+    @pytest.fixture
+    def users(self):
+        tiers = ["hot"] * 200 + ["warm"] * 300 + ["cold"] * 500
+        return pd.DataFrame({"user_id": [f"user_{i}" for i in range(1000)], "engagement_tier": tiers})
+
+    def test_random_split_reproducible_and_stratified(self, users):
+        ids = users["user_id"].tolist()
+        config = {"eval": {"random_seed": 3, "user_split": [0.8, 0.1, 0.1]}}
+        first = _split_users(ids, users, config)
+        second = _split_users(ids, users, config)
+        for a, b in zip(first, second):
+            np.testing.assert_array_equal(a, b)
+        train, val, test = first
+        assert not (train & val).any() and not (train & test).any() and not (val & test).any()
+        assert (train | val | test).all()
+        # Each tier is cut by the ratios separately
+        assert train[:200].sum() == 160 and train[200:500].sum() == 240 and train[500:].sum() == 400
+
+        other = _split_users(ids, users, {"eval": {"random_seed": 4, "user_split": [0.8, 0.1, 0.1]}})
+        assert not np.array_equal(other[0], train)
+
+    def test_hash_split_stable_as_users_grow(self, users):
+        config = {"eval": {"split_method": "hash", "random_seed": 3, "user_split": [0.8, 0.1, 0.1]}}
+        ids = users["user_id"].tolist()
+        train, val, test = _split_users(ids, users, config)
+        assert (train.astype(int) + val + test == 1).all()
+        assert 0.75 < train.mean() < 0.85
+
+        grown = ["user_new_a", *ids[:500], "user_new_b", *ids[500:]]
+        grown_train, grown_val, _ = _split_users(grown, users, config)
+        kept = np.r_[1:501, 502:1002]
+        np.testing.assert_array_equal(grown_train[kept], train)
+        np.testing.assert_array_equal(grown_val[kept], val)
+
+        reseeded = _split_users(ids, users, {"eval": {**config["eval"], "random_seed": 4}})
+        assert not np.array_equal(reseeded[0], train)
+
+    def test_unknown_split_method_raises(self, users):
+        with pytest.raises(ValueError, match="split_method"):
+            _split_users(users["user_id"].tolist(), users, {"eval": {"split_method": "time"}})
+
+
+class TestCoalesceInteractions:
+    @pytest.fixture
+    def inputs(self, sample_users, sample_products, config_2node):
+        id_mappings = {
+            "user_to_id": {f"user_{i}": i for i in range(10)},
+            "product_to_id": {f"prod_{i}": i for i in range(20)},
+        }
+        interactions = pd.DataFrame({
+            "user_id": ["user_1", "user_0", "user_1", "user_1", "user_0"],
+            "product_id": ["prod_2", "prod_3", "prod_2", "prod_4", "prod_3"],
+            "interaction_type": ["view"] * 5,
+            "weight": [1.0, 2.0, 3.0, 1.0, 5.0],
+            "timestamp": pd.to_datetime(
+                ["2024-01-31", "2024-01-01", "2024-01-01", "2024-01-31", "2024-01-31"],
+            ),
+        })
+        nodes = {"users": sample_users, "products": sample_products}
+        return nodes, {"interactions": interactions}, id_mappings, config_2node
+
+    def _build(self, inputs, how, **graph_cfg):
+        import copy
+        nodes, edges, id_mappings, config = inputs
+        config = copy.deepcopy(config)
+        config["graph"].update(coalesce_interactions=how, **graph_cfg)
+        data, split_masks, _ = build_hetero_graph(nodes, edges, id_mappings, config)
+        store = data["user", "interacts", "product"]
+        return data, split_masks, store
+
+    @pytest.mark.parametrize("how,expected", [("sum", [7.0, 4.0, 1.0]), ("max", [5.0, 3.0, 1.0])])
+    def test_one_edge_per_pair(self, inputs, how, expected):
+        data, split_masks, store = self._build(inputs, how)
+        assert store.edge_index.tolist() == [[0, 1, 1], [3, 2, 4]]
+        assert store.edge_weight.tolist() == expected
+        rev = data["product", "rev_interacts", "user"]
+        assert rev.edge_index.tolist() == store.edge_index.flip(0).tolist()
+        assert torch.equal(store.train_mask, split_masks["train_mask"][store.edge_index[0]])
+
+    def test_decayed_sum(self, inputs):
+        _, _, store = self._build(inputs, "decayed_sum", time_decay_halflife_days=30)
+        assert store.edge_weight.tolist() == pytest.approx([5.0 + 2.0 * 0.5, 1.0 + 3.0 * 0.5, 1.0])
+
+    def test_disabled_keeps_parallel_edges(self, inputs):
+        _, _, store = self._build(inputs, None)
+        assert store.edge_index.shape[1] == 5
+
+    def test_unknown_method_raises(self, inputs):
+        with pytest.raises(ValueError, match="coalesce_interactions"):
+            self._build(inputs, "mean")
+
+
+class TestCompactTensors:
+    @pytest.fixture
+    def graphs(
+        self, sample_users, sample_products, sample_entities, sample_interactions,
+        sample_fitment, sample_ownership, sample_copurchase, config_3node,
+    ):
+        import copy
+        nodes = {"users": sample_users, "products": sample_products, "entities": sample_entities}
+        edges = {
+            "interactions": sample_interactions, "fitment": sample_fitment,
+            "ownership": sample_ownership, "copurchase": sample_copurchase,
+        }
+        id_mappings = {
+            "user_to_id": {f"user_{i}": i for i in range(10)},
+            "product_to_id": {f"prod_{i}": i for i in range(20)},
+            "entity_to_id": {f"entity_{i}": i for i in range(5)},
+        }
+        compact_cfg = copy.deepcopy(config_3node)
+        compact_cfg["graph"]["compact_tensors"] = True
+        full, _, _ = build_hetero_graph(nodes, edges, id_mappings, config_3node)
+        compact, _, _ = build_hetero_graph(nodes, edges, id_mappings, compact_cfg)
+        return full, compact
+
+    def test_same_edges_in_compact_dtypes(self, graphs):
+        full, compact = graphs
+        assert set(compact.edge_types) == set(full.edge_types)
+        for edge_type in full.edge_types:
+            store = compact[edge_type]
+            assert store.edge_index.dtype == torch.int32
+            assert torch.equal(store.edge_index.long(), full[edge_type].edge_index)
+            if "edge_weight" in store:
+                assert store.edge_weight.dtype == torch.float16
+                assert torch.equal(store.edge_weight.float(), full[edge_type].edge_weight)
+
+    def test_reverse_edges_share_storage(self, graphs):
+        _, compact = graphs
+        fwd = compact["product", "fits", "vehicle"].edge_index
+        rev = compact["vehicle", "rev_fits", "product"].edge_index
+        assert fwd.untyped_storage().data_ptr() == rev.untyped_storage().data_ptr()
+        full_edges = sum(graphs[0][et].edge_index.nbytes for et in graphs[0].edge_types)
+        compact_edges = sum(compact[et].edge_index.nbytes for et in compact.edge_types)
+        assert compact_edges < full_edges
+        assert graph_nbytes(compact) < graph_nbytes(graphs[0])
+
+    def test_model_output_matches(self, graphs, config_3node):
+        from rec_engine.core.model import HeteroGAT
+        from rec_engine.topology import create_strategy
+
+        full, compact = graphs
+        torch.manual_seed(0)
+        model = HeteroGAT(
+            10, 20, 5, int(full["product"].category_id.max()) + 1,
+            create_strategy(config_3node).get_edge_types(config_3node), config_3node,
+            entity_type_name="vehicle", product_num_features=full["product"].x_num.shape[1],
+        ).eval()
+        with torch.no_grad():
+            for a, b in zip(model(full), model(compact)):
+                assert torch.allclose(a, b)
+
+
+class TestBuildScoringGraph:
+    def test_matches_full_graph_structure(
+        self, sample_users, sample_products, sample_entities,
+        sample_interactions, sample_fitment, sample_ownership, config_3node,
+    ):
+        id_mappings = {
+            "user_to_id": {uid: i for i, uid in enumerate(sorted(sample_users["user_id"]))},
+            "product_to_id": {pid: i for i, pid in enumerate(sorted(sample_products["product_id"]))},
+            "entity_to_id": {eid: i for i, eid in enumerate(sorted(sample_entities["entity_id"]))},
+        }
+        nodes = {"users": sample_users, "products": sample_products, "entities": sample_entities}
+        edges = {
+            "interactions": sample_interactions,
+            "fitment": sample_fitment,
+            "ownership": sample_ownership,
+        }
+        full, _, _ = build_hetero_graph(nodes, edges, id_mappings, config_3node)
+        light = build_scoring_graph(nodes, edges, id_mappings, config_3node)
+
+        assert ("user", "interacts", "product") not in light.edge_types
+        assert not hasattr(light["product"], "x_num")
+        assert light["vehicle"].num_nodes == full["vehicle"].num_nodes
+        assert torch.equal(light["product"].is_excluded, full["product"].is_excluded)
+        for edge_type in [("product", "fits", "vehicle"), ("user", "owns", "vehicle")]:
+            assert torch.equal(light[edge_type].edge_index, full[edge_type].edge_index)
@@ -0,0 +1,137 @@
+"""Tests for rec_engine.core.graph_cache — fingerprinted graph build cache."""
+
+import copy
+import importlib
+import sys
+
+import pytest
+import torch
+
+from rec_engine.core.graph_builder import build_hetero_graph
+from rec_engine.core.graph_cache import cached_build, graph_fingerprint, load_graph
+
+
+@pytest.fixture
+def graph_inputs(
+    sample_users, sample_products, sample_entities, sample_interactions,
+    sample_fitment, sample_ownership, sample_copurchase, config_3node,
+):
+    nodes = {"users": sample_users, "products": sample_products, "entities": sample_entities}
+    edges = {
+        "interactions": sample_interactions,
+        "fitment": sample_fitment,
+        "ownership": sample_ownership,
+        "copurchase": sample_copurchase,
+    }
+    id_mappings = {
+        "user_to_id": {u: i for i, u in enumerate(sorted(sample_users["user_id"]))},
+        "product_to_id": {p: i for i, p in enumerate(sorted(sample_products["product_id"]))},
+        "entity_to_id": {e: i for i, e in enumerate(sorted(sample_entities["entity_id"]))},
+    }
+    return nodes, edges, id_mappings, config_3node
+
+
+class _CountingBuilder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return build_hetero_graph(*args)
+
+
+def _other_builder(*args):
+    return build_hetero_graph(*args)
+
+
+class TestGraphFingerprint:
+    def test_stable(self, graph_inputs):
+        assert graph_fingerprint(*graph_inputs) == graph_fingerprint(*graph_inputs)
+
+    def test_changes_with_table_contents(self, graph_inputs):
+        nodes, edges, id_mappings, config = graph_inputs
+        changed = dict(edges, interactions=edges["interactions"].iloc[:-1])
+        assert graph_fingerprint(nodes, changed, id_mappings, config) != graph_fingerprint(*graph_inputs)
+
+    def test_ignores_non_graph_config(self, graph_inputs):
+        nodes, edges, id_mappings, config = graph_inputs
+        other = copy.deepcopy(config)
+        other["training"]["epochs"] = 999
+        other.setdefault("graph", {})["cache_dir"] = "/elsewhere"
+        assert graph_fingerprint(nodes, edges, id_mappings, other) == graph_fingerprint(*graph_inputs)
+        other["eval"]["random_seed"] = 7
+        assert graph_fingerprint(nodes, edges, id_mappings, other) != graph_fingerprint(*graph_inputs)
+
+    def test_changes_with_builder(self, graph_inputs):
+        fp = graph_fingerprint(*graph_inputs, build_hetero_graph)
+        assert fp == graph_fingerprint(*graph_inputs, build_hetero_graph)
+        assert fp != graph_fingerprint(*graph_inputs, _other_builder)
+        assert fp != graph_fingerprint(*graph_inputs, _CountingBuilder())
+
+    def test_changes_with_builder_source(self, graph_inputs, tmp_path, monkeypatch):
+        module = tmp_path / "edited_builder.py"
+        module.write_text("def build(*args):\n    return None\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "edited_builder", raising=False)
+        import edited_builder
+
+        fp = graph_fingerprint(*graph_inputs, edited_builder.build)
+        assert fp == graph_fingerprint(*graph_inputs, edited_builder.build)
+        module.write_text("def build(*args):\n    return None  # changed\n")
+        importlib.reload(edited_builder)
+        assert fp != graph_fingerprint(*graph_inputs, edited_builder.build)
+
+
+class TestCachedBuild:
+    def test_disabled_without_cache_dir(self, graph_inputs):
+        builder = _CountingBuilder()
+        cached_build(builder, *graph_inputs)
+        cached_build(builder, *graph_inputs)
+        assert builder.calls == 2
+
+    def test_hit_skips_build_and_round_trips(self, graph_inputs, tmp_path):
+        nodes, edges, id_mappings, config = graph_inputs
+        config = copy.deepcopy(config)
+        config.setdefault("graph", {})["cache_dir"] = str(tmp_path)
+        builder = _CountingBuilder()
+
+        data, masks, metadata = cached_build(builder, nodes, edges, id_mappings, config)
+        cached, cached_masks, cached_meta = cached_build(builder, nodes, edges, id_mappings, config)
+
+        assert builder.calls == 1
+        assert set(cached.node_types) == set(data.node_types)
+        assert set(cached.edge_types) == set(data.edge_types)
+        for node_type in data.node_types:
+            assert cached[node_type].num_nodes == data[node_type].num_nodes
+        for store_type in [*data.node_types, *data.edge_types]:
+            for attr, value in data[store_type].items():
+                if isinstance(value, torch.Tensor):
+                    assert torch.equal(cached[store_type][attr], value), (store_type, attr)
+        for name, mask in masks.items():
+            assert torch.equal(cached_masks[name], mask)
+        assert cached_meta["n_categories"] == metadata["n_categories"]
+        assert cached_meta["norm_stats"] == metadata["norm_stats"]
+        assert list(cached_meta["category_encoder"].classes_) == list(metadata["category_encoder"].classes_)
+        assert cached_meta["category_encoder"].transform(["cat_3"]).tolist() == \
+            metadata["category_encoder"].transform(["cat_3"]).tolist()
+
+    def test_changed_inputs_miss(self, graph_inputs, tmp_path):
+        nodes, edges, id_mappings, config = graph_inputs
+        config = copy.deepcopy(config)
+        config.setdefault("graph", {})["cache_dir"] = str(tmp_path)
+        builder = _CountingBuilder()
+        cached_build(builder, nodes, edges, id_mappings, config)
+        config["eval"]["random_seed"] = 7
+        cached_build(builder, nodes, edges, id_mappings, config)
+        assert builder.calls == 2
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_load_rejects_stale_fingerprint(self, graph_inputs, tmp_path):
+        nodes, edges, id_mappings, config = graph_inputs
+        config = copy.deepcopy(config)
+        config.setdefault("graph", {})["cache_dir"] = str(tmp_path)
+        cached_build(build_hetero_graph, nodes, edges, id_mappings, config)
+        (entry,) = tmp_path.iterdir()
+        assert load_graph(entry) is not None
+        assert load_graph(entry, "0" * 64) is None
+        assert load_graph(tmp_path / "missing") is None
@@ -0,0 +1,51 @@
+"""Tests for rec_engine.core.id_index — vectorized raw <-> internal ID index."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rec_engine.core.id_index import IdIndex, as_id_index, as_id_indexes
+
+
+@pytest.fixture
+def index():
+    return IdIndex.from_values(["c", "a", None, "b", "a"])
+
+
+class TestIdIndex:
+    def test_from_values_sorted_unique(self, index):
+        assert index.keys_array.tolist() == ["a", "b", "c"]
+        assert len(index) == 3
+
+    def test_encode_decode(self, index):
+        codes = index.encode(pd.Series(["b", "zzz", "a", None, "c"]))
+        assert codes.dtype == np.int32
+        assert codes.tolist() == [1, -1, 0, -1, 2]
+        assert index.decode(codes).tolist() == ["b", None, "a", None, "c"]
+
+    def test_dict_compatible(self, index):
+        assert index["c"] == 2
+        assert "a" in index and "zzz" not in index and ["a"] not in index
+        assert index.get("zzz") is None
+        assert dict(index.items()) == {"a": 0, "b": 1, "c": 2}
+        assert index == {"a": 0, "b": 1, "c": 2}
+        with pytest.raises(KeyError):
+            index["zzz"]
+
+    def test_from_mapping_keeps_internal_ids(self):
+        index = as_id_index({"x": 1, "y": 0})
+        assert index.keys_array.tolist() == ["y", "x"]
+        assert as_id_index(index) is index
+        assert len(as_id_index(None)) == 0
+
+    def test_rejects_non_contiguous_ids(self):
+        with pytest.raises(ValueError, match="permutation"):
+            IdIndex.from_mapping({"x": 0, "y": 2})
+
+    def test_rejects_duplicate_keys(self):
+        with pytest.raises(ValueError, match="unique"):
+            IdIndex(["a", "a"])
+
+    def test_as_id_indexes(self):
+        converted = as_id_indexes({"user_to_id": {"u": 0}, "product_to_id": IdIndex(["p"])})
+        assert all(isinstance(v, IdIndex) for v in converted.values())
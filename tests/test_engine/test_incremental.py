@@ -0,0 +1,65 @@
+"""Tests for rec_engine.core.incremental — scoring input fingerprints."""
+
+import numpy as np
+import pandas as pd
+
+from rec_engine.core.incremental import (
+    ScoringFingerprints,
+    combine_hashes,
+    config_fingerprint,
+    hash_groups,
+    hash_rows,
+    hash_values,
+)
+
+
+class TestHashing:
+    def test_hash_rows_bitwise(self):
+        m = np.array([[0.5, 1.0], [0.5, 1.0], [0.5, 1.0000001]], dtype=np.float32)
+        h = hash_rows(m)
+        assert h.dtype == np.uint64
+        assert h[0] == h[1] != h[2]
+
+    def test_hash_groups_order_independent(self):
+        items = hash_values(["a", "b", "c"])
+        forward = hash_groups(np.array([0, 0, 1]), items, 3)
+        reverse = hash_groups(np.array([1, 0, 0]), items[::-1], 3)
+        np.testing.assert_array_equal(forward, reverse)
+        assert forward[2] == 0
+
+    def test_combine_hashes_is_column_sensitive(self):
+        a, b = np.array([1, 2], dtype=np.uint64), np.array([2, 1], dtype=np.uint64)
+        assert combine_hashes(a, b)[0] != combine_hashes(b, a)[0]
+
+    def test_config_fingerprint(self):
+        cfg = {"scoring": {"total_slots": 4}, "unrelated": 1}
+        assert config_fingerprint(cfg, "P") == config_fingerprint({**cfg, "unrelated": 2}, "P")
+        assert config_fingerprint(cfg, "P") != config_fingerprint({"scoring": {"total_slots": 5}}, "P")
+        assert config_fingerprint(cfg, "P") != config_fingerprint(cfg, "Q")
+
+
+class TestScoringFingerprints:
+    def _fp(self, users, products):
+        return ScoringFingerprints(
+            users=pd.Series(np.array(list(users.values()), dtype=np.uint64), index=list(users)),
+            products=pd.Series(np.array(list(products.values()), dtype=np.uint64), index=list(products)),
+            config_hash="c",
+        )
+
+    def test_changed_users_and_products(self):
+        big = np.iinfo(np.uint64).max  # must survive without float64 rounding
+        prev = self._fp({"u1": 1, "u2": big}, {"p1": 5, "p2": 6})
+        cur = self._fp({"u1": 1, "u2": big - 1, "u3": 3}, {"p1": 5, "p3": 7})
+        assert cur.changed_users(prev, np.array(["u1", "u2", "u3"])).tolist() == [False, True, True]
+        changed, removed = cur.changed_products(prev)
+        assert changed.tolist() == ["p3"]
+        assert removed.tolist() == ["p2"]
+
+    def test_save_load_round_trip(self, tmp_path):
+        assert ScoringFingerprints.load(tmp_path) is None
+        fp = self._fp({"u1": np.iinfo(np.uint64).max}, {"p1": 2})
+        fp.save(tmp_path)
+        loaded = ScoringFingerprints.load(tmp_path)
+        assert loaded.config_hash == "c"
+        assert loaded.users["u1"] == np.iinfo(np.uint64).max
+        assert not loaded.changed_users(fp, np.array(["u1"])).any()
@@ -0,0 +1,57 @@
+"""Tests for rec_engine.inputs — runtime scoring input normalization."""
+
+import pytest
+
+from plugins.defaults import DefaultPlugin
+from rec_engine.inputs import (
+    normalize_target_user_ids,
+    normalize_user_purchases,
+    prepare_graph_inputs,
+)
+
+
+@pytest.fixture
+def plugin():
+    return DefaultPlugin(salt="test")
+
+
+@pytest.fixture
+def user_to_id(plugin):
+    return {"user_0": 0, plugin.normalize_user_id("raw@example.com"): 1}
+
+
+class TestNormalizeTargetUserIds:
+    def test_graph_keys_then_plugin_normalized(self, plugin, user_to_id):
+        targets = normalize_target_user_ids(["user_0", "raw@example.com", "nobody", None], user_to_id, plugin)
+        assert targets == {"user_0", plugin.normalize_user_id("raw@example.com")}
+
+    def test_bare_string_is_one_id(self, plugin, user_to_id):
+        assert normalize_target_user_ids("user_0", user_to_id, plugin) == {"user_0"}
+
+    def test_non_iterable_raises(self, plugin, user_to_id):
+        with pytest.raises(TypeError, match="target_user_ids"):
+            normalize_target_user_ids(42, user_to_id, plugin)
+
+
+class TestNormalizeUserPurchases:
+    def test_keys_and_values_normalized(self, plugin, user_to_id):
+        purchases = normalize_user_purchases(
+            {"raw@example.com": "SKU-1", "user_0": ["a", None], "nobody": {"b"}, "user_x": None},
+            user_to_id, plugin,
+        )
+        assert purchases == {
+            plugin.normalize_user_id("raw@example.com"): {plugin.normalize_product_id("SKU-1")},
+            "user_0": {plugin.normalize_product_id("a")},
+        }
+
+    def test_non_mapping_raises(self, plugin, user_to_id):
+        with pytest.raises(TypeError, match="user_purchases"):
+            normalize_user_purchases(["user_0"], user_to_id, plugin)
+
+
+def test_prepare_graph_inputs_optional_tables(all_dataframes_3node, all_dataframes_2node):
+    nodes, edges = prepare_graph_inputs(all_dataframes_3node)
+    assert {"users", "products", "entities"} <= nodes.keys()
+    assert {"interactions", "fitment", "ownership"} <= edges.keys()
+    nodes, edges = prepare_graph_inputs(all_dataframes_2node)
+    assert "entities" not in nodes and "fitment" not in edges
@@ -3,7 +3,7 @@
 import pytest
 import torch
 
-from rec_engine.core.model import HeteroGAT
+from rec_engine.core.model import HeteroGAT, HeteroLightGCN, TwoTowerGNN
 
 
 class TestHeteroGAT:
@@ -285,6 +285,27 @@ class TestHeteroGAT:
         assert user_embs.shape == (10, 16)
         assert product_embs.shape == (20, 16)
 
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000])
+    def test_inference_matches_forward(self, model_and_data, chunk_size):
+        model, data = model_and_data
+        model.eval()
+        with torch.no_grad():
+            user_embs, product_embs = model(data)
+        chunked_users, chunked_products = model.inference(data, chunk_size)
+        torch.testing.assert_close(chunked_users, user_embs, atol=1e-5, rtol=1e-5)
+        torch.testing.assert_close(chunked_products, product_embs, atol=1e-5, rtol=1e-5)
+
+    def test_inference_restores_training_mode(self, model_and_data):
+        model, data = model_and_data
+        model.train()
+        model.inference(data, 4)
+        assert model.training
+
+    def test_inference_rejects_non_positive_chunk(self, model_and_data):
+        model, data = model_and_data
+        with pytest.raises(ValueError, match="chunk_size"):
+            model.inference(data, 0)
+
     def test_weighted_bpr_loss(self):
         """HIGH #2: Weighted BPR uses normalized weighted mean."""
         pos = torch.ones(100)
@@ -320,3 +341,90 @@ class TestHeteroGAT:
         loss_hard = HeteroGAT.bpr_loss(pos, neg, weights=weights_hard)
 
         assert loss_hard > loss_easy
+
+
+class TestHeteroLightGCN:
+    @pytest.fixture(params=["2node", "3node"])
+    def model_and_data(self, request, small_graph_2node, small_graph_3node):
+        config = {"model": {"embedding_dim": 16, "hidden_dim": 16, "num_layers": 2, "proj_dropout": 0.0}}
+        if request.param == "2node":
+            data, _, _, metadata = small_graph_2node
+            model = HeteroLightGCN(
+                n_users=10, n_products=20, n_entities=0,
+                n_categories=metadata["n_categories"],
+                edge_types=list(data.edge_types),
+                config=config,
+                product_num_features=metadata["product_num_features"],
+            )
+        else:
+            data, _, _, metadata = small_graph_3node
+            model = HeteroLightGCN(
+                n_users=10, n_products=20, n_entities=5,
+                n_categories=metadata["n_categories"],
+                edge_types=list(data.edge_types),
+                config=config,
+                entity_type_name="vehicle",
+                product_num_features=metadata["product_num_features"],
+                entity_num_features=metadata["entity_num_features"],
+            )
+        return model, data
+
+    def test_forward_normalized_embeddings(self, model_and_data):
+        model, data = model_and_data
+        user_embs, product_embs = model(data)
+        assert user_embs.shape == (10, 16)
+        assert product_embs.shape == (20, 16)
+        torch.testing.assert_close(torch.norm(user_embs, dim=1), torch.ones(10), atol=1e-5, rtol=1e-5)
+
+    def test_propagation_is_parameter_free(self, model_and_data):
+        model, _ = model_and_data
+        names = {name.split(".")[0] for name, _ in model.named_parameters()}
+        assert not any(name.startswith(("conv", "skip")) for name in names)
+
+    def test_symmetric_normalization(self):
+        from torch_geometric.data import HeteroData
+
+        data = HeteroData()
+        data["user"].num_nodes = 2
+        data["product"].num_nodes = 1
+        data["user", "interacts", "product"].edge_index = torch.tensor([[0, 1], [0, 0]])
+        data["user", "interacts", "product"].edge_weight = torch.tensor([1.0, 3.0])
+        model = HeteroLightGCN(
+            n_users=2, n_products=1, n_entities=0, n_categories=1,
+            edge_types=[("user", "interacts", "product")],
+            config={"model": {"embedding_dim": 4, "hidden_dim": 4}},
+        )
+        edges = model._normalized_edges(data)
+        _, _, norm = edges[("user", "interacts", "product")]
+        # w / sqrt(deg_out(user) * deg_in(product)); product degree is 1 + 3
+        torch.testing.assert_close(norm, torch.tensor([1.0 / 2.0, 3.0 / (3.0 * 4.0) ** 0.5]))
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+    def test_inference_matches_forward(self, model_and_data, chunk_size):
+        model, data = model_and_data
+        model.eval()
+        with torch.no_grad():
+            user_embs, product_embs = model(data)
+        chunked_users, chunked_products = model.inference(data, chunk_size)
+        torch.testing.assert_close(chunked_users, user_embs, atol=1e-5, rtol=1e-5)
+        torch.testing.assert_close(chunked_products, product_embs, atol=1e-5, rtol=1e-5)
+
+    def test_num_layers_from_config(self, small_graph_2node):
+        data, _, _, metadata = small_graph_2node
+        model = HeteroLightGCN(
+            n_users=10, n_products=20, n_entities=0,
+            n_categories=metadata["n_categories"],
+            edge_types=list(data.edge_types),
+            config={"model": {"embedding_dim": 16, "hidden_dim": 16, "num_layers": 3}},
+            product_num_features=metadata["product_num_features"],
+        )
+        assert model.num_layers == 3
+        assert model(data)[0].shape == (10, 16)
+
+
+def test_two_tower_base_is_abstract():
+    with pytest.raises(TypeError, match="abstract"):
+        TwoTowerGNN(
+            n_users=2, n_products=2, n_entities=0, n_categories=1,
+            edge_types=[], config={"model": {"embedding_dim": 4, "hidden_dim": 4}},
+        )
@@ -0,0 +1,70 @@
+"""Tests for rec_engine.core.negatives — vectorized fitment-hard negatives."""
+
+import pytest
+import torch
+
+from rec_engine.core.negatives import fitment_csr, pair_keys, sample_fitment_negatives
+
+N_PRODUCTS = 10
+
+
+@pytest.fixture
+def csr():
+    # user 0: [1, 2, 3], user 1: none, user 2: [4] only, user 3: [5, 6]
+    return fitment_csr({3: [5, 6], 0: [1, 2, 3], 2: [4]}, n_users=4)
+
+
+class TestFitmentCSR:
+    def test_rows(self, csr):
+        indptr, indices = csr
+        assert indptr.tolist() == [0, 3, 3, 4, 6]
+        assert indices.tolist() == [1, 2, 3, 4, 5, 6]
+
+    def test_rejects_out_of_range_user(self):
+        with pytest.raises(ValueError, match="n_users"):
+            fitment_csr({5: [1]}, n_users=3)
+
+    def test_pair_keys_sorted_unique(self):
+        keys = pair_keys(torch.tensor([1, 0, 1]), torch.tensor([2, 3, 2]), N_PRODUCTS)
+        assert keys.tolist() == [3, 12]
+
+
+class TestSampleFitmentNegatives:
+    def test_never_the_positive_and_uniform_over_rest(self, csr):
+        torch.manual_seed(0)
+        n = 6000
+        neg = sample_fitment_negatives(
+            torch.zeros(n, dtype=torch.long), torch.full((n,), 2), csr, N_PRODUCTS,
+        )
+        counts = torch.bincount(neg, minlength=N_PRODUCTS)
+        assert counts[2] == 0
+        assert counts[1] + counts[3] == n
+        assert abs(int(counts[1]) - n // 2) < 300
+
+    def test_users_without_other_fitment_get_random(self, csr):
+        torch.manual_seed(0)
+        users = torch.tensor([1, 2, 3] * 100)
+        pos = torch.tensor([0, 4, 9] * 100)
+        neg = sample_fitment_negatives(users, pos, csr, N_PRODUCTS)
+        assert ((neg >= 0) & (neg < N_PRODUCTS)).all()
+        # user 3 has a real fitment row
+        assert set(neg[2::3].tolist()) <= {5, 6}
+        # user 1 (no row) and user 2 (only its positive) fall back to uniform random
+        assert len(set(neg[0::3].tolist())) > 2
+        assert len(set(neg[1::3].tolist())) > 2
+
+    def test_rejects_known_positives(self, csr):
+        torch.manual_seed(0)
+        known = pair_keys(torch.tensor([0, 0]), torch.tensor([1, 2]), N_PRODUCTS)
+        n = 500
+        neg = sample_fitment_negatives(
+            torch.zeros(n, dtype=torch.long), torch.full((n,), 1), csr, N_PRODUCTS,
+            known_positive_keys=known,
+        )
+        # 2 is redrawn; only the rare exhausted-retry tail falls back to random
+        assert (neg == 3).float().mean() > 0.9
+
+    def test_empty_index_is_random(self):
+        csr = fitment_csr({}, n_users=3)
+        neg = sample_fitment_negatives(torch.tensor([0, 1, 2]), torch.tensor([0, 0, 0]), csr, N_PRODUCTS)
+        assert neg.shape == (3,)
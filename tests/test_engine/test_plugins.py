@@ -1,5 +1,7 @@
 """Tests for rec_engine.plugins — plugin hooks and validation."""
 
+import numpy as np
+
 from plugins.defaults import DefaultPlugin
 from rec_engine.plugins import FallbackTier, RecEnginePlugin, validate_plugin
 from src.gnn.holley_plugins import HolleyPlugin
@@ -37,6 +39,20 @@ class TestDefaultPlugin:
         plugin = DefaultPlugin()
         assert plugin.post_rank_filter(0, {}) is True
 
+    def test_post_rank_filter_batch_defers_to_per_item(self):
+        class OddOnly(DefaultPlugin):
+            def post_rank_filter(self, product_id, context):
+                return product_id % 2 == 1 and context["category"] == "c"
+
+        keep = OddOnly().post_rank_filter_batch(
+            np.array([0, 1, 2, 3]),
+            {"user_id": "u", "product_str_ids": np.array(list("abcd")), "categories": np.array(["c"] * 4)},
+        )
+        assert keep.tolist() == [False, True, False, True]
+
+    def test_static_product_mask_none(self):
+        assert DefaultPlugin().static_product_mask(np.arange(3), {}) is None
+
     def test_fallback_tiers_2node(self):
         plugin = DefaultPlugin()
         tiers = plugin.fallback_tiers({"topology": "user-product"})
@@ -127,3 +143,19 @@ class TestValidatePlugin:
 
         errors = validate_plugin(IncompletePlugin)
         assert len(errors) > 0
+
+    def test_bad_batch_filter_shape(self):
+        class BadBatch(DefaultPlugin):
+            def post_rank_filter_batch(self, product_ids, context):
+                return np.ones(len(product_ids) + 1, dtype=bool)
+
+        errors = validate_plugin(BadBatch)
+        assert any("post_rank_filter_batch" in e for e in errors)
+
+    def test_bad_static_mask_dtype(self):
+        class BadStatic(DefaultPlugin):
+            def static_product_mask(self, product_ids, context):
+                return np.zeros(len(product_ids))
+
+        errors = validate_plugin(BadStatic)
+        assert any("static_product_mask" in e for e in errors)
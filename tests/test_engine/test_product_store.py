@@ -0,0 +1,60 @@
+"""Tests for rec_engine.core.product_store — array-backed product metadata."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rec_engine.core.product_store import ProductMetadataStore
+
+
+@pytest.fixture
+def store():
+    products = pd.DataFrame({
+        "product_id": ["b", "a", "c", "unknown"],
+        "price": [20.0, None, 35.5, 9.0],
+        "category": ["Brakes", "Lights", None, "Brakes"],
+        "name": ["Pad", "Lamp", None, "X"],
+        "url": ["u/b", "u/a", "u/c", "u/x"],
+    })
+    # "d" is a graph product without a metadata row
+    return ProductMetadataStore(products, {"a": 0, "b": 1, "c": 2, "d": 3}, 4)
+
+
+class TestProductMetadataStore:
+    def test_columns_indexed_by_internal_id(self, store):
+        idx = np.array([0, 1, 2, 3])
+        assert store.column("product_id", idx).tolist() == ["a", "b", "c", "d"]
+        assert store.column("price", idx).tolist() == [0.0, 20.0, 35.5, 0.0]
+        assert store.column("name", idx).tolist() == ["Lamp", "Pad", "", ""]
+        assert store.category_labels.tolist() == ["Lights", "Brakes", "", ""]
+
+    def test_missing_column_defaults_to_empty(self, store):
+        assert store.column("image_url", np.arange(4)).tolist() == ["", "", "", ""]
+
+    def test_sentinel_row(self, store):
+        sentinel = np.array([4])
+        assert store.column("product_id", sentinel).tolist() == [None]
+        assert store.column("url", sentinel).tolist() == [None]
+        assert np.isnan(store.column("price", sentinel)[0])
+
+    def test_category_codes_shared_per_label(self, store):
+        codes = store.category_codes
+        assert codes[2] == codes[3]
+        assert len(set(codes.tolist())) == 3
+
+    def test_category_view(self, store):
+        categories = store.category_map()
+        assert categories[1] == "Brakes"
+        assert categories.get(99, "") == ""
+        assert len(categories) == 4
+        with pytest.raises(KeyError):
+            categories[-1]
+
+    def test_metadata_view(self, store):
+        meta = store.metadata_map({"a": 0, "b": 1, "c": 2, "d": 3})
+        assert len(meta) == 4
+        assert meta["b"] == {
+            "product_id": "b", "price": 20.0, "category": "Brakes",
+            "name": "Pad", "url": "u/b", "image_url": "",
+        }
+        assert "unknown" not in meta
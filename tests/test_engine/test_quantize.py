@@ -0,0 +1,77 @@
+"""Tests for rec_engine.core.quantize — reduced-precision embedding scoring."""
+
+import pytest
+import torch
+
+from rec_engine.core.quantize import PRECISIONS, quantize, quantize_keys, quantized_scores
+
+
+@pytest.fixture
+def embeddings():
+    g = torch.Generator().manual_seed(0)
+    users = torch.nn.functional.normalize(torch.randn(32, 16, generator=g), dim=1)
+    products = torch.nn.functional.normalize(torch.randn(200, 16, generator=g), dim=1)
+    return users, products
+
+
+class TestQuantize:
+    def test_fp32_is_identity(self, embeddings):
+        users, _ = embeddings
+        q = quantize(users, "fp32")
+        assert torch.equal(q.dequantize(), users)
+
+    def test_fp16_halves_storage(self, embeddings):
+        _, products = embeddings
+        q = quantize(products, "fp16")
+        assert q.values.dtype == torch.float16
+        assert q.nbytes * 2 == products.numel() * 4
+
+    def test_row_indexing(self, embeddings):
+        _, products = embeddings
+        q = quantize(products, "fp16")
+        rows = torch.tensor([5, 1])
+        assert torch.equal(q[rows].dequantize(), q.dequantize()[rows])
+
+    @pytest.mark.parametrize("precision", ["int8", "int4"])
+    def test_unknown_precision_raises(self, embeddings, precision):
+        with pytest.raises(ValueError, match="precision"):
+            quantize(embeddings[0], precision)
+
+
+class TestQuantizeKeys:
+    @pytest.mark.parametrize("precision", PRECISIONS)
+    def test_transposed_contiguous_layout(self, embeddings, precision):
+        _, products = embeddings
+        keys = quantize_keys(products, precision)
+        assert keys.values.shape == (products.shape[1], len(products))
+        assert keys.values.is_contiguous()
+        assert len(keys) == len(products)
+
+    def test_columns(self, embeddings):
+        users, products = embeddings
+        keys = quantize_keys(products, "fp16")
+        cols = torch.tensor([7, 2, 150])
+        queries = quantize(users, "fp16")
+        assert torch.equal(
+            quantized_scores(queries, keys.columns(cols)), quantized_scores(queries, keys)[:, cols],
+        )
+
+
+class TestQuantizedScores:
+    @pytest.mark.parametrize(
+        "precision, dtype, atol",
+        [("fp32", torch.float32, 1e-6), ("fp16", torch.float16, 2e-3)],
+    )
+    def test_close_to_fp32(self, embeddings, precision, dtype, atol):
+        users, products = embeddings
+        approx = quantized_scores(quantize(users, precision), quantize_keys(products, precision))
+        assert approx.dtype == dtype
+        assert torch.allclose(approx.float(), users @ products.t(), atol=atol)
+
+    def test_mixed_precision_raises(self, embeddings):
+        users, products = embeddings
+        with pytest.raises(ValueError, match="mismatch"):
+            quantized_scores(quantize(users, "fp16"), quantize_keys(products, "fp32"))
+
+    def test_precisions_listed(self):
+        assert PRECISIONS == ("fp32", "fp16")
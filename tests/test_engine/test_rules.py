@@ -1,6 +1,13 @@
 """Tests for rec_engine.core.rules — business rules."""
 
-from rec_engine.core.rules import apply_slot_reservation_with_diversity, select_popularity_fallback
+import numpy as np
+import torch
+
+from rec_engine.core.rules import (
+    apply_slot_reservation_with_diversity,
+    select_popularity_fallback,
+    select_top_n_batch,
+)
 
 
 class TestSlotReservation:
@@ -106,3 +113,79 @@ class TestSelectPopularityFallback:
         )
         assert 0 not in result
         assert 1 not in result
+
+
+class TestSelectTopNBatch:
+    def test_picks_top_scores_in_order(self):
+        scores = torch.tensor([[0.1, 0.9, 0.5, 0.7, 0.3]])
+        cats = torch.arange(5)
+        positions, values = select_top_n_batch(scores, cats, total_slots=3)
+        assert positions[0].tolist() == [1, 3, 2]
+        assert torch.allclose(values[0], torch.tensor([0.9, 0.7, 0.5]))
+
+    def test_category_cap_enforced(self):
+        scores = torch.tensor([[0.9, 0.8, 0.7, 0.6, 0.5]])
+        cats = torch.tensor([0, 0, 0, 1, 1])
+        positions, _ = select_top_n_batch(scores, cats, total_slots=4, max_per_category=2)
+        assert positions[0].tolist() == [0, 1, 3, 4]
+
+    def test_neg_inf_is_ineligible_and_pads(self):
+        scores = torch.tensor([[0.9, float("-inf"), 0.1], [float("-inf")] * 3])
+        positions, values = select_top_n_batch(scores, torch.zeros(3, dtype=torch.long), total_slots=4)
+        assert positions[0].tolist() == [0, 2, -1, -1]
+        assert torch.isinf(values[0, 2:]).all()
+        assert positions[1].tolist() == [-1] * 4
+
+    def test_deepens_window_for_rows_that_do_not_fill(self):
+        # Top-8 all share one category; the second category sits far below
+        scores = torch.arange(20, 0, -1, dtype=torch.float).unsqueeze(0)
+        cats = torch.tensor([0] * 18 + [1, 2])
+        positions, _ = select_top_n_batch(
+            scores, cats, total_slots=4, max_per_category=2, overfetch=1,
+        )
+        assert positions[0].tolist() == [0, 1, 18, 19]
+
+    def test_per_row_category_codes(self):
+        scores = torch.tensor([[0.9, 0.8, 0.7], [0.9, 0.8, 0.7]])
+        cats = torch.tensor([[0, 0, 1], [0, 1, 1]])
+        positions, _ = select_top_n_batch(scores, cats, total_slots=2, max_per_category=1)
+        assert positions.tolist() == [[0, 2], [0, 1]]
+
+    def test_matches_greedy_reference(self):
+        rng = np.random.default_rng(7)
+        scores = torch.from_numpy(rng.standard_normal((16, 40)).astype(np.float32))
+        scores[torch.from_numpy(rng.random((16, 40)) < 0.25)] = float("-inf")
+        cats = torch.from_numpy(rng.integers(0, 3, 40))
+        positions, _ = select_top_n_batch(
+            scores, cats, total_slots=4, max_per_category=2, overfetch=1,
+        )
+        cat_map = {j: int(cats[j]) for j in range(40)}
+        for i in range(16):
+            row = scores[i].numpy()
+            ranked = [int(j) for j in np.argsort(-row, kind="stable") if np.isfinite(row[j])]
+            expected = apply_slot_reservation_with_diversity(
+                ranked, set(ranked), None, cat_map,
+                fitment_slots=4, total_slots=4, max_per_category=2,
+            )
+            assert [p for p in positions[i].tolist() if p >= 0] == expected
+
+    def test_tied_scores_rank_by_position(self):
+        scores = torch.tensor([[1.0, 2.0, 1.0, 1.0, 2.0, 1.0, 1.0, 1.0]])
+        positions, _ = select_top_n_batch(scores, torch.arange(8), total_slots=4, overfetch=1)
+        assert positions.tolist() == [[1, 4, 0, 2]]
+
+    def test_ties_match_greedy_reference(self):
+        rng = np.random.default_rng(11)
+        scores = torch.from_numpy(rng.integers(0, 4, (32, 60)).astype(np.float32))
+        cats = torch.from_numpy(rng.integers(0, 3, 60))
+        positions, _ = select_top_n_batch(
+            scores, cats, total_slots=4, max_per_category=2, overfetch=1,
+        )
+        cat_map = {j: int(cats[j]) for j in range(60)}
+        for i in range(32):
+            ranked = [int(j) for j in np.argsort(-scores[i].numpy(), kind="stable")]
+            expected = apply_slot_reservation_with_diversity(
+                ranked, set(ranked), None, cat_map,
+                fitment_slots=4, total_slots=4, max_per_category=2,
+            )
+            assert positions[i].tolist() == expected
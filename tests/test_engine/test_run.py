@@ -1,5 +1,7 @@
 """Tests for rec_engine.run — CLI entry point and orchestration."""
 
+import functools
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -7,11 +9,15 @@ import torch
 
 from plugins.defaults import DefaultPlugin
 from rec_engine import is_valid_scalar
+from rec_engine.core.model import HeteroLightGCN
 from rec_engine.run import (
     _load_model_from_checkpoint,
+    build_model,
     load_plugin,
     mode_evaluate,
     mode_score,
+    mode_score_incremental,
+    mode_score_to_parquet,
     mode_train,
     preprocess_dataframes,
 )
@@ -220,6 +226,25 @@ class TestModeEvaluate:
             mode_evaluate(config_2node, all_dataframes_2node, plugin)
 
 
+class TestGraphCache:
+    def test_second_train_reuses_cached_graph(self, all_dataframes_3node, config_3node, tmp_path, monkeypatch):
+        from rec_engine.core import graph_builder
+
+        plugin = DefaultPlugin(salt="test")
+        config_3node["graph"]["cache_dir"] = str(tmp_path)
+        first = mode_train(config_3node, all_dataframes_3node, plugin)
+
+        # Same module/qualname as the real builder, so the fingerprint matches
+        @functools.wraps(graph_builder.build_hetero_graph)
+        def _fail(*args, **kwargs):
+            raise AssertionError("graph rebuilt despite cache hit")
+
+        monkeypatch.setattr(graph_builder, "build_hetero_graph", _fail)
+        second = mode_train(config_3node, all_dataframes_3node, plugin)
+        assert second["metadata"]["n_categories"] == first["metadata"]["n_categories"]
+        assert torch.equal(second["split_masks"]["train_mask"], first["split_masks"]["train_mask"])
+
+
 class TestModeScore:
     """H6: mode_score orchestration."""
 
@@ -234,6 +259,20 @@ class TestModeScore:
         assert "user_id" in df.columns
         assert "rec1_product_id" in df.columns
 
+    def test_score_streams_to_parquet_shards(self, all_dataframes_2node, config_2node, tmp_path):
+        plugin = DefaultPlugin(salt="test")
+        config_2node["scoring"]["chunk_size"] = 4
+        train_result = mode_train(config_2node, all_dataframes_2node, plugin)
+        summary = mode_score_to_parquet(
+            config_2node, all_dataframes_2node, plugin, str(tmp_path / "recs"),
+            train_result=train_result,
+        )
+        assert len(summary["shards"]) == 3
+        assert (tmp_path / "recs" / "_SUCCESS").exists()
+        df = pd.concat(pd.read_parquet(p) for p in summary["shards"])
+        assert len(df) == summary["n_rows"] == 10
+        assert df["user_id"].is_unique
+
     def test_score_without_model_raises(self, all_dataframes_2node, config_2node):
         """Score without train_result or checkpoint must raise."""
         plugin = DefaultPlugin(salt="test")
@@ -510,6 +549,27 @@ class TestEndToEnd3Node:
             assert deduped not in rec_pids
 
 
+class TestModelType:
+    """model.type selects the model class built for train/evaluate/score."""
+
+    def test_unknown_model_type_raises(self, config_2node):
+        config_2node["model"]["type"] = "transformer"
+        with pytest.raises(ValueError, match="model.type"):
+            build_model(10, 20, 0, 5, [("user", "interacts", "product")], config_2node)
+
+    def test_lightgcn_train_evaluate_score_3node(self, all_dataframes_3node, config_3node):
+        config_3node["model"]["type"] = "lightgcn"
+        plugin = DefaultPlugin(salt="test-3node")
+        train_result = mode_train(config_3node, all_dataframes_3node, plugin)
+        assert isinstance(train_result["model"], HeteroLightGCN)
+
+        eval_result = mode_evaluate(config_3node, all_dataframes_3node, plugin, train_result=train_result)
+        assert "go_no_go" in eval_result
+        df = mode_score(config_3node, all_dataframes_3node, plugin, train_result=train_result)
+        assert len(df) > 0
+        assert df["rec1_product_id"].notna().all()
+
+
 class TestCheckpointRoundTrip:
     """Codex M2: Positive-path test for _load_model_from_checkpoint."""
 
@@ -571,3 +631,77 @@ class TestCheckpointRoundTrip:
 
         assert torch.allclose(orig_user, loaded_user, atol=1e-6), "User embedding mismatch"
         assert torch.allclose(orig_prod, loaded_prod, atol=1e-6), "Product embedding mismatch"
+
+
+class TestEmbeddingSnapshot:
+    """Score/evaluate from the snapshot written by mode_train."""
+
+    @pytest.mark.parametrize("topology", ["2node", "3node"])
+    def test_snapshot_score_matches_train_result(self, topology, request, tmp_path):
+        dataframes = request.getfixturevalue(f"all_dataframes_{topology}")
+        config = request.getfixturevalue(f"config_{topology}")
+        config["output"]["embedding_snapshot_dir"] = str(tmp_path / "emb")
+        plugin = DefaultPlugin(salt="test")
+        train_result = mode_train(config, dataframes, plugin)
+        assert train_result["embedding_snapshot_dir"] == str(tmp_path / "emb")
+
+        expected = mode_score(config, dataframes, plugin, train_result=train_result)
+        df = mode_score(config, dataframes, plugin, embedding_snapshot=str(tmp_path / "emb"))
+        pd.testing.assert_frame_equal(df, expected, atol=1e-6)
+
+    def test_snapshot_evaluate_matches_train_result(self, all_dataframes_2node, config_2node, tmp_path):
+        config_2node["output"]["embedding_snapshot_dir"] = str(tmp_path / "emb")
+        plugin = DefaultPlugin(salt="test")
+        train_result = mode_train(config_2node, all_dataframes_2node, plugin)
+
+        expected = mode_evaluate(config_2node, all_dataframes_2node, plugin, train_result=train_result)
+        results = mode_evaluate(
+            config_2node, all_dataframes_2node, plugin, embedding_snapshot=str(tmp_path / "emb"),
+        )
+        assert results["n_evaluable"] == expected["n_evaluable"]
+        assert results["gnn_pre_rules"] == pytest.approx(expected["gnn_pre_rules"])
+
+
+class TestIncrementalScoring:
+    """mode_score_incremental re-scores only changed users."""
+
+    def test_unchanged_inputs_carry_everything_forward(self, all_dataframes_2node, config_2node, tmp_path):
+        plugin = DefaultPlugin(salt="test")
+        train_result = mode_train(config_2node, all_dataframes_2node, plugin)
+        fp_dir = str(tmp_path / "fp")
+
+        first = mode_score_incremental(
+            config_2node, all_dataframes_2node, plugin, fp_dir, train_result=train_result,
+        )
+        assert first["n_rescored"] == 10
+        assert (tmp_path / "fp" / "user_fingerprints.parquet").exists()
+
+        second = mode_score_incremental(
+            config_2node, all_dataframes_2node, plugin, fp_dir, train_result=train_result,
+            previous_output=first["recommendations"],
+        )
+        assert second["n_rescored"] == 0
+        assert second["rescored"].empty
+        pd.testing.assert_frame_equal(second["recommendations"], first["recommendations"])
+
+    def test_changed_purchases_rescore_only_that_user(self, all_dataframes_2node, config_2node, tmp_path):
+        plugin = DefaultPlugin(salt="test")
+        train_result = mode_train(config_2node, all_dataframes_2node, plugin)
+        fp_dir = str(tmp_path / "fp")
+        first = mode_score_incremental(
+            config_2node, all_dataframes_2node, plugin, fp_dir, train_result=train_result,
+        )
+        top_pick = first["recommendations"].iloc[0]
+        purchases = {top_pick["user_id"]: {top_pick["rec1_product_id"]}}
+
+        second = mode_score_incremental(
+            config_2node, all_dataframes_2node, plugin, fp_dir, train_result=train_result,
+            user_purchases=purchases, previous_output=first["recommendations"],
+        )
+        full = mode_score(
+            config_2node, all_dataframes_2node, plugin,
+            train_result=train_result, user_purchases=purchases,
+        )
+        assert second["n_rescored"] == 1
+        assert second["rescored"]["user_id"].tolist() == [top_pick["user_id"]]
+        pd.testing.assert_frame_equal(second["recommendations"], full, check_dtype=False)
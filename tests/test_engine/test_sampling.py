@@ -0,0 +1,50 @@
+"""Tests for rec_engine.core.sampling — heterogeneous neighbour sampling."""
+
+import pytest
+import torch
+
+from rec_engine.core.model import HeteroGAT
+from rec_engine.core.sampling import NeighborSampler, local_ids
+from rec_engine.topology import create_strategy
+
+
+def _model(data, mappings, meta, config):
+    torch.manual_seed(0)
+    return HeteroGAT(
+        data["user"].num_nodes, data["product"].num_nodes,
+        len(mappings.get("entity_to_id", {})), meta["n_categories"],
+        create_strategy(config).get_edge_types(config), config,
+        entity_type_name="vehicle",
+        product_num_features=meta["product_num_features"],
+        entity_num_features=meta["entity_num_features"],
+    ).eval()
+
+
+class TestNeighborSampler:
+    def test_full_fanout_matches_full_graph(self, small_graph_3node, config_3node):
+        data, _, mappings, meta = small_graph_3node
+        model = _model(data, mappings, meta, config_3node)
+        sampler = NeighborSampler(data, [-1, -1], seed=0)
+        users, products = torch.tensor([0, 4, 8]), torch.tensor([2, 7])
+        sub = sampler.sample({"user": users, "product": products})
+        with torch.no_grad():
+            full_u, full_p = model(data)
+            sub_u, sub_p = model(sub)
+        assert torch.allclose(sub_u[local_ids(sub, "user", users)], full_u[users], atol=1e-6)
+        assert torch.allclose(sub_p[local_ids(sub, "product", products)], full_p[products], atol=1e-6)
+
+    def test_fanout_caps_sampled_edges(self, small_graph_3node):
+        data, _, _, _ = small_graph_3node
+        sampler = NeighborSampler(data, [1, 1], relation_fanouts={"owns": [-1, 1]}, seed=0)
+        sub = sampler.sample({"vehicle": torch.tensor([0])})
+        # Vehicle 0 is owned by users 0 and 1 and fits products 0 and 1
+        owners = sub["user", "owns", "vehicle"].edge_index
+        fits = sub["product", "fits", "vehicle"].edge_index
+        assert sub["user"].n_id[owners[0]].tolist() == [0, 1]
+        assert fits.shape[1] == 1
+        assert sub["vehicle"].x.shape == (sub["vehicle"].num_nodes, 2)
+
+    def test_fanout_length_must_match_depth(self, small_graph_2node):
+        data, _, _, _ = small_graph_2node
+        with pytest.raises(ValueError, match="fanouts"):
+            NeighborSampler(data, [5, 5], relation_fanouts={"interacts": [5]})
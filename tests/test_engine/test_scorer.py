@@ -1,17 +1,21 @@
 """Tests for rec_engine.core.scorer — production scoring pipeline."""
 
+import os
+
+import numpy as np
 import pandas as pd
 import pytest
+import torch
 
 from plugins.defaults import DefaultPlugin
 from rec_engine.core.model import HeteroGAT
-from rec_engine.core.scorer import GNNScorer, QAFailedError
+from rec_engine.core.scorer import GNNScorer, QAFailedError, _open_embeddings, _share_embeddings
 from rec_engine.topology import create_strategy
 
 
-def _make_scorer(data, id_mappings, metadata, config, *, user_purchases=None):
+def _make_scorer(data, id_mappings, metadata, config, *, user_purchases=None, plugin=None):
     strategy = create_strategy(config)
-    plugin = DefaultPlugin(salt="test")
+    plugin = plugin or DefaultPlugin(salt="test")
     entity_type_name = config.get("entity", {}).get("type_name", "entity")
     n_entities = len(id_mappings.get("entity_to_id", {}))
     edge_types = strategy.get_edge_types(config)
@@ -87,6 +91,13 @@ class TestGNNScorer:
         assert "user_id" in df.columns
         assert "rec1_product_id" in df.columns
 
+    def test_warm_then_score_users(self, scorer):
+        full = scorer.score_all_users()
+        user_embs, product_embs = scorer.warm()
+        df = scorer.score_users(["user_7", "user_2", "nobody"], user_embs, product_embs)
+        expected = full[full["user_id"].isin(["user_2", "user_7"])].reset_index(drop=True)
+        pd.testing.assert_frame_equal(df, expected, atol=1e-6)
+
     def test_output_columns(self, scorer):
         cols = scorer._output_columns()
         assert "user_id" in cols
@@ -209,6 +220,74 @@ class TestPostRankFilterContext:
             assert "category" in ctx
 
 
+class TestBatchPluginHooks:
+    @staticmethod
+    def _rec_ids(df):
+        cols = [c for c in df.columns if c.startswith("rec") and c.endswith("_product_id")]
+        return set(df[cols].to_numpy().ravel()) - {None, ""}
+
+    def test_batch_filter_matches_per_item_filter(self, small_graph_2node, config_2node):
+        class PerItemPlugin(DefaultPlugin):
+            def post_rank_filter(self, product_id, context):
+                return context["category"] != "cat_1"
+
+        class BatchPlugin(DefaultPlugin):
+            def post_rank_filter_batch(self, product_ids, context):
+                return context["categories"] != "cat_1"
+
+        data, _, mappings, meta = small_graph_2node
+        target = {f"user_{i}" for i in range(10)}
+        frames = []
+        for plugin in (PerItemPlugin(salt="test"), BatchPlugin(salt="test")):
+            torch.manual_seed(0)
+            scorer = _make_scorer(data, mappings, meta, config_2node, plugin=plugin)
+            frames.append(scorer.score_all_users(target_user_ids=target))
+        pd.testing.assert_frame_equal(frames[0], frames[1])
+
+    def test_batch_filter_called_once_per_user(self, small_graph_2node, config_2node):
+        calls: list[str] = []
+
+        class BatchPlugin(DefaultPlugin):
+            def post_rank_filter_batch(self, product_ids, context):
+                calls.append(context["user_id"])
+                assert len(context["product_str_ids"]) == len(product_ids)
+                return np.ones(len(product_ids), dtype=bool)
+
+        data, _, mappings, meta = small_graph_2node
+        scorer = _make_scorer(data, mappings, meta, config_2node, plugin=BatchPlugin(salt="test"))
+        scorer.score_all_users(target_user_ids={"user_0", "user_1"})
+        assert sorted(calls) == ["user_0", "user_1"]
+
+    @pytest.mark.parametrize("topology", ["user-product", "user-entity-product"])
+    def test_static_mask_removes_products(
+        self, topology, small_graph_2node, small_graph_3node, config_2node, config_3node,
+    ):
+        class StaticPlugin(DefaultPlugin):
+            def static_product_mask(self, product_ids, context):
+                return context["categories"] != "cat_0"
+
+        if topology == "user-product":
+            (data, _, mappings, meta), config = small_graph_2node, config_2node
+        else:
+            (data, _, mappings, meta), config = small_graph_3node, config_3node
+        scorer = _make_scorer(data, mappings, meta, config, plugin=StaticPlugin(salt="test"))
+        assert not scorer._has_post_rank_filter
+        df = scorer.score_all_users(target_user_ids={f"user_{i}" for i in range(10)})
+
+        banned = {f"prod_{i}" for i in range(0, 20, 5)}
+        assert len(df) > 0
+        assert not self._rec_ids(df) & banned
+
+    def test_static_mask_bad_shape_raises(self, small_graph_2node, config_2node):
+        class BadPlugin(DefaultPlugin):
+            def static_product_mask(self, product_ids, context):
+                return np.ones(3, dtype=bool)
+
+        data, _, mappings, meta = small_graph_2node
+        with pytest.raises(ValueError, match="static_product_mask"):
+            _make_scorer(data, mappings, meta, config_2node, plugin=BadPlugin(salt="test"))
+
+
 class TestGNNScorerWithPurchaseExclusion:
     def test_purchase_exclusion(self, small_graph_2node, config_2node):
         data, _, mappings, meta = small_graph_2node
@@ -217,6 +296,81 @@ class TestGNNScorerWithPurchaseExclusion:
         assert "user_0" in scorer.user_excluded_products
         assert len(scorer.user_excluded_products["user_0"]) > 0
 
+    def test_csr_index_normalizes_input(self, small_graph_2node, config_2node):
+        data, _, mappings, meta = small_graph_2node
+        purchases = {
+            "user_0": {" prod_3 ", "prod_1", "unknown_sku"},
+            "user_1": "prod_2",
+            "user_2": [None, float("nan"), ["prod_4"], ""],
+            "user_3": None,
+            "not_a_user": {"prod_5"},
+        }
+        scorer = _make_scorer(data, mappings, meta, config_2node, user_purchases=purchases)
+        assert scorer.purchase_indices.dtype == np.int32
+        assert scorer._purchased(0).tolist() == [1, 3]
+        assert scorer._purchased(1).tolist() == [2]
+        assert dict(scorer.user_excluded_products) == {"user_0": {1, 3}, "user_1": {2}}
+
+    def test_overrides_sorted_and_deduped(self, small_graph_2node, config_2node):
+        data, _, mappings, meta = small_graph_2node
+        scorer = _make_scorer(data, mappings, meta, config_2node, user_purchases={"user_0": {"prod_1"}})
+        over = scorer.with_purchase_overrides({
+            "user_3": ["prod_9", " prod_2 ", "prod_9"], "user_0": set(), "user_1": "prod_4", "nobody": {"prod_1"},
+        })
+        assert over._purchased(3).tolist() == [2, 9]
+        assert over._purchased(3).dtype == np.int32
+        assert over._purchased(0).tolist() == []
+        assert over._purchased(1).tolist() == [4]
+        assert scorer._purchased(0).tolist() == [1]
+
+    @pytest.mark.parametrize("ann", [False, True])
+    def test_purchased_products_never_recommended(self, ann, small_graph_2node, config_2node):
+        data, _, mappings, meta = small_graph_2node
+        if ann:
+            config_2node["scoring"]["ann"] = {"enabled": True, "n_lists": 2, "n_probe": 2, "top_m": 20}
+        purchases = {f"user_{i}": {f"prod_{j}" for j in range(i, 18, 2)} for i in range(10)}
+        scorer = _make_scorer(data, mappings, meta, config_2node, user_purchases=purchases)
+        df = scorer.score_all_users(target_user_ids=set(purchases))
+
+        rec_cols = [f"rec{i}_product_id" for i in range(1, scorer.total_slots + 1)]
+        for row in df.itertuples(index=False):
+            recs = {getattr(row, c) for c in rec_cols}
+            assert not recs & purchases[row.user_id]
+
+
+class TestFallbackCache:
+    @pytest.fixture
+    def scorer(self, small_graph_3node, config_3node):
+        data, _, mappings, meta = small_graph_3node
+        return _make_scorer(data, mappings, meta, config_3node)
+
+    def test_shared_entity_set_hits_cache(self, scorer):
+        first = scorer._apply_fallback([0], None, [], None, {})
+        second = scorer._apply_fallback([0], None, [], set(), {})
+        assert first == second
+        assert len(first) == scorer.min_recs
+        assert scorer._fallback_cache_hits == 1
+        assert len(scorer._fallback_cache) == 1
+
+    def test_exclusions_match_uncached_walk(self, scorer):
+        cold = [pid for pid, _, _ in scorer._apply_fallback([0, 1], None, [], None, {})]
+        existing = [(cold[1], 0.9, False)]
+        counts = {scorer.category_by_product_id.get(cold[1], ""): 1}
+        cached = scorer._apply_fallback([0, 1], None, existing, {cold[0]}, dict(counts))
+
+        scorer.fallback_cache_size = 0
+        scorer._fallback_cache.clear()
+        uncached = scorer._apply_fallback([0, 1], None, existing, {cold[0]}, dict(counts))
+        assert cached == uncached
+        assert not {pid for pid, _, _ in cached} & {cold[0], cold[1]}
+        assert not scorer._fallback_cache
+
+    def test_cache_size_bounds_entries(self, scorer):
+        scorer.fallback_cache_size = 2
+        for eid in range(4):
+            scorer._apply_fallback([eid], None, [], None, {})
+        assert len(scorer._fallback_cache) == 2
+
 
 class TestScorerMinimalColumns:
     """I-2: Scorer must work with only contract-required columns (no name/url/image_url)."""
@@ -285,3 +439,368 @@ class TestQAChecks:
         df = pd.DataFrame([row, row], columns=cols)
         with pytest.raises(QAFailedError, match="duplicate"):
             scorer._qa_checks(df)
+
+    def test_qa_report_counts(self, small_graph_2node, config_2node):
+        data, _, mappings, meta = small_graph_2node
+        scorer = _make_scorer(data, mappings, meta, config_2node)
+        df = scorer.score_all_users(target_user_ids={f"user_{i}" for i in range(10)})
+        report = scorer._qa_checks(df, target_count=10)
+        assert report.passed
+        assert report.n_rows == len(df)
+        assert report.n_order_violations == report.n_prefix_violations == 0
+        assert len(report.n_below_min_price) == scorer.total_slots
+
+    def test_prefix_violations_counted_per_row(self, small_graph_2node, config_2node):
+        data, _, mappings, meta = small_graph_2node
+        scorer = _make_scorer(data, mappings, meta, config_2node)
+        cols = scorer._output_columns()
+        rows = []
+        # (scores, fallback_start_idx): increase inside the GNN prefix, increase
+        # only across the fallback boundary, and an empty slot inside the prefix
+        for i, (scores, fb_start) in enumerate([
+            ([0.5, 0.9, 0.1, 0.0], 3),
+            ([0.9, 0.5, 0.0, 0.0], 2),
+            ([0.9, None, 0.8, 0.0], 3),
+        ]):
+            row = {c: None for c in cols}
+            row.update(user_id=f"user_{i}", rec1_product_id="prod_0", is_fallback=True,
+                       fallback_start_idx=fb_start)
+            row.update({f"rec{j + 1}_score": v for j, v in enumerate(scores)})
+            rows.append(row)
+        df = pd.DataFrame(rows, columns=cols)
+
+        with pytest.raises(QAFailedError, match="GNN prefix") as exc_info:
+            scorer._qa_checks(df)
+        report = exc_info.value.report
+        assert report.n_prefix_violations == 1
+        assert report.n_order_violations == 0
+        assert not report.passed
+
+
+class TestFitmentScores:
+    """3-node scoring: CSR candidate expansion + scatter-max merge."""
+
+    def test_multi_vehicle_union_of_fitment(self, small_graph_3node, config_3node):
+        data, _, mappings, meta = small_graph_3node
+        # user_0 owns vehicles 0 and 1 → candidates are products 0-3
+        ei = data["user", "owns", "vehicle"].edge_index
+        extra = torch.tensor([[0], [1]])
+        data["user", "owns", "vehicle"].edge_index = torch.cat([ei, extra], dim=1)
+        scorer = _make_scorer(data, mappings, meta, config_3node)
+
+        user_embs = torch.randn(10, 4)
+        product_embs = torch.randn(20, 4)
+        candidate_ids, scores = scorer._fitment_scores(np.array([0, 2]), user_embs, product_embs)
+
+        assert candidate_ids.tolist() == [0, 1, 2, 3]
+        expected = user_embs[0] @ product_embs[:4].t()
+        assert torch.allclose(scores[0], expected)
+        # user_2 owns vehicle 1 only → products 0,1 are not candidates
+        assert torch.isinf(scores[1, :2]).all()
+        assert torch.allclose(scores[1, 2:], user_embs[2] @ product_embs[2:4].t())
+
+    def test_excluded_products_not_candidates(self, small_graph_3node, config_3node):
+        data, _, mappings, meta = small_graph_3node
+        data["product"].is_excluded = torch.zeros(20, dtype=torch.bool)
+        data["product"].is_excluded[0] = True
+        scorer = _make_scorer(data, mappings, meta, config_3node)
+        candidate_ids, _ = scorer._fitment_scores(
+            np.array([0]), torch.randn(10, 4), torch.randn(20, 4),
+        )
+        assert candidate_ids.tolist() == [1]
+
+    def test_users_without_entities_get_fallback_only(self, small_graph_3node, config_3node):
+        data, _, mappings, meta = small_graph_3node
+        ei = data["user", "owns", "vehicle"].edge_index
+        data["user", "owns", "vehicle"].edge_index = ei[:, ei[0] != 0]
+        scorer = _make_scorer(data, mappings, meta, config_3node)
+        df = scorer.score_all_users(target_user_ids={"user_0", "user_1"})
+        row = df.set_index("user_id").loc["user_0"]
+        assert bool(row["is_fallback"])
+        assert row["fallback_start_idx"] == 0
+
+
+class TestColumnarOutput:
+    """Wide output assembled from [n_users, total_slots] product-ID matrices."""
+
+    @pytest.fixture
+    def scorer(self, small_graph_2node, config_2node):
+        data, _, mappings, meta = small_graph_2node
+        return _make_scorer(data, mappings, meta, config_2node)
+
+    def test_build_output_frame_schema_and_metadata(self, scorer):
+        rec_pids = np.array([[3, 5, -1, -1], [7, -1, -1, -1]], dtype=np.int32)
+        rec_scores = np.array([[0.9, 0.0, np.nan, np.nan], [0.4, np.nan, np.nan, np.nan]])
+        df = scorer._build_output_frame(
+            np.array([0, 1]), rec_pids, rec_scores, np.array([1, 1]),
+        )
+        assert list(df.columns) == scorer._output_columns()
+        assert df["user_id"].tolist() == ["user_0", "user_1"]
+        assert df["rec1_product_id"].tolist() == ["prod_3", "prod_7"]
+        assert df["rec2_name"].iloc[0] == "Product 5"
+        assert df["rec1_price"].tolist() == [80.0, 120.0]
+        assert df["rec_count"].tolist() == [2, 1]
+        assert df["is_fallback"].tolist() == [True, False]
+        assert df["fallback_start_idx"].tolist() == [1, 1]
+
+    def test_empty_slots_are_null(self, scorer):
+        rec_pids = np.array([[2, -1, -1, -1]], dtype=np.int32)
+        rec_scores = np.array([[0.5, np.nan, np.nan, np.nan]])
+        df = scorer._build_output_frame(np.array([0]), rec_pids, rec_scores, np.array([1]))
+        assert df["rec2_product_id"].isna().all()
+        assert df["rec2_url"].isna().all()
+        assert df["rec2_price"].isna().all()
+        assert df["rec2_score"].isna().all()
+
+    def test_score_all_users_rows_sorted_and_unique(self, scorer):
+        df = scorer.score_all_users(target_user_ids={f"user_{i}" for i in range(10)})
+        assert df["user_id"].is_unique
+        assert (df["rec_count"] >= 1).all()
+        assert df["rec_count"].max() <= scorer.total_slots
+
+
+class TestStreamingScoring:
+    """Chunked scoring with running QA counters."""
+
+    @pytest.fixture(params=["user-product", "user-entity-product"])
+    def scorer(self, request, small_graph_2node, small_graph_3node, config_2node, config_3node):
+        if request.param == "user-product":
+            data, _, mappings, meta = small_graph_2node
+            return _make_scorer(data, mappings, meta, config_2node)
+        data, _, mappings, meta = small_graph_3node
+        return _make_scorer(data, mappings, meta, config_3node)
+
+    def test_chunks_match_single_pass(self, scorer):
+        target = {f"user_{i}" for i in range(10)}
+        full = scorer.score_all_users(target_user_ids=target)
+        chunks = list(scorer.iter_score_chunks(target, chunk_size=3))
+        assert len(chunks) == 4
+        assert all(len(c) <= 3 for c in chunks)
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True), full.reset_index(drop=True),
+        )
+
+    def test_qa_raised_after_last_chunk(self, scorer):
+        scorer.min_users = 100
+        chunks = scorer.iter_score_chunks({f"user_{i}" for i in range(10)}, chunk_size=5)
+        assert len(next(chunks)) > 0
+        with pytest.raises(QAFailedError, match="Only 10 users"):
+            list(chunks)
+
+    def test_empty_target_set(self, scorer):
+        df = scorer.score_all_users(target_user_ids=set())
+        assert df.empty
+        assert list(df.columns) == scorer._output_columns()
+
+    def test_score_to_parquet(self, scorer, tmp_path):
+        (tmp_path / "part-00009.parquet").write_bytes(b"stale")
+        summary = scorer.score_to_parquet(
+            tmp_path, {f"user_{i}" for i in range(10)}, chunk_size=4,
+        )
+        assert not (tmp_path / "part-00009.parquet").exists()
+        assert (tmp_path / "_SUCCESS").exists()
+        df = pd.concat(pd.read_parquet(p) for p in summary["shards"])
+        assert len(df) == summary["n_rows"]
+        assert list(df.columns) == scorer._output_columns()
+        assert summary["qa"]["passed"]
+        assert summary["qa"]["n_rows"] == summary["n_rows"]
+        assert scorer.qa_report.n_rows == summary["n_rows"]
+
+    def test_duplicates_detected_across_chunks(self, scorer):
+        from rec_engine.core.scorer import _QAAccumulator
+
+        df = scorer.score_all_users(target_user_ids={"user_0", "user_1"})
+        qa = _QAAccumulator(scorer)
+        qa.update(df)
+        qa.update(df.iloc[:1])
+        assert any("duplicate" in f for f in qa.failures())
+
+
+class TestMultiProcessScoring:
+    """Sharded scoring across forked worker processes."""
+
+    @pytest.fixture(params=["user-product", "user-entity-product"])
+    def setup(self, request, small_graph_2node, small_graph_3node, config_2node, config_3node):
+        if request.param == "user-product":
+            data, _, mappings, meta = small_graph_2node
+            return data, mappings, meta, config_2node
+        data, _, mappings, meta = small_graph_3node
+        return data, mappings, meta, config_3node
+
+    @staticmethod
+    def _normalize(df):
+        return df.astype(object).where(df.notna(), None)
+
+    def test_workers_match_in_process(self, setup, monkeypatch):
+        data, mappings, meta, config = setup
+        scorer = _make_scorer(data, mappings, meta, config)
+        single = scorer.score_all_users()
+        scorer.num_workers = 2
+
+        def _no_fork():
+            raise AssertionError("scoring workers must not be forked from a multi-threaded process")
+
+        monkeypatch.setattr(os, "fork", _no_fork)
+        sharded = pd.concat(scorer.iter_score_chunks(chunk_size=7), ignore_index=True)
+        pd.testing.assert_frame_equal(
+            self._normalize(sharded), self._normalize(single), atol=1e-6,
+        )
+
+    def test_snapshot_embeddings_shared_by_path(self, tmp_path):
+        np.save(tmp_path / "embs.npy", np.arange(6, dtype=np.float32).reshape(3, 2))
+        mapped = np.load(tmp_path / "embs.npy", mmap_mode="c")
+        handle = _share_embeddings(torch.from_numpy(mapped), mapped)
+        assert handle == str(tmp_path / "embs.npy")
+        torch.testing.assert_close(_open_embeddings(handle), torch.from_numpy(np.asarray(mapped)))
+
+    def test_computed_embeddings_shared_in_memory(self):
+        embs = torch.randn(3, 2)
+        handle = _share_embeddings(embs, None)
+        assert handle is embs
+        assert handle.is_shared()
+
+    def test_shards_cover_users_once(self, setup):
+        data, mappings, meta, config = setup
+        scorer = _make_scorer(data, mappings, meta, config)
+        uids = np.arange(len(mappings["user_to_id"]))
+        shards = scorer._shard_users(uids, 4)
+        assert 0 < len(shards) <= 4
+        np.testing.assert_array_equal(np.sort(np.concatenate(shards)), uids)
+
+
+class TestAnnRetrieval:
+    """2-node scoring over IVF-retrieved candidates."""
+
+    def test_full_probe_matches_dense(self, small_graph_2node, config_2node):
+        data, _, mappings, meta = small_graph_2node
+        scorer = _make_scorer(data, mappings, meta, config_2node)
+        dense = scorer.score_all_users()
+        scorer.ann_config = {"enabled": True, "n_lists": 4, "n_probe": 4, "top_m": 16}
+        approx = scorer.score_all_users()
+        assert scorer.ann_index is not None
+        assert scorer.ann_recall == pytest.approx(1.0)
+        pd.testing.assert_frame_equal(approx, dense, atol=1e-6)
+
+    def test_ann_ignored_for_3node(self, small_graph_3node, config_3node):
+        data, _, mappings, meta = small_graph_3node
+        config_3node["scoring"]["ann"] = {"enabled": True}
+        scorer = _make_scorer(data, mappings, meta, config_3node)
+        scorer.score_all_users()
+        assert scorer.ann_index is None
+        assert scorer.ann_recall is None
+
+
+class TestReducedPrecision:
+    """scoring.precision: quantized candidate matmul + fp32 re-rank."""
+
+    @pytest.mark.parametrize("topology", ["user-product", "user-entity-product"])
+    def test_matches_fp32_when_window_covers_catalog(
+        self, topology, small_graph_2node, small_graph_3node, config_2node, config_3node,
+    ):
+        if topology == "user-product":
+            (data, _, mappings, meta), config = small_graph_2node, config_2node
+        else:
+            (data, _, mappings, meta), config = small_graph_3node, config_3node
+        scorer = _make_scorer(data, mappings, meta, config, user_purchases={"user_0": {"prod_0"}})
+        exact = scorer.score_all_users()
+        assert scorer.candidate_keys is None or scorer.candidate_keys.precision == "fp32"
+
+        scorer.precision = "fp16"
+        approx = scorer.score_all_users()
+        assert scorer.candidate_keys.precision == "fp16"
+        assert len(scorer.candidate_keys) == scorer.candidate_mask.sum()
+        assert scorer.precision_overlap == pytest.approx(1.0)
+        # rerank_window (>= 16) spans the 20-product catalogue: exact re-rank
+        pd.testing.assert_frame_equal(approx, exact, atol=1e-6)
+
+    def test_window_limits_candidates(self, small_graph_2node, config_2node):
+        data, _, mappings, meta = small_graph_2node
+        config_2node["scoring"].update(precision="fp16", topn_overfetch=1, rerank_window=0)
+        scorer = _make_scorer(data, mappings, meta, config_2node)
+        assert scorer.rerank_window == scorer.total_slots
+        df = scorer.score_all_users()
+        assert len(df) > 0
+        assert 0.0 <= scorer.precision_overlap <= 1.0
+
+    def test_overlap_in_parquet_summary(self, small_graph_2node, config_2node, tmp_path):
+        data, _, mappings, meta = small_graph_2node
+        config_2node["scoring"]["precision"] = "fp16"
+        scorer = _make_scorer(data, mappings, meta, config_2node)
+        summary = scorer.score_to_parquet(tmp_path)
+        assert summary["precision_overlap"] == scorer.precision_overlap
+
+    @pytest.mark.parametrize("precision", ["bf16", "int8"])
+    def test_unknown_precision_raises(self, small_graph_2node, config_2node, precision):
+        data, _, mappings, meta = small_graph_2node
+        config_2node["scoring"]["precision"] = precision
+        with pytest.raises(ValueError, match="scoring.precision"):
+            _make_scorer(data, mappings, meta, config_2node)
+
+
+class TestIncrementalScoring:
+    """score_incremental carries unchanged users and matches a full re-score."""
+
+    @pytest.fixture(params=["user-product", "user-entity-product"])
+    def setup(self, request, small_graph_2node, small_graph_3node, config_2node, config_3node):
+        if request.param == "user-product":
+            data, _, mappings, meta = small_graph_2node
+            return data, mappings, meta, config_2node
+        data, _, mappings, meta = small_graph_3node
+        return data, mappings, meta, config_3node
+
+    def test_product_exclusion_change_matches_full_rescore(self, setup):
+        data, mappings, meta, config = setup
+        scorer = _make_scorer(data, mappings, meta, config)
+        first = scorer.score_incremental(None, None)
+        assert first["n_rescored"] == len(mappings["user_to_id"])
+
+        # Exclude the most-recommended product; everyone showing it must move
+        popular = first["recommendations"]["rec1_product_id"].mode()[0]
+        excluded = data["product"].is_excluded.clone()
+        excluded[mappings["product_to_id"][popular]] = True
+        data["product"].is_excluded = excluded
+        rescorer = GNNScorer(
+            model=scorer.model, data=data, id_mappings=mappings, nodes=scorer.nodes,
+            config=config, strategy=scorer.strategy, plugin=scorer.plugin,
+        )
+        result = rescorer.score_incremental(first["recommendations"], first["fingerprints"])
+        full = rescorer.score_all_users()
+
+        assert 0 < result["n_rescored"] < len(mappings["user_to_id"]) + 1
+        assert popular not in set(result["recommendations"]["rec1_product_id"])
+        pd.testing.assert_frame_equal(result["recommendations"], full, check_dtype=False)
+
+    def test_config_change_rescores_everyone(self, setup):
+        data, mappings, meta, config = setup
+        scorer = _make_scorer(data, mappings, meta, config)
+        first = scorer.score_incremental(None, None)
+        scorer.config = {**config, "output": {**config["output"], "model_version": "v2"}}
+        result = scorer.score_incremental(first["recommendations"], first["fingerprints"])
+        assert result["n_rescored"] == len(mappings["user_to_id"])
+
+    def test_fitment_only_change_rescores_owners(self, small_graph_3node, config_3node):
+        data, _, mappings, meta = small_graph_3node
+        scorer = _make_scorer(data, mappings, meta, config_3node)
+        embs = scorer._compute_embeddings()
+        scorer._compute_embeddings = lambda: embs
+        first = scorer.score_incremental(None, None)
+
+        # entity_0 (owned by user_0 and user_1) now also fits prod_17; the
+        # embeddings are pinned so only the rev_fits edge differs
+        fits = data["vehicle", "rev_fits", "product"].edge_index
+        data["vehicle", "rev_fits", "product"].edge_index = torch.cat(
+            [fits, torch.tensor([[0], [17]])], dim=1,
+        )
+        rescorer = GNNScorer(
+            model=scorer.model, data=data, id_mappings=mappings, nodes=scorer.nodes,
+            config=config_3node, strategy=scorer.strategy, plugin=scorer.plugin,
+        )
+        rescorer._compute_embeddings = lambda: embs
+        result = rescorer.score_incremental(first["recommendations"], first["fingerprints"])
+
+        assert sorted(result["rescored"]["user_id"]) == ["user_0", "user_1"]
+        # Empty slots are None in carried rows and NaN in fresh ones
+        pd.testing.assert_frame_equal(
+            result["recommendations"].fillna(""), rescorer.score_all_users().fillna(""),
+            check_dtype=False,
+        )
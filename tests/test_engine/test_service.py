@@ -0,0 +1,90 @@
+"""Tests for rec_engine.service — warm single-user recommendation API."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from plugins.defaults import DefaultPlugin
+from rec_engine.run import mode_score, mode_train
+from rec_engine.service import RecommendationService
+
+
+@pytest.fixture(params=["2node", "3node"])
+def trained(request, tmp_path):
+    dataframes = request.getfixturevalue(f"all_dataframes_{request.param}")
+    config = request.getfixturevalue(f"config_{request.param}")
+    config["output"]["embedding_snapshot_dir"] = str(tmp_path / "emb")
+    plugin = DefaultPlugin(salt="test")
+    mode_train(config, dataframes, plugin)
+    return config, dataframes, plugin, str(tmp_path / "emb")
+
+
+def _rec_ids(df: pd.DataFrame) -> set:
+    cols = [c for c in df.columns if c.startswith("rec") and c.endswith("_product_id")]
+    return set(df[cols].to_numpy().ravel()) - {None, ""}
+
+
+class TestRecommendationService:
+    def test_single_user_rows_match_batch_scoring(self, trained):
+        config, dataframes, plugin, snapshot = trained
+        batch = mode_score(config, dataframes, plugin, embedding_snapshot=snapshot)
+        service = RecommendationService.from_snapshot(config, dataframes, plugin, snapshot)
+
+        rows = pd.concat([service.recommend(uid) for uid in batch["user_id"]], ignore_index=True)
+        # Scores may differ in the last float bits (1-row vs batch matmul)
+        pd.testing.assert_frame_equal(rows, batch.reset_index(drop=True), atol=1e-6)
+
+    def test_batch_call_and_unknown_users(self, trained):
+        config, dataframes, plugin, snapshot = trained
+        service = RecommendationService.from_snapshot(config, dataframes, plugin, snapshot)
+        df = service.recommend(["user_3", "nobody", "user_1"])
+        # Raw IDs resolve through plugin.normalize_user_id, as in mode_score
+        assert set(df["user_id"]) == {plugin.normalize_user_id("user_1"), plugin.normalize_user_id("user_3")}
+        assert list(df.columns) == service.scorer._output_columns()
+        assert service.recommend("nobody").empty
+
+    def test_purchases_override_is_per_call(self, trained):
+        config, dataframes, plugin, snapshot = trained
+        service = RecommendationService.from_snapshot(config, dataframes, plugin, snapshot)
+        before = _rec_ids(service.recommend("user_0"))
+
+        overridden = service.recommend("user_0", purchases_override={"user_0": before})
+        assert not _rec_ids(overridden) & before
+        assert _rec_ids(service.recommend("user_0")) == before
+        assert service.scorer.purchase_overrides == {}
+
+    def test_override_matches_batch_purchases(self, trained):
+        config, dataframes, plugin, snapshot = trained
+        service = RecommendationService.from_snapshot(config, dataframes, plugin, snapshot)
+        purchases = {"user_2": set(sorted(_rec_ids(service.recommend("user_2")))[:2])}
+        expected = mode_score(
+            config, dataframes, plugin, embedding_snapshot=snapshot,
+            target_user_ids={"user_2"}, user_purchases=purchases,
+        )
+        df = service.recommend("user_2", purchases_override=purchases)
+        pd.testing.assert_frame_equal(df, expected.reset_index(drop=True), atol=1e-6)
+
+    def test_candidates_prepared_once(self, trained, monkeypatch):
+        config, dataframes, plugin, snapshot = trained
+        service = RecommendationService.from_snapshot(config, dataframes, plugin, snapshot)
+        keys = service.scorer.candidate_keys
+
+        def fail(*args, **kwargs):
+            raise AssertionError("candidate keys rebuilt per call")
+
+        monkeypatch.setattr("rec_engine.core.scorer.quantize_keys", fail)
+        service.recommend(["user_0", "user_1"], purchases_override={"user_0": {"prod_1"}})
+        assert service.scorer.candidate_keys is keys
+
+    def test_latency_percentiles(self, trained):
+        config, dataframes, plugin, snapshot = trained
+        service = RecommendationService.from_snapshot(
+            config, dataframes, plugin, snapshot, latency_window=3,
+        )
+        assert service.latency_percentiles() == {"count": 0}
+        for _ in range(5):
+            service.recommend("user_0")
+        stats = service.latency_percentiles()
+        assert stats["count"] == 3
+        assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+        assert np.isfinite(stats["max_ms"])
@@ -0,0 +1,42 @@
+"""Tests for rec_engine.core.sparse — CSR adjacency helpers."""
+
+import numpy as np
+import pytest
+
+from rec_engine.core.sparse import csr_gather, edges_to_csr
+
+
+class TestEdgesToCsr:
+    def test_basic_layout(self):
+        indptr, indices = edges_to_csr(np.array([2, 0, 0, 2]), np.array([5, 3, 1, 4]), 3)
+        assert indptr.tolist() == [0, 2, 2, 4]
+        assert indices.tolist() == [1, 3, 4, 5]
+
+    def test_dedup_parallel_edges(self):
+        indptr, indices = edges_to_csr(np.array([0, 0, 0]), np.array([1, 1, 2]), 1)
+        assert indices.tolist() == [1, 2]
+        _, kept = edges_to_csr(np.array([0, 0, 0]), np.array([1, 1, 2]), 1, dedup=False)
+        assert kept.tolist() == [1, 1, 2]
+
+    def test_empty(self):
+        indptr, indices = edges_to_csr(np.array([], dtype=np.int64), np.array([], dtype=np.int64), 4)
+        assert indptr.tolist() == [0, 0, 0, 0, 0]
+        assert len(indices) == 0
+
+    def test_out_of_range_src_raises(self):
+        with pytest.raises(ValueError, match="src IDs"):
+            edges_to_csr(np.array([3]), np.array([0]), 3)
+
+
+class TestCsrGather:
+    def test_gathers_rows_in_order(self):
+        indptr, indices = edges_to_csr(np.array([0, 0, 1, 2]), np.array([7, 8, 9, 6]), 3)
+        positions, values = csr_gather(indptr, indices, np.array([2, 0, 1]))
+        assert positions.tolist() == [0, 1, 1, 2]
+        assert values.tolist() == [6, 7, 8, 9]
+
+    def test_rows_without_neighbours(self):
+        indptr, indices = edges_to_csr(np.array([1]), np.array([4]), 3)
+        positions, values = csr_gather(indptr, indices, np.array([0, 2]))
+        assert len(positions) == 0
+        assert len(values) == 0
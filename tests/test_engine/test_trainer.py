@@ -1,12 +1,16 @@
 """Tests for rec_engine.core.trainer — training loop."""
 
+from types import SimpleNamespace
+
 import pytest
 import torch
 
 from plugins.defaults import DefaultPlugin
+from rec_engine.core.id_index import IdIndex
 from rec_engine.core.model import HeteroGAT
 from rec_engine.core.trainer import GNNTrainer
 from rec_engine.topology import create_strategy
+from src.gnn.checkpoint_utils import restore_id_mappings_from_checkpoint
 
 
 def _make_trainer(data, split_masks, id_mappings, metadata, config, topology):
@@ -81,6 +85,20 @@ class TestGNNTrainer:
         assert "config" in checkpoint
         assert "id_mappings" in checkpoint
 
+    def test_checkpoint_id_mappings_are_dicts(self, trainer, tmp_path):
+        path = str(tmp_path / "checkpoint.pt")
+        mappings = {
+            "user_to_id": IdIndex(["u1", "u0"]),
+            "product_to_id": IdIndex(["p0"]),
+            "vehicle_to_id": {},
+        }
+        trainer.save_checkpoint(path, id_mappings=mappings)
+        checkpoint = torch.load(path, weights_only=False)
+        assert checkpoint["id_mappings"]["user_to_id"] == {"u1": 0, "u0": 1}
+        loader = SimpleNamespace()
+        assert restore_id_mappings_from_checkpoint(loader, checkpoint)
+        assert loader.product_to_id == {"p0": 0}
+
     def test_negative_mix_validation(self, small_graph_2node, config_2node):
         data, masks, mappings, meta = small_graph_2node
         bad_config = dict(config_2node)
@@ -103,3 +121,50 @@ class TestGNNTrainer:
         cfg["training"]["min_training_edges"] = 9999  # Way more than available
         with pytest.raises(ValueError, match="training edges"):
             _make_trainer(data, masks, mappings, meta, cfg, "user-product")
+
+    def test_sampled_mode_steps_per_batch(self, small_graph_3node, config_3node):
+        data, masks, mappings, meta = small_graph_3node
+        cfg = dict(config_3node)
+        cfg["training"] = dict(cfg["training"], mode="sampled", batch_size=3, fanouts=[2, 2])
+        trainer = _make_trainer(data, masks, mappings, meta, cfg, "user-entity-product")
+        n_steps = 0
+        step = trainer._step
+
+        def counting_step(loss):
+            nonlocal n_steps
+            n_steps += 1
+            step(loss)
+
+        trainer._step = counting_step
+        loss = trainer.train_epoch()
+        assert loss > 0
+        assert n_steps == -(-len(trainer.pos_users) // 3)
+        assert "hit_rate_at_4" in trainer.validate("val")
+
+    def test_unknown_training_mode_raises(self, small_graph_2node, config_2node):
+        data, masks, mappings, meta = small_graph_2node
+        cfg = dict(config_2node)
+        cfg["training"] = dict(cfg["training"], mode="streaming")
+        with pytest.raises(ValueError, match="training.mode"):
+            _make_trainer(data, masks, mappings, meta, cfg, "user-product")
+
+    def test_validate_with_chunked_inference(self, small_graph_3node, config_3node):
+        data, masks, mappings, meta = small_graph_3node
+        trainer = _make_trainer(data, masks, mappings, meta, config_3node, "user-entity-product")
+        full = trainer.validate("val")
+        cfg = dict(config_3node, model=dict(config_3node["model"], inference_chunk_size=3))
+        trainer.config = cfg
+        assert trainer.validate("val") == pytest.approx(full)
+
+    def test_hard_negatives_reject_known_positives(self, small_graph_3node, config_3node):
+        data, masks, mappings, meta = small_graph_3node
+        cfg = dict(config_3node)
+        cfg["training"] = dict(cfg["training"], hard_negative_reject_positives=True)
+        trainer = _make_trainer(data, masks, mappings, meta, cfg, "user-entity-product")
+        assert len(trainer.known_positive_keys) == len(torch.unique(
+            trainer.pos_users * data["product"].num_nodes + trainer.pos_products
+        ))
+        indptr, indices = trainer.fitment_index_csr
+        assert len(indptr) == data["user"].num_nodes + 1
+        assert len(indices) == sum(len(p) for p in trainer.user_fitment_products.values())
+        assert trainer.train_epoch() > 0
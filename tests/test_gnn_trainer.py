@@ -228,6 +228,7 @@ class TestGNNTrainer:
         assert checkpoint["id_mappings"] == id_mappings
 
     def test_sample_negatives_respects_mix_segments(self, training_setup, mocker):
+        from rec_engine.core.negatives import fitment_csr
         from src.gnn.trainer import GNNTrainer
 
         model, data, masks, test_interactions, config = training_setup
@@ -240,10 +241,9 @@ class TestGNNTrainer:
         user_ids = torch.arange(10, dtype=torch.long, device=trainer.device)
         pos_product_ids = torch.arange(10, dtype=torch.long, device=trainer.device)
         trainer.user_fitment_products = {uid: [17, 18] for uid in range(10)}
+        trainer.fitment_index_csr = fitment_csr(trainer.user_fitment_products, 10, trainer.device)
 
         def fake_randint(high, size, device=None):
-            if tuple(size) == (1,):
-                return torch.tensor([0], dtype=torch.long, device=device)
             if tuple(size) == (2,):
                 return torch.tensor([19, 18], dtype=torch.long, device=device)
             raise AssertionError(f"unexpected randint shape: {size}")
@@ -253,6 +253,8 @@ class TestGNNTrainer:
             return_value=torch.arange(10, dtype=torch.long, device=trainer.device),
         )
         mocker.patch("src.gnn.trainer.torch.randint", side_effect=fake_randint)
+        # Offset draws of the vectorized fitment sampler: always the first slot
+        mocker.patch("src.gnn.trainer.torch.rand", side_effect=lambda n, device=None: torch.zeros(n, device=device))
 
         neg = trainer._sample_negatives(user_ids, pos_product_ids).cpu().tolist()
 